@@ -1,90 +1,65 @@
-import bcrypt
+import argparse
+import csv
 import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 
-# ------------------------------
-# CONFIGURATION
-# ------------------------------
-USER_DATA_FILE = "DATA/users.txt"
+# The CLI shares the Streamlit app's data layer and database
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Streamlit")
+sys.path.insert(0, APP_DIR)
+
+from app.data.schema import migrate
+from app.data.users import create_user, existing_usernames, get_user, insert_users
+from app.services.auth_manager import AuthManager
+from app.services.database_manager import DatabaseManager
+from app.services.login_throttle import LoginThrottledError
+from app.services.password_hasher import BCRYPT_ROUNDS, bcrypt_hash
 
 # ------------------------------
-# PASSWORD HASHING FUNCTIONS
+# CONFIGURATION
 # ------------------------------
-
-def hash_password(plain_text_password):
-    # Encode password to bytes
-    password_bytes = plain_text_password.encode("utf-8")
-
-    # Generate salt
-    salt = bcrypt.gensalt()
-
-    # Hash the password
-    hashed = bcrypt.hashpw(password_bytes, salt)
-
-    # Decode back to string for storage
-    return hashed.decode("utf-8")
-
-
-def verify_password(plain_text_password, hashed_password):
-    # Encode both to bytes
-    password_bytes = plain_text_password.encode("utf-8")
-    hashed_bytes = hashed_password.encode("utf-8")
-
-    # Compare using bcrypt
-    return bcrypt.checkpw(password_bytes, hashed_bytes)
+DB_PATH = os.path.join(APP_DIR, "DATA", "intelligence_platform.db")
+PROVISION_BATCH = 1000      # CSV rows hashed and inserted per transaction
 
 
 # ------------------------------
 # USER DATA HANDLING
 # ------------------------------
+# Users live in the SQLite `users` table; its UNIQUE index on username
+# makes each lookup a single index probe instead of a file scan.
 
 def user_exists(username):
-    if not os.path.exists(USER_DATA_FILE):
-        return False
-
-    with open(USER_DATA_FILE, "r") as f:
-        for line in f:
-            saved_username = line.strip().split(",")[0]
-            if saved_username == username:
-                return True
-
-    return False
+    return get_user(username, DB_PATH) is not None
 
 
 def register_user(username, password):
-    # Check if user already exists
-    if user_exists(username):
+    # Checked before hashing, so a taken name costs no bcrypt work
+    if not create_user(username, password, DB_PATH):
         print(f"Error: Username '{username}' already exists.")
         return False
 
-    # Hash password
-    hashed = hash_password(password)
-
-    # Append to file
-    with open(USER_DATA_FILE, "a") as f:
-        f.write(f"{username},{hashed}\n")
-
     print(f"Success: User '{username}' registered successfully!")
     return True
 
 
 def login_user(username, password):
-    if not os.path.exists(USER_DATA_FILE):
-        print("Error: No users registered yet.")
+    if not user_exists(username):
+        print("Error: Username not found.")
         return False
 
-    with open(USER_DATA_FILE, "r") as f:
-        for line in f:
-            saved_username, saved_hash = line.strip().split(",", 1)
+    # AuthManager also upgrades legacy / old-cost hashes on success
+    try:
+        user = AuthManager(DatabaseManager(DB_PATH)).login_user(username, password)
+    except LoginThrottledError as e:
+        print(f"Error: {e}")
+        return False
 
-            if saved_username == username:
-                if verify_password(password, saved_hash):
-                    print(f"Success: Welcome, {username}!")
-                    return True
-                else:
-                    print("Error: Invalid password.")
-                    return False
+    if user:
+        print(f"Success: Welcome, {username}!")
+        return True
 
-    print("Error: Username not found.")
+    print("Error: Invalid password.")
     return False
 
 
@@ -109,6 +84,84 @@ def validate_password(password):
     return True, ""
 
 
+# ------------------------------
+# BULK PROVISIONING
+# ------------------------------
+
+def read_users_csv(path):
+    """Yield (username, password, role) from a CSV with a username,password[,role] header."""
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        missing = {"username", "password"} - set(reader.fieldnames or ())
+        if missing:
+            raise ValueError(f"{path} has no {', '.join(sorted(missing))} column")
+        for row in reader:
+            yield (row["username"] or "").strip(), row["password"] or "", (row.get("role") or "user").strip()
+
+
+def provision(csv_path, workers=None, rounds=BCRYPT_ROUNDS, batch=PROVISION_BATCH):
+    """
+    Create every valid, new user in `csv_path`.
+
+    Rows are streamed in batches; each batch's passwords are hashed across
+    a process pool (bcrypt is CPU-bound) and inserted in one transaction.
+    Invalid rows and existing usernames are skipped before any hashing.
+    """
+    workers = workers or os.cpu_count() or 1
+    counts = {"rows": 0, "created": 0, "exists": 0, "invalid": 0}
+    seen = set()
+    hash_seconds = 0.0
+    started = time.perf_counter()
+
+    def batches():
+        chunk = []
+        for row in read_users_csv(csv_path):
+            chunk.append(row)
+            if len(chunk) >= batch:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk in batches():
+            counts["rows"] += len(chunk)
+            valid = []
+            for username, password, role in chunk:
+                if not (validate_username(username)[0] and validate_password(password)[0]):
+                    counts["invalid"] += 1
+                elif username in seen:
+                    counts["exists"] += 1
+                else:
+                    seen.add(username)
+                    valid.append((username, password, role))
+
+            taken = existing_usernames([u for u, _, _ in valid], DB_PATH)
+            todo = [row for row in valid if row[0] not in taken]
+            counts["exists"] += len(valid) - len(todo)
+
+            hash_started = time.perf_counter()
+            hashes = list(pool.map(bcrypt_hash, [p for _, p, _ in todo], [rounds] * len(todo),
+                                   chunksize=max(1, len(todo) // (workers * 4))))
+            hash_seconds += time.perf_counter() - hash_started
+
+            counts["created"] += insert_users(
+                [(u, h, role) for (u, _, role), h in zip(todo, hashes)], DB_PATH
+            )
+            elapsed = time.perf_counter() - started
+            print(f"  {counts['rows']:,} rows · {counts['created']:,} created · "
+                  f"{counts['rows'] / elapsed:,.0f} rows/s")
+
+    elapsed = time.perf_counter() - started
+    hashed = counts["created"]
+    print(f"Provisioned {hashed:,} of {counts['rows']:,} users in {elapsed:.1f} s "
+          f"({counts['exists']:,} already existed, {counts['invalid']:,} invalid).")
+    if hashed:
+        print(f"Hashing: {hashed / hash_seconds:,.1f} hashes/s with {workers} processes at cost {rounds} "
+              f"({hash_seconds * workers / hashed * 1000:.0f} ms per hash per process).")
+    return counts
+
+
 # ------------------------------
 # MAIN MENU
 # ------------------------------
@@ -124,7 +177,7 @@ def display_menu():
     print("-" * 50)
 
 
-def main():
+def menu():
     print("\nWelcome to the Week 7 Authentication System!")
 
     while True:
@@ -170,5 +223,27 @@ def main():
             print("Error: Invalid option. Choose 1–3.")
 
 
+def main():
+    global DB_PATH
+    parser = argparse.ArgumentParser(description="Platform user accounts")
+    parser.add_argument("--db", default=DB_PATH, help="platform database (default: the Streamlit app's)")
+    commands = parser.add_subparsers(dest="command")
+    prov = commands.add_parser("provision", help="bulk-create users from a CSV (username,password[,role])")
+    prov.add_argument("csv_path")
+    prov.add_argument("--workers", type=int, default=None, help="hashing processes (default: all cores)")
+    prov.add_argument("--rounds", type=int, default=BCRYPT_ROUNDS, help="bcrypt cost")
+    prov.add_argument("--batch", type=int, default=PROVISION_BATCH)
+    args = parser.parse_args()
+
+    DB_PATH = args.db
+    os.makedirs(os.path.dirname(os.path.abspath(DB_PATH)), exist_ok=True)
+    migrate(DB_PATH)
+
+    if args.command == "provision":
+        provision(args.csv_path, args.workers, args.rounds, args.batch)
+    else:
+        menu()
+
+
 if __name__ == "__main__":
     main()
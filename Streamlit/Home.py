@@ -1,15 +1,25 @@
 import streamlit as st
+from app.data.schema import ensure_migrated
 from app.services.database_manager import DatabaseManager
 from app.services.auth_manager import AuthManager
+from app.services.login_throttle import LoginThrottledError
+from app.services.ai_assistant import AIAssistant
+from app.services.ai_scheduler import warm_up_in_background
 
 st.set_page_config(page_title="Login / Register", layout="centered")
 
 # -----------------------------------
 # DATABASE + AUTH MANAGER
 # -----------------------------------
+# Every page relies on the migrated schema (hash_algorithm, FTS, data
+# versions, embedding queue); bring the file up to date once per process
+ensure_migrated("DATA/intelligence_platform.db")
 db = DatabaseManager("DATA/intelligence_platform.db")   # fixed path
 auth = AuthManager(db)
 
+# Load the AI model while users are still logging in (OLLAMA_WARMUP=1; once per process)
+warm_up_in_background(AIAssistant(model="phi3:mini"))
+
 # -----------------------------------
 # SESSION STATE INITIALISATION
 # -----------------------------------
@@ -17,6 +27,8 @@ if "logged_in" not in st.session_state:
     st.session_state.logged_in = False
 if "username" not in st.session_state:
     st.session_state.username = ""
+if "role" not in st.session_state:
+    st.session_state.role = ""
 
 
 # -----------------------------------
@@ -48,11 +60,16 @@ with login_tab:
         if not login_username or not login_password:
             st.warning("Please fill in both fields.")
         else:
-            user = auth.login_user(login_username, login_password)
+            try:
+                user = auth.login_user(login_username, login_password, client=st.context.ip_address)
+            except LoginThrottledError as e:
+                st.error(str(e))
+                st.stop()
 
             if user:
                 st.session_state.logged_in = True
                 st.session_state.username = user.get_username()
+                st.session_state.role = user.get_role()
                 st.success("Login successful! Redirecting...")
                 st.switch_page("pages/1_Dashboard.py")
             else:
@@ -75,6 +92,7 @@ with register_tab:
             st.warning("Please complete all fields.")
         elif reg_password != reg_confirm:
             st.error("Passwords do not match.")
-        else:
-            auth.register_user(reg_username, reg_password)
+        elif auth.register_user(reg_username, reg_password):
             st.success("Account created successfully! Please log in.")
+        else:
+            st.error("That username is already taken.")
@@ -0,0 +1,77 @@
+"""
+Bulk inserts and upserts that keep the trigger-maintained side tables
+(full-text index, data versions, embedding queue) in sync set-wise.
+
+Fired row by row, the FTS5 triggers flush a segment per row, so a large
+load slows to a few hundred rows/s. write_rows() drops a table's insert
+and update triggers for the duration of the caller's transaction, runs
+the statement with executemany and then does the triggers' work once per
+chunk before restoring them. Other connections never see the triggers
+missing: the DROP and CREATE commit together with the rows.
+"""
+
+FTS_TABLES = {'cyber_incidents': 'incidents_fts', 'it_tickets': 'tickets_fts'}
+
+
+def _suspend_triggers(conn, table: str) -> dict:
+    """Drop the insert/update triggers that exist on `table`; returns {name: sql} to restore."""
+    fts = FTS_TABLES.get(table)
+    names = [f'{table}_version_ai', f'{table}_version_au', f'{table}_embed_ai', f'{table}_embed_au']
+    if fts:
+        names += [f'{fts}_ai', f'{fts}_au']
+    placeholders = ', '.join('?' * len(names))
+    suspended = dict(conn.execute(
+        f"SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND name IN ({placeholders})",
+        names,
+    ).fetchall())
+    for name in suspended:
+        conn.execute(f'DROP TRIGGER {name}')
+    return suspended
+
+
+def write_rows(conn, table: str, key: str, sql: str, rows: list, keys: list) -> int:
+    """
+    Run `sql` (an INSERT, optionally with ON CONFLICT ... DO UPDATE) over
+    `rows` inside the caller's write transaction. `keys` holds each row's
+    primary key. Every written row is treated as new or re-described:
+    re-indexed for full-text search and queued for embedding.
+
+    Returns the number of rows inserted or updated.
+    """
+    if any(k is None for k in keys):
+        # SQLite assigns the ids itself; only the triggers know them
+        return conn.executemany(sql, rows).rowcount
+
+    conn.execute('CREATE TEMP TABLE IF NOT EXISTS bulk_keys (id INTEGER PRIMARY KEY)')
+    conn.execute('DELETE FROM temp.bulk_keys')
+    conn.executemany('INSERT OR IGNORE INTO temp.bulk_keys (id) VALUES (?)', [(k,) for k in keys])
+
+    suspended = _suspend_triggers(conn, table)
+    fts = FTS_TABLES.get(table)
+    if f'{fts}_ai' in suspended:
+        # Rows about to be overwritten leave the index with their old text
+        conn.execute(f"INSERT INTO {fts} ({fts}, rowid, description) "
+                     f"SELECT 'delete', t.{key}, t.description FROM {table} t "
+                     f"JOIN temp.bulk_keys k ON t.{key} = k.id")
+
+    written = conn.executemany(sql, rows).rowcount
+
+    if f'{fts}_ai' in suspended:
+        conn.execute(f'INSERT INTO {fts} (rowid, description) '
+                     f'SELECT t.{key}, t.description FROM {table} t JOIN temp.bulk_keys k ON t.{key} = k.id')
+    if f'{table}_embed_ai' in suspended:
+        # Re-queued rows get fresh, higher rowids, as the triggers give them
+        base = conn.execute('SELECT COALESCE(MAX(rowid), 0) FROM embedding_queue').fetchone()[0]
+        conn.execute('DELETE FROM embedding_queue WHERE table_name = ? AND row_id IN (SELECT id FROM temp.bulk_keys)',
+                     (table,))
+        conn.execute('INSERT INTO embedding_queue (rowid, table_name, row_id) '
+                     'SELECT ? + ROW_NUMBER() OVER (ORDER BY id), ?, id FROM temp.bulk_keys',
+                     (base, table))
+    if f'{table}_version_ai' in suspended and written:
+        conn.execute('UPDATE data_versions SET version = version + ? WHERE table_name = ?',
+                     (written, table))
+
+    for trigger_sql in suspended.values():
+        conn.execute(trigger_sql)
+    conn.execute('DELETE FROM temp.bulk_keys')
+    return written
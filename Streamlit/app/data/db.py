@@ -1,7 +1,205 @@
 import sqlite3
 import os
+import threading
+from collections import deque
+from contextlib import contextmanager
 
 DB_PATH = os.path.join('DATA', 'intelligence_platform.db')
 
+# ---------------------------------------------------------
+# PRAGMA profile applied to every pooled connection.
+# Override per pool with configure_pool(path, **pragmas).
+# ---------------------------------------------------------
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,          # ms to wait on a lock before "database is locked"
+    'cache_size': -20000,          # negative = KiB, so ~20 MB page cache per connection
+    'mmap_size': 268435456,        # 256 MB memory-mapped I/O
+    'temp_store': 'MEMORY',
+    'foreign_keys': 'ON',
+}
+
+MAX_IDLE_READERS = 8
+
+
+class ConnectionPool:
+    """
+    Process-wide pool of SQLite connections for one database file.
+
+    - Readers come from a small idle queue and are handed to one thread at a
+      time (thread-affine for the duration of the `with` block).
+    - Writes go through a single writer connection behind a lock, so
+      in-process writers queue up instead of fighting over SQLite's lock.
+    - Nested reader()/writer() calls on the same thread reuse the connection
+      already held, so a read inside a write sees its own changes.
+    """
+
+    def __init__(self, db_path: str, pragmas: dict | None = None,
+                 max_idle_readers: int = MAX_IDLE_READERS):
+        self._db_path = db_path
+        self._pragmas = dict(DEFAULT_PRAGMAS)
+        if pragmas:
+            self._pragmas.update(pragmas)
+        self._max_idle_readers = max_idle_readers
+
+        self._idle_readers = deque()
+        self._idle_lock = threading.Lock()
+
+        self._writer = None
+        self._write_lock = threading.RLock()
+
+        self._local = threading.local()
+
+    @property
+    def db_path(self) -> str:
+        return self._db_path
+
+    @property
+    def pragmas(self) -> dict:
+        return dict(self._pragmas)
+
+    # -----------------------------
+    # Connection setup
+    # -----------------------------
+    def _open(self, read_only: bool) -> sqlite3.Connection:
+        directory = os.path.dirname(self._db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # isolation_level=None → we issue BEGIN/COMMIT ourselves in writer()
+        conn = sqlite3.connect(
+            self._db_path,
+            timeout=self._pragmas.get('busy_timeout', 5000) / 1000,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        for name, value in self._pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        if read_only:
+            conn.execute('PRAGMA query_only = ON')
+        return conn
+
+    def _held(self):
+        """Connection already held by this thread, if any."""
+        return getattr(self._local, 'conn', None)
+
+    # -----------------------------
+    # Readers
+    # -----------------------------
+    @contextmanager
+    def reader(self):
+        held = self._held()
+        if held is not None:
+            yield held
+            return
+
+        with self._idle_lock:
+            conn = self._idle_readers.pop() if self._idle_readers else None
+        if conn is None:
+            conn = self._open(read_only=True)
+
+        self._local.conn = conn
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            with self._idle_lock:
+                if len(self._idle_readers) < self._max_idle_readers:
+                    self._idle_readers.append(conn)
+                    conn = None
+            if conn is not None:
+                conn.close()
+
+    # -----------------------------
+    # Writer
+    # -----------------------------
+    @contextmanager
+    def writer(self):
+        """
+        Run the block inside one write transaction.
+
+        Commits on success, rolls back on any exception.
+        """
+        held = self._held()
+        if held is not None and held is self._writer:
+            yield held
+            return
+        if held is not None:
+            raise RuntimeError('Cannot open a write transaction inside a read block.')
+
+        with self._write_lock:
+            if self._writer is None:
+                self._writer = self._open(read_only=False)
+            conn = self._writer
+
+            # Bind the thread only once BEGIN succeeded: a failed BEGIN (e.g.
+            # "database is locked") must not leave later reader() calls on the writer
+            conn.execute('BEGIN IMMEDIATE')
+            self._local.conn = conn
+            try:
+                yield conn
+            except BaseException:
+                # SQLite may already have rolled back (e.g. on SQLITE_FULL); a
+                # second ROLLBACK would raise and hide the original error.
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+                raise
+            else:
+                conn.execute('COMMIT')
+            finally:
+                self._local.conn = None
+
+    def close_all(self):
+        with self._idle_lock:
+            while self._idle_readers:
+                self._idle_readers.pop().close()
+        with self._write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+
+# ---------------------------------------------------------
+# Process-wide registry (one pool per database file)
+# ---------------------------------------------------------
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def configure_pool(db_path: str = DB_PATH, **pragmas) -> ConnectionPool:
+    """Create (or replace) the pool for db_path with a custom PRAGMA profile."""
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        old = _pools.get(key)
+        _pools[key] = ConnectionPool(db_path, pragmas)
+    if old is not None:
+        old.close_all()
+    return _pools[key]
+
+
+def get_pool(db_path: str = DB_PATH) -> ConnectionPool:
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(db_path)
+        return pool
+
+
+def read_connection(db_path: str = DB_PATH):
+    """`with read_connection() as conn:` → pooled, query-only connection."""
+    return get_pool(db_path).reader()
+
+
+def write_connection(db_path: str = DB_PATH):
+    """`with write_connection() as conn:` → the writer, inside one transaction."""
+    return get_pool(db_path).writer()
+
+
 def get_connection():
-    return sqlite3.connect(DB_PATH)
+    """Stand-alone connection with the default PRAGMA profile (caller closes it)."""
+    conn = sqlite3.connect(DB_PATH, timeout=DEFAULT_PRAGMAS['busy_timeout'] / 1000)
+    for name, value in DEFAULT_PRAGMAS.items():
+        conn.execute(f'PRAGMA {name} = {value}')
+    return conn
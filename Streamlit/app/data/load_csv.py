@@ -1,19 +1,138 @@
+import csv
 import os
-import pandas as pd
-from app.data.db import get_connection
+import time
+from itertools import islice
 
-def _load_csv_to_table(csv_path, table_name):
+from app.data.bulk import write_rows
+from app.data.db import DB_PATH, read_connection, write_connection
+
+# Primary key per table — used for the upsert so re-runs never duplicate rows
+TABLE_KEYS = {
+    'cyber_incidents': 'incident_id',
+    'datasets_metadata': 'dataset_id',
+    'it_tickets': 'ticket_id',
+}
+
+# Rows per transaction; memory use stays bounded by this, not by file size
+DEFAULT_CHUNK_ROWS = 5000
+
+
+def _table_columns(table_name, db_path):
+    with read_connection(db_path) as conn:
+        return [row[1] for row in conn.execute(f'PRAGMA table_info({table_name})')]
+
+
+def _file_signature(csv_path):
+    stat = os.stat(csv_path)
+    return f'{stat.st_size}:{int(stat.st_mtime)}'
+
+
+def _read_checkpoint(conn, csv_path, table_name, signature):
+    row = conn.execute(
+        'SELECT rows_done, signature FROM csv_load_progress WHERE csv_path = ? AND table_name = ?',
+        (csv_path, table_name),
+    ).fetchone()
+    if row is None or row[1] != signature:
+        # No checkpoint, or the file changed since → start over
+        return 0
+    return row[0]
+
+
+def _build_upsert(table_name, columns, key):
+    placeholders = ', '.join('?' for _ in columns)
+    updates = ', '.join(f'{c} = excluded.{c}' for c in columns if c != key)
+    sql = f'INSERT INTO {table_name} ({", ".join(columns)}) VALUES ({placeholders}) ON CONFLICT({key}) '
+    return sql + (f'DO UPDATE SET {updates}' if updates else 'DO NOTHING')
+
+
+def _load_csv_to_table(csv_path, table_name, chunk_rows=DEFAULT_CHUNK_ROWS,
+                       resume=True, db_path=DB_PATH):
+    """
+    Stream a CSV into table_name in chunks of chunk_rows.
+
+    Each chunk is upserted with app.data.bulk.write_rows inside its own
+    transaction, together with a checkpoint row, so an interrupted load
+    resumes after the last committed chunk. Returns a stats dict (rows, seconds, rows_per_sec).
+    """
     if not os.path.exists(csv_path):
         print(f'WARNING: {csv_path} not found, skipping.')
-        return
-
-    conn = get_connection()
-    df = pd.read_csv(csv_path)
-    df.to_sql(table_name, conn, if_exists='append', index=False)
-    conn.close()
-    print(f'✓ Loaded {len(df)} rows into {table_name}')
-
-def load_all_csv():
-    _load_csv_to_table('DATA/cyber_incidents.csv', 'cyber_incidents')
-    _load_csv_to_table('DATA/datasets_metadata.csv', 'datasets_metadata')
-    _load_csv_to_table('DATA/it_tickets.csv', 'it_tickets')
+        return None
+
+    key = TABLE_KEYS[table_name]
+    table_cols = _table_columns(table_name, db_path)
+    signature = _file_signature(csv_path)
+
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = [h.strip() for h in next(reader, [])]
+
+        if key not in header:
+            raise ValueError(f'{csv_path} has no "{key}" column; cannot upsert into {table_name}.')
+
+        unknown = [h for h in header if h not in table_cols]
+        if unknown:
+            print(f'WARNING: ignoring columns not in {table_name}: {", ".join(unknown)}')
+
+        keep = [i for i, h in enumerate(header) if h in table_cols]
+        columns = [header[i] for i in keep]
+        key_pos = columns.index(key)
+        upsert_sql = _build_upsert(table_name, columns, key)
+
+        start_row = 0
+        if resume:
+            with read_connection(db_path) as conn:
+                start_row = _read_checkpoint(conn, csv_path, table_name, signature)
+            if start_row:
+                print(f'↻ Resuming {table_name} from row {start_row}')
+                for _ in islice(reader, start_row):
+                    pass
+
+        # Checkpoints count raw reader rows (blank lines included), so the
+        # islice above skips exactly what earlier runs consumed
+        raw_done = start_row
+        loaded = 0
+        started = time.perf_counter()
+
+        while True:
+            raw = list(islice(reader, chunk_rows))
+            if not raw:
+                break
+            raw_done += len(raw)
+            chunk = [
+                tuple(row[i] if i < len(row) and row[i] != '' else None for i in keep)
+                for row in raw
+                if row
+            ]
+            if not chunk:
+                continue
+
+            with write_connection(db_path) as conn:
+                write_rows(conn, table_name, key, upsert_sql, chunk, [row[key_pos] for row in chunk])
+                conn.execute(
+                    '''
+                    INSERT INTO csv_load_progress (csv_path, table_name, rows_done, signature)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(csv_path, table_name)
+                    DO UPDATE SET rows_done = excluded.rows_done, signature = excluded.signature
+                    ''',
+                    (csv_path, table_name, raw_done, signature),
+                )
+            loaded += len(chunk)
+
+    # Finished cleanly → drop the checkpoint so the next run re-syncs the whole file
+    with write_connection(db_path) as conn:
+        conn.execute(
+            'DELETE FROM csv_load_progress WHERE csv_path = ? AND table_name = ?',
+            (csv_path, table_name),
+        )
+
+    elapsed = time.perf_counter() - started
+    rate = loaded / elapsed if elapsed > 0 else float(loaded)
+    print(f'✓ Loaded {loaded} rows into {table_name} ({rate:,.0f} rows/s)')
+    return {'rows': loaded, 'seconds': elapsed, 'rows_per_sec': rate}
+
+
+def load_all_csv(chunk_rows=DEFAULT_CHUNK_ROWS, resume=True):
+    _load_csv_to_table('DATA/cyber_incidents.csv', 'cyber_incidents', chunk_rows, resume)
+    _load_csv_to_table('DATA/datasets_metadata.csv', 'datasets_metadata', chunk_rows, resume)
+    _load_csv_to_table('DATA/it_tickets.csv', 'it_tickets', chunk_rows, resume)
@@ -1,52 +1,309 @@
-from app.data.db import get_connection
+import os
+import threading
 
-def create_tables():
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT NOT NULL UNIQUE,
-            password_hash TEXT NOT NULL,
-            role TEXT DEFAULT 'user'
-        )
-    ''')
-
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS cyber_incidents (
-            incident_id INTEGER PRIMARY KEY,
-            timestamp TEXT,
-            severity TEXT,
-            category TEXT,
-            status TEXT,
-            description TEXT
-        )
-    ''')
-
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS datasets_metadata (
-            dataset_id INTEGER PRIMARY KEY,
-            name TEXT NOT NULL,
-            rows INTEGER,
-            columns INTEGER,
-            uploaded_by TEXT,
-            upload_date TEXT
-        )
-    ''')
-
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS it_tickets (
-            ticket_id INTEGER PRIMARY KEY,
-            priority TEXT,
-            description TEXT,
-            status TEXT,
-            assigned_to TEXT,
-            created_at TEXT,
-            resolution_time_hours INTEGER
+from app.data.db import DB_PATH, write_connection
+
+
+# ---------------------------------------------------------
+# Versioned migrations, keyed on PRAGMA user_version.
+#
+# Each entry is (version, description, steps). A step is either an
+# SQL string or a callable taking the connection. Steps must be
+# idempotent (IF NOT EXISTS etc.) because databases created before
+# versioning already contain the base tables at user_version 0.
+# Never edit a released migration — append a new one.
+# ---------------------------------------------------------
+
+BASE_TABLES = [
+    '''
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT NOT NULL UNIQUE,
+        password_hash TEXT NOT NULL,
+        role TEXT DEFAULT 'user'
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS cyber_incidents (
+        incident_id INTEGER PRIMARY KEY,
+        timestamp TEXT,
+        severity TEXT,
+        category TEXT,
+        status TEXT,
+        description TEXT
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS datasets_metadata (
+        dataset_id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        rows INTEGER,
+        columns INTEGER,
+        uploaded_by TEXT,
+        upload_date TEXT
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS it_tickets (
+        ticket_id INTEGER PRIMARY KEY,
+        priority TEXT,
+        description TEXT,
+        status TEXT,
+        assigned_to TEXT,
+        created_at TEXT,
+        resolution_time_hours INTEGER
+    )
+    ''',
+]
+
+# What the AI Assistant's SQL mode may read. `users` is deliberately absent.
+QUERYABLE_COLUMNS = {
+    'cyber_incidents': ('incident_id', 'timestamp', 'severity', 'category', 'status', 'description'),
+    'it_tickets': ('ticket_id', 'priority', 'description', 'status', 'assigned_to',
+                   'created_at', 'resolution_time_hours'),
+    'datasets_metadata': ('dataset_id', 'name', 'rows', 'columns', 'uploaded_by', 'upload_date'),
+}
+
+# Indexes follow the WHERE / GROUP BY shapes the pages actually run.
+ANALYTICS_INDEXES = [
+    # Incidents page filters (severity [+ status]) and dashboard severity counts
+    'CREATE INDEX IF NOT EXISTS idx_incidents_severity_status ON cyber_incidents (severity, status)',
+    # Incidents page "status only" filter
+    'CREATE INDEX IF NOT EXISTS idx_incidents_status ON cyber_incidents (status)',
+    # Category distribution + category × severity bubble chart
+    'CREATE INDEX IF NOT EXISTS idx_incidents_category_severity ON cyber_incidents (category, severity)',
+    'CREATE INDEX IF NOT EXISTS idx_incidents_timestamp ON cyber_incidents (timestamp)',
+
+    # Tickets page filters (priority [+ status]) and priority breakdown
+    'CREATE INDEX IF NOT EXISTS idx_tickets_priority_status ON it_tickets (priority, status)',
+    'CREATE INDEX IF NOT EXISTS idx_tickets_status ON it_tickets (status)',
+    # Assignee filter + staff × priority heatmap
+    'CREATE INDEX IF NOT EXISTS idx_tickets_assigned_priority ON it_tickets (assigned_to, priority)',
+    # Covering index for get_resolution_trend()
+    'CREATE INDEX IF NOT EXISTS idx_tickets_created_resolution ON it_tickets (created_at, resolution_time_hours)',
+
+    # Covering index for get_dataset_growth()
+    'CREATE INDEX IF NOT EXISTS idx_datasets_upload_date_rows ON datasets_metadata (upload_date, rows)',
+    'CREATE INDEX IF NOT EXISTS idx_datasets_uploaded_by ON datasets_metadata (uploaded_by)',
+]
+
+# Checkpoints for the chunked CSV loader (app/data/load_csv.py)
+CSV_LOAD_PROGRESS = [
+    '''
+    CREATE TABLE IF NOT EXISTS csv_load_progress (
+        csv_path TEXT NOT NULL,
+        table_name TEXT NOT NULL,
+        rows_done INTEGER NOT NULL DEFAULT 0,
+        signature TEXT,
+        PRIMARY KEY (csv_path, table_name)
+    )
+    ''',
+]
+
+# Single-column filters for keyset pages: (col, rowid) keeps each filter's
+# rows ordered by primary key, so "col = ? AND id > ? ORDER BY id LIMIT n"
+# stops after n index entries.
+KEYSET_INDEXES = [
+    'CREATE INDEX IF NOT EXISTS idx_incidents_severity ON cyber_incidents (severity)',
+    'CREATE INDEX IF NOT EXISTS idx_tickets_priority ON it_tickets (priority)',
+    'CREATE INDEX IF NOT EXISTS idx_tickets_assigned_to ON it_tickets (assigned_to)',
+]
+
+
+def _fts_index(fts_table, table, key):
+    """
+    External-content FTS5 index over table.description, kept in sync by
+    triggers. The final 'rebuild' backfills rows that already exist.
+    """
+    return [
+        f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5(
+            description,
+            content='{table}',
+            content_rowid='{key}',
+            tokenize='porter unicode61'
         )
-    ''')
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_ai AFTER INSERT ON {table} BEGIN
+            INSERT INTO {fts_table} (rowid, description) VALUES (new.{key}, new.description);
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_ad AFTER DELETE ON {table} BEGIN
+            INSERT INTO {fts_table} ({fts_table}, rowid, description)
+            VALUES ('delete', old.{key}, old.description);
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_au AFTER UPDATE OF description ON {table} BEGIN
+            INSERT INTO {fts_table} ({fts_table}, rowid, description)
+            VALUES ('delete', old.{key}, old.description);
+            INSERT INTO {fts_table} (rowid, description) VALUES (new.{key}, new.description);
+        END
+        ''',
+        f"INSERT INTO {fts_table} ({fts_table}) VALUES ('rebuild')",
+    ]
+
+
+FULL_TEXT_SEARCH = (
+    _fts_index('incidents_fts', 'cyber_incidents', 'incident_id')
+    + _fts_index('tickets_fts', 'it_tickets', 'ticket_id')
+)
+
+
+def _version_triggers(table):
+    """Bump data_versions[table] on every write so caches can tell when data changed."""
+    bump = f"UPDATE data_versions SET version = version + 1 WHERE table_name = '{table}';"
+    return [
+        f"INSERT OR IGNORE INTO data_versions (table_name, version) VALUES ('{table}', 0)",
+        f'CREATE TRIGGER IF NOT EXISTS {table}_version_ai AFTER INSERT ON {table} BEGIN {bump} END',
+        f'CREATE TRIGGER IF NOT EXISTS {table}_version_au AFTER UPDATE ON {table} BEGIN {bump} END',
+        f'CREATE TRIGGER IF NOT EXISTS {table}_version_ad AFTER DELETE ON {table} BEGIN {bump} END',
+    ]
+
+
+DATA_VERSIONS = [
+    '''
+    CREATE TABLE IF NOT EXISTS data_versions (
+        table_name TEXT PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0
+    )
+    ''',
+    *_version_triggers('cyber_incidents'),
+    *_version_triggers('datasets_metadata'),
+    *_version_triggers('it_tickets'),
+]
+
+
+def _embedding_queue_triggers(table, key):
+    """
+    Queue rows whose description changed so the vector index can catch up.
+
+    The bodies avoid conflict clauses on purpose: an outer statement's
+    ON CONFLICT (e.g. load_csv's upsert) overrides a trigger's OR REPLACE,
+    which then fails on the UNIQUE key. A row that is already queued is
+    moved to a fresh, higher rowid instead, so a sync that read the old
+    entry cannot delete the newer one.
+    """
+    def enqueue(row):
+        match = f"table_name = '{table}' AND row_id = {row}.{key}"
+        return (f"UPDATE embedding_queue SET rowid = (SELECT MAX(rowid) + 1 FROM embedding_queue) "
+                f"WHERE {match}; "
+                f"INSERT INTO embedding_queue (table_name, row_id) SELECT '{table}', {row}.{key} "
+                f"WHERE NOT EXISTS (SELECT 1 FROM embedding_queue WHERE {match});")
+    return [
+        f'CREATE TRIGGER IF NOT EXISTS {table}_embed_ai AFTER INSERT ON {table} BEGIN {enqueue("new")} END',
+        f'CREATE TRIGGER IF NOT EXISTS {table}_embed_au AFTER UPDATE OF description ON {table} '
+        f'BEGIN {enqueue("new")} END',
+        f'CREATE TRIGGER IF NOT EXISTS {table}_embed_ad AFTER DELETE ON {table} BEGIN {enqueue("old")} END',
+    ]
+
+
+def _embedding_queue_backfill(table, key):
+    """Everything that already exists still needs embedding."""
+    return f"INSERT OR IGNORE INTO embedding_queue (table_name, row_id) SELECT '{table}', {key} FROM {table}"
 
-    conn.commit()
-    conn.close()
+
+EMBEDDING_QUEUE = [
+    '''
+    CREATE TABLE IF NOT EXISTS embedding_queue (
+        table_name TEXT NOT NULL,
+        row_id INTEGER NOT NULL,
+        UNIQUE (table_name, row_id)
+    )
+    ''',
+    *_embedding_queue_triggers('cyber_incidents', 'incident_id'),
+    _embedding_queue_backfill('cyber_incidents', 'incident_id'),
+    *_embedding_queue_triggers('it_tickets', 'ticket_id'),
+    _embedding_queue_backfill('it_tickets', 'ticket_id'),
+]
+
+
+def _recreate_embedding_queue_triggers(table, key):
+    """Databases at migration 7 still have the INSERT OR REPLACE trigger bodies."""
+    drops = [f'DROP TRIGGER IF EXISTS {table}_embed_{event}' for event in ('ai', 'au', 'ad')]
+    return drops + _embedding_queue_triggers(table, key)
+
+
+EMBEDDING_QUEUE_UPSERT_SAFE = (
+    _recreate_embedding_queue_triggers('cyber_incidents', 'incident_id')
+    + _recreate_embedding_queue_triggers('it_tickets', 'ticket_id')
+)
+
+def _add_hash_algorithm(conn):
+    """Which scheme each password_hash uses; imported legacy hashes are upgraded at login."""
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(users)')}
+    if 'hash_algorithm' not in columns:
+        conn.execute("ALTER TABLE users ADD COLUMN hash_algorithm TEXT NOT NULL DEFAULT 'bcrypt'")
+
+
+USER_HASH_ALGORITHM = [_add_hash_algorithm]
+
+MIGRATIONS = [
+    (1, 'base tables', BASE_TABLES),
+    (2, 'analytics indexes', ANALYTICS_INDEXES),
+    (3, 'csv load checkpoints', CSV_LOAD_PROGRESS),
+    (4, 'keyset pagination indexes', KEYSET_INDEXES),
+    (5, 'full-text search on descriptions', FULL_TEXT_SEARCH),
+    (6, 'data version stamps', DATA_VERSIONS),
+    (7, 'embedding queue for the vector index', EMBEDDING_QUEUE),
+    (8, 'per-user password hash algorithm', USER_HASH_ALGORITHM),
+    (9, 'upsert-safe embedding queue triggers', EMBEDDING_QUEUE_UPSERT_SAFE),
+]
+
+
+def get_schema_version(conn) -> int:
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(db_path: str = DB_PATH) -> int:
+    """
+    Apply every pending migration in order, one transaction each.
+
+    Returns the schema version the database ends up at.
+    """
+    with write_connection(db_path) as conn:
+        current = get_schema_version(conn)
+
+    for version, description, steps in MIGRATIONS:
+        if version <= current:
+            continue
+
+        with write_connection(db_path) as conn:
+            # Re-check inside the write lock in case another session got here first
+            if get_schema_version(conn) >= version:
+                current = version
+                continue
+
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(step)
+            conn.execute(f'PRAGMA user_version = {int(version)}')
+            # Refresh planner statistics so new indexes are actually used
+            conn.execute('ANALYZE')
+
+        current = version
+        print(f'✓ Migration {version} applied: {description}')
+
+    return current
+
+
+_migrated = set()
+_migrated_lock = threading.Lock()
+
+
+def ensure_migrated(db_path: str = DB_PATH) -> None:
+    """migrate() once per process and database; the app calls this at startup."""
+    key = os.path.abspath(db_path)
+    with _migrated_lock:
+        if key not in _migrated:
+            migrate(db_path)
+            _migrated.add(key)
+
+
+def create_tables():
+    migrate()
     print('✓ Tables created / verified successfully.')
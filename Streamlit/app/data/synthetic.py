@@ -0,0 +1,333 @@
+"""
+Seeded synthetic data for scale testing.
+
+Fills cyber_incidents, it_tickets and datasets_metadata with skewed,
+realistic-looking rows: Zipf-distributed categories, assignees and
+uploaders, bursty timestamps (weekday / office-hours rhythm plus attack
+campaigns), long-tail resolution times and dataset sizes, and multi-
+sentence descriptions. Columns are generated with NumPy a chunk at a
+time and written with executemany, one transaction per chunk.
+
+    python -m app.data.synthetic --incidents 1000000 --tickets 500000 --datasets 20000 --seed 7
+
+New rows get ids after the current maximum, so existing data is kept
+(use --replace to empty the tables first).
+
+Each chunk goes through app.data.bulk.write_rows, which does the insert
+triggers' work (full-text index, data version, embedding queue) set-wise.
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app.data.bulk import write_rows
+from app.data.db import DB_PATH, read_connection, write_connection
+from app.data.schema import migrate
+
+CHUNK_ROWS = 50_000
+DEFAULT_DAYS = 365
+MAX_DETAILS = 8              # extra sentences per description
+
+INCIDENT_CATEGORIES = [
+    'Phishing', 'Malware', 'Brute Force', 'Misconfiguration', 'DDoS', 'Ransomware',
+    'Credential Stuffing', 'Insider Threat', 'Data Exfiltration', 'SQL Injection',
+    'Cross-Site Scripting', 'Zero-Day Exploit',
+]
+SEVERITIES = (['low', 'medium', 'high', 'critical'], [0.45, 0.32, 0.17, 0.06])
+INCIDENT_STATUSES = ['open', 'investigating', 'resolved', 'closed']
+
+TICKET_PRIORITIES = (['Low', 'Medium', 'High', 'Critical'], [0.35, 0.38, 0.20, 0.07])
+TICKET_STATUSES = ['Open', 'In Progress', 'On Hold', 'Closed']
+# Median hours to resolve by priority; the lognormal tail does the rest
+RESOLUTION_MEDIAN_HOURS = [72.0, 30.0, 10.0, 3.0]
+
+FIRST_NAMES = ['alex', 'sam', 'jordan', 'taylor', 'morgan', 'casey', 'riley', 'jamie',
+               'devon', 'quinn', 'harper', 'rowan', 'avery', 'parker', 'reese', 'skyler']
+LAST_NAMES = ['smith', 'patel', 'nguyen', 'garcia', 'kowalski', 'okafor', 'ivanova',
+              'chen', 'murphy', 'haddad']
+DATASET_DOMAINS = ['network', 'auth', 'endpoint', 'firewall', 'dns', 'email', 'vpn',
+                   'cloudtrail', 'hr', 'finance', 'sales', 'inventory']
+DATASET_KINDS = ['logs', 'events', 'snapshot', 'export', 'features', 'audit', 'metrics']
+
+# Description fragments; sentences are drawn per row so lengths vary
+INCIDENT_LEADS = {
+    'Phishing': 'Reported phishing email impersonating {org} asking staff to {lure}.',
+    'Malware': 'Endpoint protection flagged {malware} on {host}.',
+    'Brute Force': 'Repeated failed logins against {service} from {ip}.',
+    'Misconfiguration': '{service} found exposed to the internet on {host}.',
+    'DDoS': 'Traffic spike against {service} from {n} distinct sources.',
+    'Ransomware': 'Files on {host} renamed with an unknown extension and a ransom note left.',
+    'Credential Stuffing': 'Burst of logins to {service} using leaked credentials from {ip}.',
+    'Insider Threat': 'Unusual bulk download from {service} by an internal account.',
+    'Data Exfiltration': 'Large outbound transfer from {host} to {ip}.',
+    'SQL Injection': 'WAF blocked injection payloads against {service}.',
+    'Cross-Site Scripting': 'Script payload submitted through a form on {service}.',
+    'Zero-Day Exploit': 'Crash pattern on {host} matching an unpatched {service} flaw.',
+}
+TICKET_LEADS = [
+    'User cannot log in to {service}.', 'Laptop {host} running slowly after update.',
+    'Request for access to the {service} share.', 'Printer on floor {n} not responding.',
+    '{service} returning errors since this morning.', 'VPN drops every few minutes for {org} staff.',
+    'New starter needs accounts set up for {service}.', 'Password reset requested for {service}.',
+    'Disk almost full on {host}.', 'Email attachments to {org} are bouncing.',
+]
+INCIDENT_DETAILS = [
+    'Affected host {host} was isolated pending investigation.',
+    'Logs show activity from {ip} starting around {hour}:00.',
+    'The user confirmed they had clicked the link before reporting it.',
+    'Similar alerts were seen on {n} other machines this week.',
+    'No evidence of lateral movement so far.',
+    'Credentials for the affected account have been rotated.',
+    'Ticket escalated to the {team} team for follow-up.',
+    'A change request was raised to patch {service}.',
+    'Monitoring rules were tuned to catch this pattern earlier.',
+    'Vendor support has been contacted about {service}.',
+    'Backups from the previous night were verified as clean.',
+    'The issue could not be reproduced on a second device.',
+]
+TICKET_DETAILS = [
+    'The user has already tried restarting {host}.',
+    'Started after the update pushed at {hour}:00.',
+    'Affects {n} people in the same team.',
+    'Remote session opened to {host} to take a look.',
+    'Waiting on the user to confirm a time to call.',
+    'Known issue with {service}; linked to the existing problem record.',
+    'Reassigned to the {team} team.',
+    'Workaround given while a fix is scheduled.',
+    'Cache cleared and profile rebuilt.',
+    'Hardware replacement ordered.',
+]
+FILL = {
+    'org': ['the IT helpdesk', 'payroll', 'Microsoft 365', 'the CEO', 'a delivery firm', 'HR'],
+    'lure': ['reset their password', 'open an invoice', 'confirm a payment', 'sign a document'],
+    'malware': ['a trojan dropper', 'a credential stealer', 'a cryptominer', 'a macro downloader'],
+    'service': ['the VPN gateway', 'Exchange', 'the HR portal', 'SharePoint', 'the CRM',
+                'the customer API', 'SSH', 'the file server', 'Jira', 'the payroll system'],
+    'team': ['SOC', 'network', 'desktop support', 'identity', 'cloud platform'],
+}
+
+
+def _zipf_weights(n: int, s: float = 1.1) -> np.ndarray:
+    w = 1.0 / np.arange(1, n + 1) ** s
+    return w / w.sum()
+
+
+def _people(rng: np.random.Generator, n: int) -> list:
+    first = rng.choice(FIRST_NAMES, n)
+    last = rng.choice(LAST_NAMES, n)
+    return sorted({f'{a}.{b}' for a, b in zip(first, last)})
+
+
+# ---------------------------------------------------------
+# Timestamps
+# ---------------------------------------------------------
+def bursty_times(rng: np.random.Generator, n: int, end: datetime, days: int = DEFAULT_DAYS,
+                 burst_share: float = 0.3) -> np.ndarray:
+    """
+    Sorted epoch seconds over the `days` before `end`.
+
+    The background follows a weekly and office-hours rhythm; `burst_share`
+    of the events fall in campaigns (Zipf-sized clusters decaying over a
+    few hours) so some days see many times the usual volume.
+    """
+    start = int((end - timedelta(days=days)).timestamp())
+    n_burst = int(n * burst_share)
+    n_base = n - n_burst
+
+    day_weight = np.where((np.arange(days) + end.weekday() + 1) % 7 >= 5, 0.4, 1.0)
+    day_weight *= rng.lognormal(0.0, 0.25, days)             # day-to-day noise
+    hour_weight = np.array([1, 1, 1, 1, 1, 2, 3, 6, 10, 12, 12, 11,
+                            10, 11, 12, 11, 9, 6, 4, 3, 2, 2, 1, 1], dtype=float)
+    day = rng.choice(days, n_base, p=day_weight / day_weight.sum())
+    hour = rng.choice(24, n_base, p=hour_weight / hour_weight.sum())
+    base = start + day * 86400 + hour * 3600 + rng.integers(0, 3600, n_base)
+
+    campaigns = max(1, days // 7)
+    centers = start + rng.integers(0, days * 86400, campaigns)
+    which = rng.choice(campaigns, n_burst, p=_zipf_weights(campaigns, 1.2))
+    burst = centers[which] + rng.exponential(6 * 3600, n_burst).astype(np.int64)
+
+    times = np.concatenate([base, burst])
+    times = np.minimum(times, int(end.timestamp()))
+    times.sort()
+    return times
+
+
+def _iso(seconds: np.ndarray, unit: str = 's') -> list:
+    return np.datetime_as_string(seconds.astype('datetime64[s]'), unit=unit).tolist()
+
+
+# ---------------------------------------------------------
+# Descriptions
+# ---------------------------------------------------------
+class _Text:
+    """Fills description templates from pre-drawn random columns."""
+
+    def __init__(self, rng: np.random.Generator, n: int, details: list):
+        self._details = details
+        self.host = [f'{p}-{i:04d}' for p, i in zip(rng.choice(['srv', 'wks', 'lap', 'db', 'web'], n),
+                                                     rng.integers(0, 5000, n).tolist())]
+        octets = rng.integers(1, 255, (n, 3)).tolist()
+        self.ip = [f'{"10" if i % 3 else "185"}.{a}.{b}.{c}' for i, (a, b, c) in enumerate(octets)]
+        self.num = rng.integers(2, 60, n).tolist()
+        self.hour = rng.integers(0, 24, n).tolist()
+        self.fill = [{k: v for k, v in zip(FILL, row)}
+                     for row in zip(*(rng.choice(v, n).tolist() for v in FILL.values()))]
+        # Long tail of extra sentences: most rows get 1-3, a few get many;
+        # a random permutation per row keeps them distinct
+        self.extra = np.minimum(rng.geometric(0.45, n), MAX_DETAILS).tolist()
+        self.order = rng.random((n, len(details))).argsort(axis=1)[:, :MAX_DETAILS].tolist()
+
+    def render(self, i: int, lead: str) -> str:
+        values = self.fill[i]
+        values.update(host=self.host[i], ip=self.ip[i], n=self.num[i], hour=f'{self.hour[i]:02d}')
+        parts = [lead] + [self._details[d] for d in self.order[i][:self.extra[i]]]
+        return ' '.join(parts).format(**values)
+
+
+# ---------------------------------------------------------
+# Tables
+# ---------------------------------------------------------
+def _incident_rows(rng, ids, times, now):
+    n = len(ids)
+    category = rng.choice(len(INCIDENT_CATEGORIES), n, p=_zipf_weights(len(INCIDENT_CATEGORIES)))
+    severity = rng.choice(SEVERITIES[0], n, p=SEVERITIES[1])
+    # Older incidents are more likely to be wrapped up (time constant ~7 days)
+    age_days = (now - times) / 86400
+    done = rng.random(n) < 1 - np.exp(-age_days / 7)
+    status = np.where(done, rng.choice(INCIDENT_STATUSES[2:], n, p=[0.4, 0.6]),
+                      rng.choice(INCIDENT_STATUSES[:2], n, p=[0.55, 0.45]))
+    text = _Text(rng, n, INCIDENT_DETAILS)
+    descriptions = [text.render(i, INCIDENT_LEADS[INCIDENT_CATEGORIES[c]])
+                    for i, c in enumerate(category.tolist())]
+    return list(zip(ids.tolist(), _iso(times), severity.tolist(),
+                    [INCIDENT_CATEGORIES[c] for c in category.tolist()],
+                    status.tolist(), descriptions))
+
+
+def _ticket_rows(rng, ids, times, now, staff):
+    n = len(ids)
+    priority = rng.choice(len(TICKET_PRIORITIES[0]), n, p=TICKET_PRIORITIES[1])
+    assignee = rng.choice(len(staff), n, p=_zipf_weights(len(staff), 1.0))
+    unassigned = rng.random(n) < 0.05
+    hours = np.maximum(1, np.rint(
+        np.array(RESOLUTION_MEDIAN_HOURS)[priority] * rng.lognormal(0.0, 1.1, n)
+    )).astype(np.int64)
+    # Closed once the resolution time has passed; otherwise still in flight
+    closed = times + hours * 3600 <= now
+    status = np.where(closed, 'Closed', rng.choice(TICKET_STATUSES[:3], n, p=[0.5, 0.35, 0.15]))
+    text = _Text(rng, n, TICKET_DETAILS)
+    leads = rng.integers(0, len(TICKET_LEADS), n).tolist()
+    descriptions = [text.render(i, TICKET_LEADS[lead]) for i, lead in enumerate(leads)]
+    return list(zip(
+        ids.tolist(),
+        [TICKET_PRIORITIES[0][p] for p in priority.tolist()],
+        descriptions,
+        status.tolist(),
+        [None if u else staff[a] for a, u in zip(assignee.tolist(), unassigned.tolist())],
+        _iso(times),
+        [h if c else None for h, c in zip(hours.tolist(), closed.tolist())],
+    ))
+
+
+def _dataset_rows(rng, ids, times, now, uploaders):
+    n = len(ids)
+    domain = rng.choice(DATASET_DOMAINS, n, p=_zipf_weights(len(DATASET_DOMAINS), 0.9))
+    kind = rng.choice(DATASET_KINDS, n)
+    # Pareto-ish sizes: most datasets are small, a few are enormous
+    rows = np.minimum(np.rint(1000 * (rng.pareto(1.1, n) + 1)), 500_000_000).astype(np.int64)
+    columns = np.clip(np.rint(rng.lognormal(np.log(18), 0.8, n)), 2, 400).astype(np.int64)
+    uploader = rng.choice(len(uploaders), n, p=_zipf_weights(len(uploaders), 1.2))
+    return list(zip(
+        ids.tolist(),
+        [f'{d}_{k}_{i}' for d, k, i in zip(domain.tolist(), kind.tolist(), ids.tolist())],
+        rows.tolist(), columns.tolist(),
+        [uploaders[u] for u in uploader.tolist()],
+        _iso(times, unit='D'),
+    ))
+
+
+TABLES = {
+    # table: (key, columns, row builder)
+    'cyber_incidents': ('incident_id',
+                        ('incident_id', 'timestamp', 'severity', 'category', 'status', 'description'),
+                        _incident_rows),
+    'it_tickets': ('ticket_id',
+                   ('ticket_id', 'priority', 'description', 'status', 'assigned_to', 'created_at',
+                    'resolution_time_hours'),
+                   _ticket_rows),
+    'datasets_metadata': ('dataset_id',
+                          ('dataset_id', 'name', 'rows', 'columns', 'uploaded_by', 'upload_date'),
+                          _dataset_rows),
+}
+
+
+def generate_table(table: str, n: int, seed: int = 0, days: int = DEFAULT_DAYS,
+                   end: datetime | None = None, chunk_rows: int = CHUNK_ROWS,
+                   db_path: str = DB_PATH) -> dict:
+    """
+    Append `n` synthetic rows to `table`, spread over the `days` before
+    `end` (default now). The same seed, end and chunk size give the same rows.
+    Returns a stats dict (rows, seconds, rows_per_sec).
+    """
+    key, columns, build = TABLES[table]
+    end = end or datetime.now().replace(microsecond=0)
+    now = int(end.timestamp())
+    rng = np.random.default_rng([seed, list(TABLES).index(table)])
+
+    extra = {}
+    if table == 'it_tickets':
+        extra['staff'] = _people(rng, 40)
+    elif table == 'datasets_metadata':
+        extra['uploaders'] = _people(rng, 25)
+
+    with read_connection(db_path) as conn:
+        first_id = (conn.execute(f'SELECT MAX({key}) FROM {table}').fetchone()[0] or 0) + 1
+
+    times = bursty_times(rng, n, end, days)
+    sql = f'INSERT INTO {table} ({", ".join(columns)}) VALUES ({", ".join("?" * len(columns))})'
+    started = time.perf_counter()
+    for lo in range(0, n, chunk_rows):
+        hi = min(n, lo + chunk_rows)
+        ids = np.arange(first_id + lo, first_id + hi, dtype=np.int64)
+        rows = build(rng, ids, times[lo:hi], now, **extra)
+        with write_connection(db_path) as conn:
+            write_rows(conn, table, key, sql, rows, ids.tolist())
+
+    elapsed = time.perf_counter() - started
+    rate = n / elapsed if elapsed > 0 else float(n)
+    print(f'✓ Generated {n:,} rows into {table} ({rate:,.0f} rows/s)')
+    return {'rows': n, 'seconds': elapsed, 'rows_per_sec': rate}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fill the platform tables with synthetic data')
+    parser.add_argument('--incidents', type=int, default=0)
+    parser.add_argument('--tickets', type=int, default=0)
+    parser.add_argument('--datasets', type=int, default=0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--days', type=int, default=DEFAULT_DAYS, help='history to spread rows over')
+    parser.add_argument('--end', type=datetime.fromisoformat, default=None,
+                        help='latest timestamp (ISO date or datetime); pin it for reproducible output')
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    parser.add_argument('--replace', action='store_true', help='delete existing rows first')
+    parser.add_argument('--db', default=DB_PATH)
+    args = parser.parse_args()
+
+    migrate(args.db)
+    counts = {'cyber_incidents': args.incidents, 'it_tickets': args.tickets,
+              'datasets_metadata': args.datasets}
+    for table, n in counts.items():
+        if not n:
+            continue
+        if args.replace:
+            with write_connection(args.db) as conn:
+                conn.execute(f'DELETE FROM {table}')
+        generate_table(table, n, args.seed, args.days, args.end, chunk_rows=args.chunk_rows, db_path=args.db)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,26 +1,96 @@
+import argparse
 import os
-from app.data.db import get_connection
+from itertools import islice
 
-def migrate_users_from_txt(txt_path='DATA/users.txt'):
+from app.data.db import DB_PATH, write_connection
+from app.services.password_hasher import detect_scheme
+
+DELIMITERS = ['|', ',', ':', '\t', ';']
+SNIFF_LINES = 50
+
+
+def detect_delimiter(lines):
+    """
+    The delimiter that splits the most sample lines into a username and a
+    recognisable hash (bcrypt hashes contain '$', '.' and '/', so those are
+    never candidates).
+    """
+    def score(delimiter):
+        hits = 0
+        for line in lines:
+            parts = line.split(delimiter, 1)
+            if len(parts) == 2 and parts[0].strip() and detect_scheme(parts[1].strip()):
+                hits += 1
+        return hits
+
+    best = max(DELIMITERS, key=score)
+    return best if score(best) else None
+
+
+def _records(f, delimiter, stats):
+    """(username, password_hash, hash_algorithm) for every usable line; counts the rest."""
+    for line in f:
+        line = line.strip()
+        if not line:
+            continue
+        stats['lines'] += 1
+        username, sep, password_hash = line.partition(delimiter)
+        username, password_hash = username.strip(), password_hash.strip()
+        algorithm = detect_scheme(password_hash) if sep and username else None
+        if algorithm is None:
+            stats['skipped'] += 1
+            continue
+        stats[algorithm] = stats.get(algorithm, 0) + 1
+        yield username, password_hash, algorithm
+
+
+def migrate_users_from_txt(txt_path='DATA/users.txt', db_path=DB_PATH):
+    """
+    Import `username<delimiter>hash` lines into the users table.
+
+    The file is streamed through one executemany in a single transaction,
+    so it is never held in memory and a failure leaves nothing half-done.
+    The delimiter and each line's hash scheme are detected; legacy SHA-256
+    hashes are stored as such and upgraded to bcrypt at the user's next
+    login. Existing usernames are left untouched.
+    """
     if not os.path.exists(txt_path):
         print(f'users.txt not found at {txt_path}')
-        return
+        return None
+
+    with open(txt_path, 'r', encoding='utf-8') as f:
+        sample = [line.strip() for line in islice(f, SNIFF_LINES) if line.strip()]
+    delimiter = detect_delimiter(sample)
+    if delimiter is None:
+        print(f'Could not recognise the format of {txt_path} (expected username<delimiter>hash)')
+        return None
+
+    stats = {'lines': 0, 'skipped': 0}
+    with write_connection(db_path) as conn, open(txt_path, 'r', encoding='utf-8') as f:
+        before = conn.total_changes
+        conn.executemany(
+            '''
+            INSERT OR IGNORE INTO users (username, password_hash, hash_algorithm)
+            VALUES (?, ?, ?)
+            ''',
+            _records(f, delimiter, stats),
+        )
+        stats['inserted'] = conn.total_changes - before
 
-    conn = get_connection()
-    cursor = conn.cursor()
+    schemes = ', '.join(f'{stats[k]} {k}' for k in ('bcrypt', 'sha256') if stats.get(k))
+    print(f'✓ Users migrated from {txt_path} (delimiter {delimiter!r}): '
+          f'{stats["inserted"]} new of {stats["lines"]} lines [{schemes or "none"}], '
+          f'{stats["skipped"]} unrecognised')
+    return stats
 
-    with open(txt_path, 'r') as f:
-        for line in f:
-            if not line.strip():
-                continue
 
-            username, password_hash = line.strip().split(',', 1)
+def main():
+    parser = argparse.ArgumentParser(description='Import users from a legacy users.txt')
+    parser.add_argument('txt_path', nargs='?', default='DATA/users.txt')
+    parser.add_argument('--db', default=DB_PATH)
+    args = parser.parse_args()
+    migrate_users_from_txt(args.txt_path, args.db)
 
-            cursor.execute('''
-                INSERT OR IGNORE INTO users (username, password_hash)
-                VALUES (?, ?)
-            ''', (username, password_hash))
 
-    conn.commit()
-    conn.close()
-    print('✓ Users migrated successfully from users.txt')
+if __name__ == '__main__':
+    main()
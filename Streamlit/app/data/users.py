@@ -1,6 +1,8 @@
 import sqlite3
-import bcrypt
-from app.data.db import get_connection
+from typing import Iterable
+
+from app.data.db import DB_PATH, read_connection, write_connection
+from app.services.password_hasher import get_hasher
 
 
 # ------------------------------
@@ -8,77 +10,104 @@ from app.data.db import get_connection
 # ------------------------------
 
 def hash_password(plain_text_password: str) -> str:
-    """Return a bcrypt hash for the given plain‐text password."""
-    password_bytes = plain_text_password.encode("utf-8")
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password_bytes, salt)
-    return hashed.decode("utf-8")  # store as TEXT in SQLite
+    """Return a bcrypt hash (at BCRYPT_ROUNDS) for the given plain‐text password."""
+    return get_hasher().hash(plain_text_password)  # store as TEXT in SQLite
 
 
-def verify_password(plain_text_password: str, hashed_password: str) -> bool:
-    """Check a plain password against a stored bcrypt hash."""
-    password_bytes = plain_text_password.encode("utf-8")
-    hashed_bytes = hashed_password.encode("utf-8")
-    return bcrypt.checkpw(password_bytes, hashed_bytes)
+def verify_password(plain_text_password: str, hashed_password: str, algorithm: str = "bcrypt") -> bool:
+    """Check a plain password against a stored hash (bcrypt, or a migrated legacy scheme)."""
+    return get_hasher().verify(plain_text_password, hashed_password, algorithm)
 
 
 # ------------------------------
 # User CRUD / auth helpers
 # ------------------------------
 
-def create_user(username: str, password: str) -> bool:
+def create_user(username: str, password: str, db_path: str = DB_PATH) -> bool:
     """
     Create a new user with a hashed password.
 
     Returns True if created, False if the username already exists
     or another DB error occurs.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
+    if get_user(username, db_path) is not None:
+        return False  # checked first so a duplicate costs no hashing
 
     password_hash = hash_password(password)
 
     try:
-        cursor.execute(
-            "INSERT INTO users (username, password_hash) VALUES (?, ?)",
-            (username, password_hash),
-        )
-        conn.commit()
+        with write_connection(db_path) as conn:
+            conn.execute(
+                "INSERT INTO users (username, password_hash) VALUES (?, ?)",
+                (username, password_hash),
+            )
         return True
     except sqlite3.IntegrityError:
         # UNIQUE(username) violation → user already exists
         return False
-    finally:
-        conn.close()
 
 
-def get_user(username: str):
+def get_user(username: str, db_path: str = DB_PATH):
     """
-    Fetch a single user row.
+    Fetch a single user row (an index lookup on the UNIQUE username).
 
     Returns (username, password_hash, role) or None if not found.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        "SELECT username, password_hash, role FROM users WHERE username = ?",
-        (username,),
-    )
-    row = cursor.fetchone()
-    conn.close()
-    return row
-
-
-def verify_user(username: str, password: str) -> bool:
+    with read_connection(db_path) as conn:
+        return conn.execute(
+            "SELECT username, password_hash, role FROM users WHERE username = ?",
+            (username,),
+        ).fetchone()
+
+
+def verify_user(username: str, password: str, db_path: str = DB_PATH) -> bool:
     """
     Check login credentials.
 
     Returns True if username exists and password matches,
     otherwise False.
     """
-    user = get_user(username)
+    with read_connection(db_path) as conn:
+        user = conn.execute(
+            "SELECT password_hash, hash_algorithm FROM users WHERE username = ?",
+            (username,),
+        ).fetchone()
     if user is None:
         return False
 
-    stored_username, stored_hash, role = user
-    return verify_password(password, stored_hash)
+    stored_hash, algorithm = user
+    return verify_password(password, stored_hash, algorithm)
+
+
+# ------------------------------
+# Bulk helpers (provisioning)
+# ------------------------------
+
+def existing_usernames(usernames: Iterable[str], db_path: str = DB_PATH) -> set:
+    """The subset of `usernames` already registered."""
+    names = list(usernames)
+    found = set()
+    with read_connection(db_path) as conn:
+        # Stay under SQLite's bound-parameter limit
+        for i in range(0, len(names), 500):
+            chunk = names[i:i + 500]
+            found.update(row[0] for row in conn.execute(
+                f"SELECT username FROM users WHERE username IN ({','.join('?' * len(chunk))})",
+                chunk,
+            ))
+    return found
+
+
+def insert_users(rows: Iterable[tuple], db_path: str = DB_PATH) -> int:
+    """
+    Insert (username, password_hash, role) rows in one transaction.
+
+    Usernames that already exist are skipped; returns the number inserted.
+    """
+    with write_connection(db_path) as conn:
+        before = conn.total_changes
+        conn.executemany(
+            "INSERT OR IGNORE INTO users (username, password_hash, role) VALUES (?, ?, ?)",
+            rows,
+        )
+        return conn.total_changes - before
@@ -0,0 +1,23 @@
+from app.data.db import DB_PATH, read_connection
+
+# Tables whose contents feed the dashboards and the AI assistant
+TRACKED_TABLES = ('cyber_incidents', 'datasets_metadata', 'it_tickets')
+
+
+def get_table_versions(db_path=DB_PATH):
+    """
+    Per-table write counters maintained by triggers (migration 6).
+
+    Returns {table_name: version}; a value only changes when that table
+    is inserted into, updated or deleted from.
+    """
+    with read_connection(db_path) as conn:
+        rows = conn.execute('SELECT table_name, version FROM data_versions').fetchall()
+    versions = dict(rows)
+    return {t: versions.get(t, 0) for t in TRACKED_TABLES}
+
+
+def get_data_version(db_path=DB_PATH):
+    """Single stamp for "has any tracked table changed?", e.g. '12.3.40'."""
+    versions = get_table_versions(db_path)
+    return '.'.join(str(versions[t]) for t in TRACKED_TABLES)
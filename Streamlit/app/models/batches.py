@@ -0,0 +1,256 @@
+"""
+Columnar ("struct-of-arrays") batches for the table models.
+
+A batch holds one compact array per column instead of one Python object
+per row:
+    id       → int64 NumPy array
+    category → pandas Categorical (small integer codes + one label list)
+    int      → nullable pandas IntegerArray (int64 values + bool mask)
+    text     → object NumPy array
+
+Batches are built straight from a cursor in fetchmany() chunks and turn
+into a DataFrame without copying the column arrays. The single-row
+models (SecurityIncident, Dataset, ITTicket) are still available through
+batch.row(i) / iteration for CRUD code that works with one record.
+"""
+
+from abc import ABC, abstractmethod
+
+import numpy as np
+import pandas as pd
+
+from app.models.security_incident import SecurityIncident
+from app.models.dataset import Dataset
+from app.models.it_ticket import ITTicket
+
+FETCH_CHUNK = 50_000
+
+
+class _ColumnBuilder:
+    """Accumulates one column chunk by chunk in its compact representation."""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.parts = []
+        self.mask_parts = []
+        self.lookup = {}          # category label → code
+
+    def add(self, values: tuple):
+        n = len(values)
+        if self.kind == "id":
+            self.parts.append(np.fromiter(values, dtype=np.int64, count=n))
+        elif self.kind == "category":
+            lookup = self.lookup
+            self.parts.append(np.fromiter(
+                (-1 if v is None else lookup.setdefault(v, len(lookup)) for v in values),
+                dtype=np.int32, count=n,
+            ))
+        elif self.kind == "int":
+            mask = np.fromiter((v is None for v in values), dtype=bool, count=n)
+            self.mask_parts.append(mask)
+            self.parts.append(np.fromiter(
+                (0 if v is None else int(v) for v in values), dtype=np.int64, count=n,
+            ))
+        else:
+            arr = np.empty(n, dtype=object)
+            arr[:] = values
+            self.parts.append(arr)
+
+    def finish(self):
+        if self.kind == "category":
+            codes = np.concatenate(self.parts) if self.parts else np.empty(0, dtype=np.int32)
+            return pd.Categorical.from_codes(codes, categories=list(self.lookup))
+
+        if self.kind == "int":
+            values = np.concatenate(self.parts) if self.parts else np.empty(0, dtype=np.int64)
+            mask = np.concatenate(self.mask_parts) if self.mask_parts else np.empty(0, dtype=bool)
+            return pd.arrays.IntegerArray(values, mask)
+
+        dtype = np.int64 if self.kind == "id" else object
+        return np.concatenate(self.parts) if self.parts else np.empty(0, dtype=dtype)
+
+
+class _ColumnarBatch(ABC):
+    """
+    Shared machinery. Subclasses declare:
+      TABLE / KEY – source table and its primary key (first column)
+      COLUMNS     – table columns in the same order as FIELDS
+      SELECT_SQL  – "SELECT <COLUMNS> FROM <TABLE>"
+      FIELDS      – [(attribute, kind, DataFrame label), ...]
+    """
+
+    TABLE = ""
+    KEY = ""
+    COLUMNS = ()
+    SELECT_SQL = ""
+    FIELDS = []
+
+    def __init__(self, columns: dict):
+        self._columns = columns
+        self._length = len(next(iter(columns.values()))) if columns else 0
+
+    # -----------------------------
+    # Construction
+    # -----------------------------
+    @classmethod
+    def from_cursor(cls, cursor, chunk_size: int = FETCH_CHUNK):
+        """Build a batch from an executed cursor without materialising all rows at once."""
+        builders = [_ColumnBuilder(kind) for _, kind, _ in cls.FIELDS]
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            for builder, values in zip(builders, zip(*rows)):
+                builder.add(values)
+        return cls({name: b.finish() for (name, _, _), b in zip(cls.FIELDS, builders)})
+
+    @classmethod
+    def from_rows(cls, rows):
+        builders = [_ColumnBuilder(kind) for _, kind, _ in cls.FIELDS]
+        if rows:
+            for builder, values in zip(builders, zip(*rows)):
+                builder.add(values)
+        return cls({name: b.finish() for (name, _, _), b in zip(cls.FIELDS, builders)})
+
+    @classmethod
+    def load(cls, db, where: str = "", params=()):
+        """Run SELECT_SQL (+ optional WHERE/ORDER/LIMIT tail) on a DatabaseManager."""
+        with db.reader() as conn:
+            return cls.from_cursor(conn.execute(f"{cls.SELECT_SQL} {where}", params))
+
+    # -----------------------------
+    # Access
+    # -----------------------------
+    def __len__(self):
+        return self._length
+
+    def column(self, name: str):
+        return self._columns[name]
+
+    def __iter__(self):
+        for i in range(self._length):
+            yield self.row(i)
+
+    def _value(self, name: str, i: int):
+        value = self._columns[name][i]
+        if value is pd.NA or (isinstance(value, float) and np.isnan(value)):
+            return None
+        return value.item() if isinstance(value, np.generic) else value
+
+    @abstractmethod
+    def row(self, i: int):
+        """
+        Row i as its single-row model. The values are copied out: the
+        models are mutable (update_status(), assign(), close()) and must
+        not write into arrays the batch and its DataFrames share.
+        """
+
+    def to_frame(self, extra: dict | None = None) -> pd.DataFrame:
+        """DataFrame using the page column labels; arrays are handed over, not copied."""
+        data = {label: self._columns[name] for name, _, label in self.FIELDS}
+        if extra:
+            data.update(extra)
+        return pd.DataFrame(data, copy=False)
+
+
+# ==============================================================
+#                       CYBER INCIDENTS
+# ==============================================================
+
+SEVERITY_LEVELS = {"low": 1, "medium": 2, "high": 3, "critical": 4}
+
+
+class SecurityIncidentBatch(_ColumnarBatch):
+    TABLE = "cyber_incidents"
+    KEY = "incident_id"
+    COLUMNS = ("incident_id", "category", "severity", "status", "description")
+    SELECT_SQL = f"SELECT {', '.join(COLUMNS)} FROM {TABLE}"
+    FIELDS = [
+        ("id", "id", "ID"),
+        ("incident_type", "category", "Category"),
+        ("severity", "category", "Severity"),
+        ("status", "category", "Status"),
+        ("description", "text", "Description"),
+    ]
+
+    def severity_levels(self) -> np.ndarray:
+        """Vectorised SecurityIncident.get_severity_level(): int8 array, 0 = unknown."""
+        sev = self._columns["severity"]
+        per_category = np.array(
+            [SEVERITY_LEVELS.get(str(c).lower(), 0) for c in sev.categories] + [0],
+            dtype=np.int8,
+        )
+        # code -1 (NULL) indexes the trailing 0
+        return per_category[sev.codes]
+
+    def row(self, i: int) -> SecurityIncident:
+        return SecurityIncident(
+            incident_id=self._value("id", i),
+            incident_type=self._value("incident_type", i),
+            severity=self._value("severity", i),
+            status=self._value("status", i),
+            description=self._value("description", i),
+        )
+
+
+# ==============================================================
+#                          DATASETS
+# ==============================================================
+
+class DatasetBatch(_ColumnarBatch):
+    TABLE = "datasets_metadata"
+    KEY = "dataset_id"
+    COLUMNS = ("dataset_id", "name", "rows", "columns", "uploaded_by", "upload_date")
+    SELECT_SQL = f"SELECT {', '.join(COLUMNS)} FROM {TABLE}"
+    FIELDS = [
+        ("id", "id", "ID"),
+        ("name", "text", "Name"),
+        ("rows", "int", "Rows"),
+        ("columns", "int", "Columns"),
+        ("uploaded_by", "category", "Uploaded By"),
+        ("upload_date", "text", "Upload Date"),
+    ]
+
+    def size_mb(self) -> np.ndarray:
+        """Vectorised Dataset.calculate_size_mb(): float64 array, 0.0 where rows/columns are NULL."""
+        rows = self._columns["rows"].to_numpy(dtype=np.float64, na_value=np.nan)
+        cols = self._columns["columns"].to_numpy(dtype=np.float64, na_value=np.nan)
+        size = np.round(rows * cols * 8 / (1024 * 1024), 2)
+        return np.nan_to_num(size, nan=0.0)
+
+    def row(self, i: int) -> Dataset:
+        return Dataset(
+            dataset_id=self._value("id", i),
+            name=self._value("name", i),
+            rows=self._value("rows", i),
+            columns=self._value("columns", i),
+            uploaded_by=self._value("uploaded_by", i),
+            upload_date=self._value("upload_date", i),
+        )
+
+
+# ==============================================================
+#                          IT TICKETS
+# ==============================================================
+
+class ITTicketBatch(_ColumnarBatch):
+    TABLE = "it_tickets"
+    KEY = "ticket_id"
+    COLUMNS = ("ticket_id", "description", "priority", "status", "assigned_to")
+    SELECT_SQL = f"SELECT {', '.join(COLUMNS)} FROM {TABLE}"
+    FIELDS = [
+        ("id", "id", "ID"),
+        ("title", "text", "Title"),
+        ("priority", "category", "Priority"),
+        ("status", "category", "Status"),
+        ("assigned_to", "category", "Assigned To"),
+    ]
+
+    def row(self, i: int) -> ITTicket:
+        return ITTicket(
+            ticket_id=self._value("id", i),
+            title=self._value("title", i),
+            priority=self._value("priority", i),
+            status=self._value("status", i),
+            assigned_to=self._value("assigned_to", i),
+        )
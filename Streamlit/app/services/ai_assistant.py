@@ -1,23 +1,421 @@
 import requests
 import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Iterator
+
+from requests.adapters import HTTPAdapter
+
+# ---------------------------------------------------------
+# Backend and connection settings (override with environment variables)
+#   AI_BACKEND=ollama    → Ollama's HTTP API at OLLAMA_URL
+#   AI_BACKEND=llamacpp  → GGUF models run in-process (app.services.llama_backend)
+#   AI_BACKEND=stub      → deterministic offline replies (app.services.ollama_stub)
+# ---------------------------------------------------------
+AI_BACKEND = os.environ.get("AI_BACKEND", "ollama")
+OLLAMA_URL = os.environ.get("OLLAMA_URL", "http://localhost:11434")
+CONNECT_TIMEOUT = float(os.environ.get("OLLAMA_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.environ.get("OLLAMA_READ_TIMEOUT", "120"))   # max gap between chunks
+MAX_RETRIES = int(os.environ.get("OLLAMA_MAX_RETRIES", "2"))
+KEEP_ALIVE = os.environ.get("OLLAMA_KEEP_ALIVE")        # e.g. "30m"; unset → Ollama's default (5m)
+BACKOFF_BASE = 0.5          # seconds; attempt n sleeps uniform(0, base * 2**n)
+POOL_SIZE = 10              # keep-alive connections per Ollama host
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) for prompt budgeting."""
+    return len(text) // 4 + 1
+
+
+class AIUnavailableError(RuntimeError):
+    """The local AI engine could not be reached (or the circuit is open)."""
+
+
+class AIRequestError(AIUnavailableError):
+    """The AI engine answered but rejected the request (4xx, e.g. an unknown model)."""
+
+
+@dataclass
+class GenerationStats:
+    """Timing for one generate call."""
+    model: str
+    time_to_first_token: float | None   # seconds until the first token arrived
+    total_seconds: float
+    tokens: int                         # streamed chunks (≈ tokens for Ollama)
+
+    # Reported by Ollama in the final message (durations converted to seconds)
+    load_seconds: float | None = None          # loading the model into memory (cold start)
+    prompt_tokens: int | None = None
+    prompt_seconds: float | None = None        # prompt prefill
+    eval_tokens: int | None = None
+    eval_seconds: float | None = None          # token generation
+
+    @property
+    def tokens_per_sec(self) -> float:
+        if self.eval_tokens and self.eval_seconds:
+            return self.eval_tokens / self.eval_seconds
+        if self.time_to_first_token is None or self.tokens < 2:
+            return 0.0
+        generating = self.total_seconds - self.time_to_first_token
+        return (self.tokens - 1) / generating if generating > 0 else 0.0
+
+    @property
+    def prompt_tokens_per_sec(self) -> float:
+        if self.prompt_tokens and self.prompt_seconds:
+            return self.prompt_tokens / self.prompt_seconds
+        return 0.0
+
+
+def _seconds(ns) -> float | None:
+    return None if ns is None else ns / 1e9
+
+
+class CircuitBreaker:
+    """
+    Stops hammering a dead Ollama process.
+
+    closed    → requests flow; `failure_threshold` consecutive failures open it
+    open      → requests fail fast for `reset_timeout` seconds
+    half-open → one trial request; success closes, failure re-opens
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self._reset_timeout:
+                return "half-open"
+            return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self._reset_timeout:
+                return False
+            if self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._opened_at is not None or self._failures >= self._failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+def _error_detail(res: requests.Response) -> str:
+    """Ollama puts the reason in {"error": ...}; fall back to the raw body."""
+    try:
+        body = res.json()
+        detail = body.get("error") if isinstance(body, dict) else None
+    except ValueError:
+        detail = None
+    finally:
+        res.close()
+    return str(detail or res.text)[:200]
+
+
+# ---------------------------------------------------------
+# One keep-alive session + breaker per Ollama host, shared by
+# every backend / AIAssistant in the process (pages build one per rerun).
+# ---------------------------------------------------------
+_transports = {}
+_transports_lock = threading.Lock()
+
+
+def _shared_transport(base_url: str):
+    with _transports_lock:
+        if base_url not in _transports:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _transports[base_url] = (session, CircuitBreaker())
+        return _transports[base_url]
+
+
+# ---------------------------------------------------------
+# Backends
+#
+# A backend runs the model. generate() yields Ollama-shaped chunks:
+# {"response": "<token>"} while generating, then one final chunk with
+# "done": True, "context" and the load/prompt_eval/eval counts and
+# durations (ns). Every backend also has endpoint, max_parallel,
+# circuit_state, load(), loaded_models() and embed().
+# ---------------------------------------------------------
+class OllamaBackend:
+    """Ollama's HTTP API (/api/generate, /api/embed, /api/ps)."""
+
+    max_parallel = None          # Ollama queues internally (OLLAMA_NUM_PARALLEL)
+
+    def __init__(self, base_url: str = OLLAMA_URL, connect_timeout: float = CONNECT_TIMEOUT,
+                 read_timeout: float = READ_TIMEOUT, max_retries: int = MAX_RETRIES,
+                 session: requests.Session | None = None, breaker: CircuitBreaker | None = None):
+        self._base_url = base_url.rstrip("/")
+        self._timeout = (connect_timeout, read_timeout)
+        self._max_retries = max_retries
+
+        shared_session, shared_breaker = _shared_transport(self._base_url)
+        self._session = session or shared_session
+        self._breaker = breaker or shared_breaker
+
+    @property
+    def endpoint(self) -> str:
+        return self._base_url
+
+    @property
+    def circuit_state(self) -> str:
+        return self._breaker.state
+
+    def _post(self, path: str, payload: dict, stream: bool = False) -> requests.Response:
+        """
+        POST with bounded retries and jittered exponential backoff.
+
+        Only the request itself is retried (connection errors, timeouts
+        before the response starts, 5xx). Once a stream has started we
+        never replay it. Every exit other than a returned response
+        records an outcome with the breaker; the caller records it for
+        responses it reads (see _finish).
+        """
+        if not self._breaker.allow():
+            raise AIUnavailableError(
+                "The AI engine is temporarily unavailable (circuit open). Try again shortly."
+            )
+
+        settled = False
+        try:
+            last_error = None
+            for attempt in range(self._max_retries + 1):
+                if attempt:
+                    time.sleep(random.uniform(0, BACKOFF_BASE * 2 ** attempt))
+                try:
+                    res = self._session.post(
+                        f"{self._base_url}{path}",
+                        json=payload,
+                        stream=stream,
+                        timeout=self._timeout,
+                    )
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    last_error = e
+                    continue
+                except requests.RequestException as e:
+                    raise AIUnavailableError(f"Request to {path} failed: {e}") from e
+
+                if res.status_code >= 500:
+                    res.close()
+                    last_error = requests.HTTPError(f"{res.status_code} from {path}")
+                    continue
+                if res.status_code >= 400:
+                    # The engine is up; the request was wrong, so don't trip the breaker
+                    detail = _error_detail(res)
+                    self._breaker.record_success()
+                    settled = True
+                    raise AIRequestError(f"The AI engine rejected {path} ({res.status_code}): {detail}")
+                settled = True
+                return res
+
+            raise AIUnavailableError(f"Could not reach the AI engine at {self._base_url}: {last_error}")
+        finally:
+            if not settled:
+                self._breaker.record_failure()
+
+    def _finish(self, res: requests.Response, ok: bool):
+        res.close()
+        if ok:
+            self._breaker.record_success()
+        else:
+            self._breaker.record_failure()
+
+    def _json(self, res: requests.Response, path: str) -> dict:
+        """Decode a non-streamed reply; every exit records an outcome with the breaker."""
+        ok = False
+        try:
+            body = res.json()
+            ok = True
+            return body
+        except ValueError as e:
+            raise AIUnavailableError(f"Malformed reply from {path}: {e}") from e
+        finally:
+            self._finish(res, ok)
+
+    def generate(self, model: str, prompt: str, context: list[int] | None = None,
+                 keep_alive: str | None = None) -> Iterator[dict]:
+        payload = {"model": model, "prompt": prompt}
+        if context:
+            payload["context"] = context
+        if keep_alive:
+            payload["keep_alive"] = keep_alive
+        res = self._post("/api/generate", payload, stream=True)
+
+        ok = False
+        try:
+            # No early exit: leaving iter_lines makes urllib3 drop the socket;
+            # reading to the end returns it to the keep-alive pool.
+            for line in res.iter_lines():
+                if line:
+                    yield json.loads(line.decode())
+            ok = True
+        except (requests.ConnectionError, requests.Timeout) as e:
+            # Stalled or dropped mid-stream
+            raise AIUnavailableError(f"The AI engine stopped responding: {e}") from e
+        except ValueError as e:
+            raise AIUnavailableError(f"Malformed chunk from /api/generate: {e}") from e
+        except GeneratorExit:
+            ok = True           # the caller stopped reading; the engine was answering
+            raise
+        finally:
+            self._finish(res, ok)
+
+    def load(self, model: str, keep_alive: str | None = None) -> float:
+        payload = {"model": model, "prompt": "", "stream": False}
+        if keep_alive:
+            payload["keep_alive"] = keep_alive
+        body = self._json(self._post("/api/generate", payload), "/api/generate")
+        return (body.get("load_duration") or 0) / 1e9
+
+    def loaded_models(self) -> list[dict]:
+        try:
+            res = self._session.get(f"{self._base_url}/api/ps", timeout=self._timeout)
+            res.raise_for_status()
+        except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+            raise AIUnavailableError(f"Could not reach the AI engine at {self._base_url}: {e}") from e
+        return res.json().get("models", [])
+
+    def embed(self, model: str, texts: list[str]) -> list[list[float]]:
+        body = self._json(self._post("/api/embed", {"model": model, "input": texts}), "/api/embed")
+        if "embeddings" not in body:
+            raise AIUnavailableError(f"No embeddings in the reply from /api/embed: {body}")
+        return body["embeddings"]
+
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend(kind: str = AI_BACKEND):
+    """The process-wide backend for `kind` (AI_BACKEND by default)."""
+    with _backends_lock:
+        if kind not in _backends:
+            if kind == "ollama":
+                _backends[kind] = OllamaBackend()
+            elif kind == "llamacpp":
+                from app.services.llama_backend import LlamaCppBackend
+                _backends[kind] = LlamaCppBackend()
+            elif kind == "stub":
+                from app.services.ollama_stub import StubBackend, StubConfig
+                _backends[kind] = StubBackend(StubConfig.from_env())
+            else:
+                raise ValueError(f"Unknown AI backend {kind!r} (expected 'ollama', 'llamacpp' or 'stub')")
+        return _backends[kind]
+
 
 class AIAssistant:
     """Handles communication with the local AI engine."""
 
-    def __init__(self, model="phi3:mini"):
+    def __init__(self, model="phi3:mini", backend=None, keep_alive: str | None = KEEP_ALIVE):
         self._model = model
+        self._keep_alive = keep_alive
+        self._backend = backend or get_backend()
+
+        self.last_stats: GenerationStats | None = None
+        self.last_context: list[int] | None = None   # the model's conversation state after the last reply
+        self.history = deque(maxlen=100)      # recent GenerationStats
+
+    @property
+    def model(self) -> str:
+        return self._model
+
+    @property
+    def backend(self):
+        return self._backend
+
+    @property
+    def endpoint(self) -> str:
+        """Where generations run (the Ollama URL, or a pseudo-URL for in-process backends)."""
+        return self._backend.endpoint
+
+    @property
+    def circuit_state(self) -> str:
+        return self._backend.circuit_state
+
+    # -----------------------------
+    # Generation
+    # -----------------------------
+    def ask_stream(self, prompt: str, context: list[int] | None = None) -> Iterator[str]:
+        """
+        Yield response tokens as the model produces them (feeds st.write_stream).
+
+        Pass the `last_context` of the previous reply as `context` to continue
+        a conversation without resending (and re-evaluating) earlier turns.
+        """
+        started = time.perf_counter()
+        first_token_at = None
+        tokens = 0
+        final = {}
+        self.last_context = None
+
+        try:
+            for data in self._backend.generate(self._model, prompt, context, self._keep_alive):
+                token = data.get("response")
+                if token:
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                    tokens += 1
+                    yield token
+                if data.get("done"):
+                    self.last_context = data.get("context")
+                    final = data
+        finally:
+            now = time.perf_counter()
+            self.last_stats = GenerationStats(
+                model=self._model,
+                time_to_first_token=None if first_token_at is None else first_token_at - started,
+                total_seconds=now - started,
+                tokens=tokens,
+                load_seconds=_seconds(final.get("load_duration")),
+                prompt_tokens=final.get("prompt_eval_count"),
+                prompt_seconds=_seconds(final.get("prompt_eval_duration")),
+                eval_tokens=final.get("eval_count"),
+                eval_seconds=_seconds(final.get("eval_duration")),
+            )
+            self.history.append(self.last_stats)
+
+    def ask(self, prompt: str, context: list[int] | None = None):
+        return "".join(self.ask_stream(prompt, context))
+
+    def warm_up(self) -> float:
+        """
+        Load the model without generating anything and pin it for `keep_alive`.
+        Returns the seconds spent loading it (≈0 if it was already resident).
+        """
+        return self._backend.load(self._model, self._keep_alive)
+
+    def loaded_models(self) -> list[dict]:
+        """Models currently held in memory by the backend, with their expiry."""
+        return self._backend.loaded_models()
 
-    def ask(self, prompt: str):
-        res = requests.post(
-            "http://localhost:11434/api/generate",
-            json={"model": self._model, "prompt": prompt},
-            stream=True
-        )
-
-        reply = ""
-        for line in res.iter_lines():
-            if line:
-                data = json.loads(line.decode())
-                if "response" in data:
-                    reply += data["response"]
-        return reply
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        """One embedding per text (use an embedding model)."""
+        return self._backend.embed(self._model, texts)
@@ -0,0 +1,108 @@
+import os
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+from app.data.db import get_pool
+from app.services.ai_assistant import GenerationStats
+
+# Separate file, like the response cache, so telemetry writes never touch
+# the main database or its data-version stamps.
+METRICS_DB_PATH = os.path.join('DATA', 'ai_metrics.db')
+RETENTION_DAYS = 30
+PRUNE_EVERY = 500            # inserts between retention sweeps
+COLD_LOAD_SECONDS = 0.5      # load_duration above this means the model was not resident
+
+_SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS ai_calls (
+        id INTEGER PRIMARY KEY,
+        ts REAL NOT NULL,
+        model TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        ok INTEGER NOT NULL,
+        error TEXT,
+        subscribers INTEGER,
+        queue_wait REAL,
+        time_to_first_token REAL,
+        total_seconds REAL,
+        load_seconds REAL,
+        prompt_tokens INTEGER,
+        prompt_seconds REAL,
+        eval_tokens INTEGER,
+        eval_seconds REAL
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_ai_calls_ts ON ai_calls (ts)',
+]
+
+COLUMNS = ['ts', 'model', 'kind', 'ok', 'error', 'subscribers', 'queue_wait',
+           'time_to_first_token', 'total_seconds', 'load_seconds', 'prompt_tokens',
+           'prompt_seconds', 'eval_tokens', 'eval_seconds']
+
+_ready_paths = set()
+_lock = threading.Lock()
+_inserts = {}
+
+
+class MetricsStore:
+    """Per-call Ollama timings (one row per generation) for the telemetry page."""
+
+    def __init__(self, db_path: str = METRICS_DB_PATH):
+        self._db_path = db_path
+        self._pool = get_pool(db_path)
+        key = os.path.abspath(db_path)
+        with _lock:
+            ready = key in _ready_paths
+        if not ready:
+            with self._pool.writer() as conn:
+                for sql in _SCHEMA:
+                    conn.execute(sql)
+            with _lock:
+                _ready_paths.add(key)
+
+    def record(self, stats: GenerationStats | None, model: str, kind: str = 'generate',
+               error: Exception | None = None, queue_wait: float | None = None,
+               subscribers: int = 1):
+        """Best effort: telemetry must never fail the request it describes."""
+        s = stats
+        row = (
+            time.time(), model, kind, int(error is None),
+            None if error is None else f'{type(error).__name__}: {error}'[:500],
+            subscribers, queue_wait,
+            s and s.time_to_first_token, s and s.total_seconds, s and s.load_seconds,
+            s and s.prompt_tokens, s and s.prompt_seconds, s and s.eval_tokens, s and s.eval_seconds,
+        )
+        try:
+            with self._pool.writer() as conn:
+                conn.execute(
+                    f'INSERT INTO ai_calls ({", ".join(COLUMNS)}) '
+                    f'VALUES ({", ".join("?" * len(COLUMNS))})',
+                    row,
+                )
+                if self._count_insert() % PRUNE_EVERY == 0:
+                    conn.execute('DELETE FROM ai_calls WHERE ts < ?',
+                                 (time.time() - RETENTION_DAYS * 86400,))
+        except sqlite3.Error:
+            pass
+
+    def _count_insert(self) -> int:
+        with _lock:
+            key = os.path.abspath(self._db_path)
+            _inserts[key] = _inserts.get(key, 0) + 1
+            return _inserts[key]
+
+    def calls(self, since_seconds: float) -> pd.DataFrame:
+        """Calls in the last `since_seconds`, oldest first, with derived rates."""
+        with self._pool.reader() as conn:
+            rows = conn.execute(
+                f'SELECT {", ".join(COLUMNS)} FROM ai_calls WHERE ts >= ? ORDER BY ts',
+                (time.time() - since_seconds,),
+            ).fetchall()
+        df = pd.DataFrame(rows, columns=COLUMNS)
+        df['time'] = pd.to_datetime(df['ts'], unit='s')
+        df['prompt_tps'] = df['prompt_tokens'] / df['prompt_seconds'].where(df['prompt_seconds'] > 0)
+        df['eval_tps'] = df['eval_tokens'] / df['eval_seconds'].where(df['eval_seconds'] > 0)
+        return df
@@ -0,0 +1,337 @@
+import copy
+import hashlib
+import heapq
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from app.services.ai_assistant import AIAssistant, AIUnavailableError, GenerationStats
+from app.services.ai_metrics import MetricsStore
+
+# ---------------------------------------------------------
+# Ollama serves a handful of generations at once (OLLAMA_NUM_PARALLEL);
+# anything beyond that only slows every request down, so the app queues
+# instead. Lower priority numbers are served first.
+# ---------------------------------------------------------
+MAX_CONCURRENT = int(os.environ.get("OLLAMA_MAX_CONCURRENT", "2"))
+INTERACTIVE = 0          # a person is watching the answer stream
+BACKGROUND = 10          # summaries, compaction and other batch work
+WAIT_SAMPLES = 1000      # queue waits kept for the percentiles
+WARMUP = os.environ.get("OLLAMA_WARMUP", "0") == "1"   # load the model when the app starts
+
+log = logging.getLogger(__name__)
+
+
+class Flight:
+    """
+    One generation, shared by every caller that asked for the same prompt
+    while it was queued or running. Tokens are buffered, so a caller that
+    joins late replays them from the start.
+    """
+
+    def __init__(self, scheduler: "AIScheduler", key: str, ai: AIAssistant,
+                 prompt: str, context: list | None, priority: int):
+        self.key = key
+        self.priority = priority
+        self.submitted_at = time.monotonic()
+        self.started_at: float | None = None
+        self.stats: GenerationStats | None = None
+        self.context: list | None = None
+        self.error: Exception | None = None
+        self.done = False
+        self.subscribers = 1
+        self._seq = 0                     # heap sequence number of the live entry
+        self._scheduler = scheduler
+        self._ai = ai
+        self._prompt = prompt
+        self._request_context = context
+        self._tokens = []
+        self._cond = threading.Condition()
+
+    @property
+    def shared(self) -> bool:
+        return self.subscribers > 1
+
+    @property
+    def queue_wait(self) -> float | None:
+        return None if self.started_at is None else self.started_at - self.submitted_at
+
+    def position(self) -> int:
+        """1-based place in the queue (0 once the generation has started)."""
+        return self._scheduler._position(self)
+
+    def wait_started(self, timeout: float | None = None) -> bool:
+        with self._cond:
+            return self._cond.wait_for(lambda: self.started_at is not None or self.done, timeout)
+
+    # -----------------------------
+    # Worker side
+    # -----------------------------
+    def _run(self):
+        # started_at was set by the scheduler when it dequeued this flight
+        with self._cond:
+            self._cond.notify_all()
+        # A private copy so concurrent flights never share last_stats / last_context
+        ai = copy.copy(self._ai)
+        try:
+            for token in ai.ask_stream(self._prompt, self._request_context):
+                with self._cond:
+                    self._tokens.append(token)
+                    self._cond.notify_all()
+        except Exception as e:
+            self.error = e
+        finally:
+            with self._cond:
+                self.stats = ai.last_stats
+                self.context = ai.last_context
+                self.done = True
+                self._cond.notify_all()
+
+    # -----------------------------
+    # Caller side
+    # -----------------------------
+    def stream(self) -> "Subscription":
+        """
+        Iterate the tokens as they are generated (re-raises the generation's
+        error). Close the subscription, or use it as a context manager, if
+        the caller might stop before reading it to the end.
+        """
+        return Subscription(self)
+
+    def result(self) -> str:
+        with self.stream() as tokens:
+            return "".join(tokens)
+
+
+class Subscription:
+    """
+    One caller's interest in a Flight. Reaching the end or close() releases
+    it exactly once, even if iteration never started (e.g. the Streamlit
+    script was stopped while the request was still queued).
+    """
+
+    def __init__(self, flight: Flight):
+        self._flight = flight
+        self._read = 0
+        self._closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        flight = self._flight
+        if self._closed:
+            raise StopIteration
+        try:
+            with flight._cond:
+                flight._cond.wait_for(lambda: len(flight._tokens) > self._read or flight.done)
+                if len(flight._tokens) > self._read:
+                    self._read += 1
+                    return flight._tokens[self._read - 1]
+        except BaseException:
+            self.close()
+            raise
+        self.close()
+        if flight.error:
+            raise flight.error
+        raise StopIteration
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._flight._scheduler._release(self._flight)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class AIScheduler:
+    """Process-wide queue in front of one inference backend."""
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT, metrics: MetricsStore | None = None):
+        self._max_concurrent = max(1, max_concurrent)
+        self._metrics = metrics
+        self._lock = threading.Lock()
+        self._work = threading.Condition(self._lock)
+        self._heap = []                 # (priority, seq, flight)
+        self._seq = itertools.count()
+        self._flights = {}              # key -> queued or running Flight
+        self._running = 0
+        self._waits = deque(maxlen=WAIT_SAMPLES)
+        self._counters = {"submitted": 0, "deduplicated": 0, "completed": 0, "abandoned": 0}
+        for n in range(self._max_concurrent):
+            threading.Thread(target=self._worker, name=f"ai-scheduler-{n}", daemon=True).start()
+
+    @staticmethod
+    def _key(model: str, prompt: str, context: list | None) -> str:
+        raw = json.dumps([model, prompt, context or []], separators=(",", ":"))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def submit(self, ai: AIAssistant, prompt: str, context: list | None = None,
+               priority: int = INTERACTIVE) -> Flight:
+        """Queue a generation, or join an identical one that is already queued / running."""
+        key = self._key(ai.model, prompt, context)
+        with self._lock:
+            self._counters["submitted"] += 1
+            flight = self._flights.get(key)
+            if flight is not None:
+                flight.subscribers += 1
+                self._counters["deduplicated"] += 1
+                if priority < flight.priority and flight.started_at is None:
+                    # Promote: the stale heap entry is skipped when popped
+                    self._push(flight, priority)
+                return flight
+
+            flight = Flight(self, key, ai, prompt, context, priority)
+            self._flights[key] = flight
+            self._push(flight, priority)
+            self._work.notify()
+            return flight
+
+    def _push(self, flight: Flight, priority: int):
+        flight.priority = priority
+        flight._seq = next(self._seq)
+        heapq.heappush(self._heap, (priority, flight._seq, flight))
+
+    @staticmethod
+    def _live(entry) -> bool:
+        priority, seq, flight = entry
+        return flight.started_at is None and not flight.done and seq == flight._seq
+
+    def ask(self, ai: AIAssistant, prompt: str, context: list | None = None,
+            priority: int = INTERACTIVE) -> str:
+        return self.submit(ai, prompt, context, priority).result()
+
+    # -----------------------------
+    # Workers
+    # -----------------------------
+    def _next(self) -> Flight:
+        with self._work:
+            while True:
+                while self._heap:
+                    entry = heapq.heappop(self._heap)
+                    if not self._live(entry):
+                        continue        # abandoned, or superseded by a promotion
+                    flight = entry[2]
+                    flight.started_at = time.monotonic()
+                    self._running += 1
+                    return flight
+                self._work.wait()
+
+    def _worker(self):
+        while True:
+            flight = self._next()
+            flight._run()
+            try:
+                self._finish(flight)
+            except Exception:
+                # Telemetry or bookkeeping must never take a worker down with it
+                log.exception("AI scheduler could not finish flight %s", flight.key[:12])
+
+    def _finish(self, flight: Flight):
+        with self._lock:
+            self._running -= 1
+            self._counters["completed"] += 1
+            self._waits.append(flight.queue_wait)
+            if self._flights.get(flight.key) is flight:
+                del self._flights[flight.key]
+        if self._metrics is not None:
+            kind = "interactive" if flight.priority <= INTERACTIVE else "background"
+            self._metrics.record(flight.stats, flight._ai.model, kind, flight.error,
+                                 flight.queue_wait, flight.subscribers)
+
+    def _release(self, flight: Flight):
+        """A caller stopped listening; drop the flight if nobody else wants it and it has not started."""
+        with self._lock:
+            flight.subscribers -= 1
+            if flight.subscribers <= 0 and flight.started_at is None and not flight.done:
+                flight.done = True
+                self._counters["abandoned"] += 1
+                if self._flights.get(flight.key) is flight:
+                    del self._flights[flight.key]
+
+    def _position(self, flight: Flight) -> int:
+        with self._lock:
+            if flight.started_at is not None or flight.done:
+                return 0
+            mine = (flight.priority, flight._seq)
+            ahead = sum(1 for e in self._heap if self._live(e) and e[:2] < mine)
+            return ahead + 1
+
+    # -----------------------------
+    # Metrics
+    # -----------------------------
+    def stats(self) -> dict:
+        with self._lock:
+            waits = sorted(self._waits)
+            queued = sum(1 for f in self._flights.values() if f.started_at is None)
+            out = dict(self._counters, running=self._running, queued=queued,
+                       max_concurrent=self._max_concurrent)
+
+        def pct(q):
+            return waits[min(len(waits) - 1, int(q * len(waits)))] if waits else 0.0
+
+        out["wait_p50"] = pct(0.50)
+        out["wait_p95"] = pct(0.95)
+        return out
+
+
+# ---------------------------------------------------------
+# One scheduler per backend endpoint, shared by every session
+# ---------------------------------------------------------
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+_warmed = set()
+
+
+def get_scheduler(ai: AIAssistant) -> AIScheduler:
+    with _schedulers_lock:
+        if ai.endpoint not in _schedulers:
+            limit = min(MAX_CONCURRENT, ai.backend.max_parallel or MAX_CONCURRENT)
+            _schedulers[ai.endpoint] = AIScheduler(limit, metrics=MetricsStore())
+        return _schedulers[ai.endpoint]
+
+
+def warm_up(ai: AIAssistant, metrics: MetricsStore | None = None) -> GenerationStats:
+    """Load `ai.model` into Ollama now (pinned for its keep_alive) and record how long it took."""
+    started = time.perf_counter()
+    error = None
+    load = None
+    try:
+        load = ai.warm_up()
+    except AIUnavailableError as e:
+        error = e
+    stats = GenerationStats(model=ai.model, time_to_first_token=None,
+                            total_seconds=time.perf_counter() - started, tokens=0,
+                            load_seconds=load)
+    (metrics or MetricsStore()).record(stats, ai.model, "warmup", error)
+    if error:
+        raise error
+    return stats
+
+
+def warm_up_in_background(ai: AIAssistant):
+    """
+    With OLLAMA_WARMUP=1, load the model once per process on a background
+    thread, so the first user after a restart does not pay the load time.
+    """
+    key = (ai.endpoint, ai.model)
+    with _schedulers_lock:
+        if not WARMUP or key in _warmed:
+            return
+        _warmed.add(key)
+
+    def run():
+        try:
+            warm_up(ai)
+        except AIUnavailableError:
+            pass        # recorded; the first real request will load the model instead
+
+    threading.Thread(target=run, name="ai-warmup", daemon=True).start()
@@ -0,0 +1,94 @@
+from app.services.database_manager import DatabaseManager
+
+
+class AnalyticsService:
+    """
+    Dashboard numbers computed inside SQLite.
+
+    Every method returns already-aggregated rows (one per group), so the
+    cost on the Python side depends on the number of distinct values,
+    not on the number of incidents / tickets stored.
+    """
+
+    def __init__(self, db: DatabaseManager):
+        self._db = db
+
+    # -----------------------------
+    # Generic helper
+    # -----------------------------
+    def _distribution(self, table: str, column: str) -> list[tuple[str, int]]:
+        """(value, count) pairs for one column, most frequent first."""
+        return self._db.fetch_all(
+            f"""
+            SELECT {column}, COUNT(*) AS n
+            FROM {table}
+            WHERE {column} IS NOT NULL
+            GROUP BY {column}
+            ORDER BY n DESC
+            """
+        )
+
+    # -----------------------------
+    # Incidents
+    # -----------------------------
+    def severity_distribution(self) -> list[tuple[str, int]]:
+        return self._distribution("cyber_incidents", "severity")
+
+    def category_distribution(self) -> list[tuple[str, int]]:
+        return self._distribution("cyber_incidents", "category")
+
+    # -----------------------------
+    # Tickets
+    # -----------------------------
+    def ticket_priority_distribution(self) -> list[tuple[str, int]]:
+        return self._distribution("it_tickets", "priority")
+
+    def ticket_status_distribution(self) -> list[tuple[str, int]]:
+        return self._distribution("it_tickets", "status")
+
+    # -----------------------------
+    # Datasets
+    # -----------------------------
+    def dataset_sizes(self) -> list[tuple[str, int, float]]:
+        """(name, rows, estimated size MB) — same formula as Dataset.calculate_size_mb()."""
+        return self._db.fetch_all(
+            """
+            SELECT name,
+                   rows,
+                   CASE WHEN rows IS NULL OR columns IS NULL THEN 0.0
+                        ELSE ROUND(rows * columns * 8 / 1048576.0, 2)
+                   END AS size_mb
+            FROM datasets_metadata
+            ORDER BY dataset_id
+            """
+        )
+
+    # -----------------------------
+    # KPI cards
+    # -----------------------------
+    def kpis(self, severity_counts: list[tuple[str, int]] | None = None) -> dict:
+        """
+        Totals for the "Quick Overview" cards.
+
+        Pass the result of severity_distribution() to reuse it for the
+        critical count instead of running the GROUP BY twice.
+        """
+        if severity_counts is None:
+            severity_counts = self.severity_distribution()
+
+        totals = self._db.fetch_one(
+            """
+            SELECT (SELECT COUNT(*) FROM cyber_incidents),
+                   (SELECT COUNT(*) FROM datasets_metadata),
+                   (SELECT COUNT(*) FROM it_tickets)
+            """
+        )
+
+        return {
+            "total_incidents": totals[0],
+            "critical_incidents": sum(
+                n for sev, n in severity_counts if sev.lower() == "critical"
+            ),
+            "total_datasets": totals[1],
+            "total_tickets": totals[2],
+        }
@@ -1,65 +1,113 @@
 from app.models.User import User           # ✅ use app. and capital U
+import sqlite3
+
 from app.services.database_manager import DatabaseManager
-import bcrypt
+from app.services.login_throttle import LoginThrottle, get_throttle
+from app.services.password_hasher import PasswordHasher, get_hasher
 
 
 class AuthManager:
     """Manages login, registration, and password hashing."""
 
-    def __init__(self, db: DatabaseManager):
+    def __init__(self, db: DatabaseManager, hasher: PasswordHasher | None = None,
+                 throttle: LoginThrottle | None = None):
         self._db = db
+        self._hasher = hasher or get_hasher()
+        self._throttle = throttle or get_throttle()
 
     # -----------------------------
     # Password helpers (bcrypt)
     # -----------------------------
     def hash_password(self, plain: str) -> str:
-        """Return a bcrypt hash for the given plain‐text password."""
-        return bcrypt.hashpw(plain.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+        """Return a bcrypt hash (at the configured BCRYPT_ROUNDS) for the given plain‐text password."""
+        return self._hasher.hash(plain)
 
     def check_password(self, plain: str, hashed: str) -> bool:
         """Check a plain password against a stored bcrypt hash."""
-        return bcrypt.checkpw(plain.encode("utf-8"), hashed.encode("utf-8"))
+        return self._hasher.verify(plain, hashed)
 
     # -----------------------------
     # Registration
     # -----------------------------
-    def register_user(self, username: str, password: str, role: str = "user") -> None:
+    def user_exists(self, username: str) -> bool:
+        return self._db.fetch_one("SELECT 1 FROM users WHERE username = ?", (username,)) is not None
+
+    def register_user(self, username: str, password: str, role: str = "user") -> bool:
         """
         Create a new user in the database.
 
         Uses bcrypt hashing and stores into the existing Week 8 `users` table:
         (username, password_hash, role)
+
+        Returns False if the username is taken. That is checked before
+        hashing, so duplicate sign-ups cost no bcrypt work.
         """
+        if self.user_exists(username):
+            return False
         password_hash = self.hash_password(password)
-        self._db.execute_query(
-            """
-            INSERT INTO users (username, password_hash, role)
-            VALUES (?, ?, ?)
-            """,
-            (username, password_hash, role),
-        )
+        try:
+            self._db.execute_query(
+                """
+                INSERT INTO users (username, password_hash, role)
+                VALUES (?, ?, ?)
+                """,
+                (username, password_hash, role),
+            )
+        except sqlite3.IntegrityError:
+            # Registered by someone else while we were hashing
+            return False
+        return True
 
     # -----------------------------
     # Login
     # -----------------------------
-    def login_user(self, username: str, password: str) -> User | None:
+    def login_user(self, username: str, password: str, client: str | None = None) -> User | None:
         """
         Validate credentials.
 
         Returns a User object on success, or None if login fails.
+        Raises LoginThrottledError, without checking the password, when the
+        username or `client` (e.g. the IP address) has made too many
+        attempts or the server is already busy verifying others.
         """
+        # Looked up first so made-up usernames get no throttle bucket of their own
         row = self._db.fetch_one(
-            "SELECT username, password_hash, role FROM users WHERE username = ?",
+            "SELECT username, password_hash, role, hash_algorithm FROM users WHERE username = ?",
             (username,),
         )
+        self._throttle.admit(username, client, known_user=row is not None)
 
         if not row:
+            self._throttle.record_failure(username, client, known_user=False)
             return None
 
-        username_db, password_hash_db, role_db = row
+        username_db, password_hash_db, role_db, algorithm = row
+
+        with self._throttle.verification_slot():
+            valid = self._hasher.verify(password, password_hash_db, algorithm)
 
-        if self.check_password(password, password_hash_db):
+        if valid:
+            self._throttle.record_success(username, client)
+            # Legacy (e.g. SHA-256 from users.txt) or old-cost hashes are
+            # upgraded here, the only time we hold the plain password
+            if self._hasher.needs_rehash(password_hash_db, algorithm):
+                password_hash_db = self._rehash(username_db, password, password_hash_db)
             # Wrap DB row into your OOP User entity
             return User(username_db, password_hash_db, role_db)
 
+        self._throttle.record_failure(username, client)
         return None
+
+    def _rehash(self, username: str, password: str, old_hash: str) -> str:
+        """
+        Re-hash with bcrypt at the current cost now that we hold the plain
+        password. Only replaces `old_hash`, so a password changed meanwhile
+        is kept.
+        """
+        new_hash = self.hash_password(password)
+        self._db.execute_query(
+            "UPDATE users SET password_hash = ?, hash_algorithm = 'bcrypt' "
+            "WHERE username = ? AND password_hash = ?",
+            (new_hash, username, old_hash),
+        )
+        return new_hash
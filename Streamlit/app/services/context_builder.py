@@ -0,0 +1,142 @@
+import threading
+
+from app.data.versions import get_data_version
+from app.services.database_manager import DatabaseManager
+
+# One cached summary per database file, shared by every session:
+# {db_path: (data_version, context_text)}
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+class ContextBuilder:
+    """
+    Builds the "SYSTEM SUMMARY" block prepended to AI prompts.
+
+    Every figure comes from an SQL aggregate, and the finished text is
+    cached against the data-version stamp, so it is only rebuilt after
+    incidents, tickets or datasets are actually written to.
+    """
+
+    def __init__(self, db: DatabaseManager):
+        self._db = db
+
+    def data_version(self) -> str:
+        return get_data_version(self._db.db_path)
+
+    def build(self) -> str:
+        version = self.data_version()
+        key = self._db.db_path
+
+        with _cache_lock:
+            cached = _cache.get(key)
+        if cached and cached[0] == version:
+            return cached[1]
+
+        context = self._render()
+        with _cache_lock:
+            _cache[key] = (version, context)
+        return context
+
+    # -----------------------------
+    # Aggregates
+    # -----------------------------
+    def _incident_summary(self):
+        total, critical = self._db.fetch_one(
+            """
+            SELECT COUNT(*),
+                   COALESCE(SUM(LOWER(severity) = 'critical'), 0)
+            FROM cyber_incidents
+            """
+        )
+        top = self._db.fetch_one(
+            """
+            SELECT category
+            FROM cyber_incidents
+            GROUP BY category
+            ORDER BY COUNT(*) DESC, MIN(incident_id)
+            LIMIT 1
+            """
+        )
+        return total, critical, top[0] if top else None
+
+    def _dataset_summary(self):
+        total = self._db.fetch_one("SELECT COUNT(*) FROM datasets_metadata")[0]
+        largest = self._db.fetch_one(
+            """
+            SELECT name, rows
+            FROM datasets_metadata
+            ORDER BY COALESCE(rows, 0) DESC, dataset_id
+            LIMIT 1
+            """
+        )
+        return total, largest
+
+    def _ticket_summary(self):
+        total, closed = self._db.fetch_one(
+            """
+            SELECT COUNT(*),
+                   COALESCE(SUM(LOWER(status) = 'closed'), 0)
+            FROM it_tickets
+            """
+        )
+        top = self._db.fetch_one(
+            """
+            SELECT assigned_to
+            FROM it_tickets
+            WHERE assigned_to IS NOT NULL AND assigned_to != ''
+            GROUP BY assigned_to
+            ORDER BY COUNT(*) DESC
+            LIMIT 1
+            """
+        )
+        return total, closed, top[0] if top else "N/A"
+
+    # -----------------------------
+    # Text
+    # -----------------------------
+    def _render(self) -> str:
+        context = "### SYSTEM SUMMARY\n"
+
+        # --- INCIDENTS ---
+        context += "\n## Cybersecurity Incidents\n"
+        total, critical, top_cat = self._incident_summary()
+        if total:
+            context += (
+                f"- Total incidents: {total}\n"
+                f"- Critical: {critical}\n"
+                f"- Most common category: {top_cat}\n"
+            )
+        else:
+            context += "- No incident data.\n"
+
+        # --- DATASETS ---
+        context += "\n## Datasets\n"
+        total, largest = self._dataset_summary()
+        if total:
+            context += (
+                f"- Total datasets: {total}\n"
+                f"- Largest dataset: {largest[0]} ({largest[1]} rows)\n"
+            )
+        else:
+            context += "- No dataset data.\n"
+
+        # --- TICKETS ---
+        context += "\n## IT Tickets\n"
+        total, closed, top_staff = self._ticket_summary()
+        if total:
+            context += (
+                f"- Total tickets: {total}\n"
+                f"- Closed tickets: {closed}\n"
+                f"- Staff with most assignments: {top_staff}\n"
+            )
+        else:
+            context += "- No ticket data.\n"
+
+        context += (
+            "\n### Instructions\n"
+            "You may use the data above if the question relates to incidents, datasets, "
+            "or IT tickets. If the user's question is general or unrelated, answer normally.\n"
+        )
+
+        return context
@@ -0,0 +1,94 @@
+from dataclasses import dataclass, field
+
+from app.services.ai_assistant import AIAssistant, estimate_tokens
+from app.services.ai_scheduler import BACKGROUND, get_scheduler
+
+HISTORY_TOKENS = 2048        # conversation state allowed before it is compacted
+RENDER_LAST = 20             # messages shown before "show earlier" is clicked
+
+SUMMARY_PROMPT = (
+    "Summarise the conversation below between a user and an AI assistant for a "
+    "cybersecurity / IT operations platform. Keep every fact, figure, record id "
+    "and decision the user may refer back to. Write at most 10 short bullet "
+    "points.\n\n{body}"
+)
+
+
+@dataclass
+class Conversation:
+    """
+    Per-session chat state.
+
+    While Ollama returns a `context` (its token state after each reply) the
+    next prompt is sent on top of it, so earlier turns are never resent or
+    re-evaluated. Without one (a cached answer, or a backend that does not
+    return context) recent turns are replayed as a transcript instead. Either
+    way, once the state passes HISTORY_TOKENS the turns are folded into a
+    rolling summary and the model starts afresh from that summary.
+    """
+    messages: list = field(default_factory=list)   # (role, text) for display only
+    turns: list = field(default_factory=list)      # (question, answer) since the last compaction
+    summary: str = ""
+    context: list | None = None
+    context_version: str | None = None             # data version of the analytics block in `context`
+    compactions: int = 0
+
+    @property
+    def is_fresh(self) -> bool:
+        """No earlier turns can influence the answer (so it is safe to cache)."""
+        return not self.turns and not self.summary
+
+    def state_tokens(self) -> int:
+        if self.context:
+            return len(self.context)
+        return estimate_tokens(self.summary) + sum(
+            estimate_tokens(q) + estimate_tokens(a) for q, a in self.turns
+        )
+
+    # -----------------------------
+    # Prompting
+    # -----------------------------
+    def _transcript(self) -> str:
+        return "\n".join(f"User: {q}\nAssistant: {a}" for q, a in self.turns)
+
+    def build_prompt(self, question: str, preamble: str = "") -> str:
+        """
+        Prompt for the next turn. `preamble` holds this turn's system blocks
+        (analytics summary, retrieved records).
+        """
+        parts = [preamble] if preamble else []
+        if not self.context:
+            if self.summary:
+                parts.append("### CONVERSATION SO FAR\n" + self.summary)
+            if self.turns:
+                parts.append("### RECENT MESSAGES\n" + self._transcript())
+        if not parts:
+            return question
+        return "\n".join(parts) + "\nUser: " + question
+
+    def record(self, question: str, answer: str, context: list | None):
+        self.messages += [("user", question), ("assistant", answer)]
+        self.turns.append((question, answer))
+        self.context = context or None
+
+    # -----------------------------
+    # Compaction
+    # -----------------------------
+    def needs_compaction(self, budget: int = HISTORY_TOKENS) -> bool:
+        return bool(self.turns) and self.state_tokens() > budget
+
+    def compact(self, ai: AIAssistant):
+        """Fold the summary and recent turns into a new rolling summary."""
+        body = ""
+        if self.summary:
+            body += "Earlier summary:\n" + self.summary + "\n\n"
+        body += self._transcript()
+        prompt = SUMMARY_PROMPT.format(body=body)
+        self.summary = get_scheduler(ai).ask(ai, prompt, priority=BACKGROUND).strip()
+        self.turns = []
+        self.context = None
+        self.context_version = None
+        self.compactions += 1
+
+    def clear(self):
+        self.__init__()
@@ -1,37 +1,43 @@
-import sqlite3
 from typing import Any, Iterable
 
+from app.data.db import get_pool
+
+
 class DatabaseManager:
-    """Handles SQLite connections and queries."""
+    """Handles SQLite queries through the shared, process-wide connection pool."""
 
     def __init__(self, db_path: str):
         self._db_path = db_path
-        self._connection = None
+        self._pool = get_pool(db_path)
+
+    @property
+    def db_path(self) -> str:
+        return self._db_path
 
     def connect(self):
-        if self._connection is None:
-            self._connection = sqlite3.connect(self._db_path)
+        # Connections are owned by the pool; kept for backwards compatibility.
+        return self._pool
 
     def close(self):
-        if self._connection:
-            self._connection.close()
-            self._connection = None
+        # The pool outlives any single manager (pages build one per rerun).
+        pass
+
+    def reader(self):
+        """`with db.reader() as conn:` for streaming cursors (e.g. the columnar batches)."""
+        return self._pool.reader()
 
     def execute_query(self, sql: str, params: Iterable[Any] = ()):
-        self.connect()
-        cursor = self._connection.cursor()
-        cursor.execute(sql, params)
-        self._connection.commit()
-        return cursor
+        with self._pool.writer() as conn:
+            return conn.execute(sql, params)
+
+    def execute_many(self, sql: str, seq_of_params: Iterable[Iterable[Any]]):
+        with self._pool.writer() as conn:
+            return conn.executemany(sql, seq_of_params)
 
     def fetch_one(self, sql: str, params: Iterable[Any] = ()):
-        self.connect()
-        cursor = self._connection.cursor()
-        cursor.execute(sql, params)
-        return cursor.fetchone()
+        with self._pool.reader() as conn:
+            return conn.execute(sql, params).fetchone()
 
     def fetch_all(self, sql: str, params: Iterable[Any] = ()):
-        self.connect()
-        cursor = self._connection.cursor()
-        cursor.execute(sql, params)
-        return cursor.fetchall()
+        with self._pool.reader() as conn:
+            return conn.execute(sql, params).fetchall()
@@ -0,0 +1,60 @@
+import os
+import re
+import zlib
+
+import numpy as np
+
+from app.services.ai_assistant import AIAssistant
+
+# ---------------------------------------------------------
+# Embedder selection (override with environment variables)
+#   EMBEDDER=ollama   → OLLAMA_EMBED_MODEL on the configured AI_BACKEND
+#   EMBEDDER=hashing  → dependency-free local embedder (offline / tests)
+# ---------------------------------------------------------
+EMBEDDER = os.environ.get("EMBEDDER", "ollama")
+EMBED_MODEL = os.environ.get("OLLAMA_EMBED_MODEL", "nomic-embed-text")
+HASH_DIM = 384
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+class OllamaEmbedder:
+    """Embeddings from a local embedding model (Ollama by default)."""
+
+    def __init__(self, model: str = EMBED_MODEL, backend=None):
+        self._ai = AIAssistant(model=model, backend=backend)
+        self.name = f"ollama:{model}"
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        return np.asarray(self._ai.embed(texts), dtype=np.float32)
+
+
+class HashingEmbedder:
+    """
+    Signed feature hashing over word unigrams and bigrams.
+
+    Purely lexical, but needs no model, is deterministic and is fast
+    enough to index millions of short descriptions.
+    """
+
+    def __init__(self, dim: int = HASH_DIM):
+        self.dim = dim
+        self.name = f"hashing:{dim}"
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = _WORD.findall((text or "").lower())
+            for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+                h = zlib.crc32(feature.encode("utf-8"))
+                out[row, h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return out / np.maximum(norms, 1e-12)
+
+
+def get_embedder(kind: str = EMBEDDER):
+    if kind == "ollama":
+        return OllamaEmbedder()
+    if kind == "hashing":
+        return HashingEmbedder()
+    raise ValueError(f"Unknown embedder {kind!r} (expected 'ollama' or 'hashing')")
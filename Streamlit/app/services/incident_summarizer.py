@@ -0,0 +1,227 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator
+
+from app.services.ai_assistant import POOL_SIZE, AIAssistant, estimate_tokens
+from app.services.ai_scheduler import BACKGROUND, get_scheduler
+from app.services.database_manager import DatabaseManager
+from app.services.response_cache import ResponseCache
+
+# ---------------------------------------------------------
+# Budgets are in estimated tokens (~4 characters each), sized for
+# small local models such as phi3:mini with a 4k context window.
+# ---------------------------------------------------------
+CHUNK_TOKENS = 1500          # incident text per map prompt
+REDUCE_TOKENS = 2000         # partial summaries per reduce prompt
+MAX_DESCRIPTION_TOKENS = 300  # longer descriptions are truncated
+MAX_WORKERS = 4              # concurrent map calls (≤ POOL_SIZE)
+FETCH_ROWS = 2000
+
+FILTER_COLUMNS = ("severity", "category", "status")
+
+MAP_PROMPT = (
+    "You are a security analyst. Summarise the following cybersecurity incidents "
+    "in 3-5 bullet points. Focus on recurring attack types, affected systems and "
+    "anything critical. Do not list incidents one by one.\n\n{body}"
+)
+REDUCE_PROMPT = (
+    "You are a security analyst. Combine these partial incident summaries into one "
+    "concise report with the main themes, notable critical incidents and "
+    "recommended actions.\n\n{body}"
+)
+
+
+@dataclass
+class SummaryReport:
+    text: str
+    incidents: int
+    chunks: int
+    cached_chunks: int
+    reduce_rounds: int
+    seconds: float
+
+
+class IncidentSummarizer:
+    """
+    Map-reduce summary of incident descriptions.
+
+    Descriptions are streamed in incident_id order and packed greedily into
+    token-budgeted chunks; only the chunks being summarised and the partial
+    summaries are held in memory. Because packing is deterministic, new
+    incidents only change the tail chunk(s); every other chunk has the same
+    prompt as last time and is answered from the response cache. Chunks are
+    summarised concurrently through a bounded thread pool, then the
+    partial summaries are reduced (in rounds, if they do not fit one
+    prompt) into a single report.
+    """
+
+    def __init__(self, db: DatabaseManager, ai: AIAssistant,
+                 cache: ResponseCache | None = None,
+                 chunk_tokens: int = CHUNK_TOKENS, reduce_tokens: int = REDUCE_TOKENS,
+                 max_workers: int = MAX_WORKERS):
+        self._db = db
+        self._ai = ai
+        self._cache = cache or ResponseCache()
+        self._chunk_tokens = chunk_tokens
+        self._reduce_tokens = reduce_tokens
+        self._max_workers = max(1, min(max_workers, POOL_SIZE))
+
+    # -----------------------------
+    # Chunking
+    # -----------------------------
+    @staticmethod
+    def _where(filters: dict | None) -> tuple[str, list]:
+        clauses, params = [], []
+        for col, value in (filters or {}).items():
+            if col not in FILTER_COLUMNS:
+                raise ValueError(f"Cannot filter incidents by {col!r}")
+            if value is not None:
+                clauses.append(f"{col} = ?")
+                params.append(value)
+        return (f"WHERE {' AND '.join(clauses)}" if clauses else ""), params
+
+    def _count(self, filters: dict | None) -> int:
+        where, params = self._where(filters)
+        return self._db.fetch_one(f"SELECT COUNT(*) FROM cyber_incidents {where}", params)[0]
+
+    def _incident_lines(self, filters: dict | None) -> Iterator[str]:
+        where, params = self._where(filters)
+        max_chars = MAX_DESCRIPTION_TOKENS * 4
+        with self._db.reader() as conn:
+            cur = conn.execute(
+                f"""
+                SELECT incident_id, severity, category, description
+                FROM cyber_incidents
+                {where}
+                ORDER BY incident_id
+                """,
+                params,
+            )
+            while True:
+                rows = cur.fetchmany(FETCH_ROWS)
+                if not rows:
+                    break
+                for incident_id, severity, category, description in rows:
+                    text = " ".join((description or "").split())[:max_chars]
+                    yield f"- #{incident_id} [{severity}/{category}] {text}"
+
+    @staticmethod
+    def _pack(lines: Iterable[str], budget: int, sep: str = "\n") -> Iterator[str]:
+        """Greedily pack lines into blocks of at most `budget` estimated tokens, one block at a time."""
+        current, used = [], 0
+        for line in lines:
+            cost = estimate_tokens(line)
+            if current and used + cost > budget:
+                yield sep.join(current)
+                current, used = [], 0
+            current.append(line)
+            used += cost
+        if current:
+            yield sep.join(current)
+
+    # -----------------------------
+    # Map / reduce
+    # -----------------------------
+    def _complete(self, prompt: str) -> tuple[str, bool]:
+        """Answer one prompt, from the cache when possible. Returns (text, was_cached)."""
+        model = self._ai.model
+        cached = self._cache.get(model, prompt)
+        if cached is not None:
+            return cached, True
+        text = get_scheduler(self._ai).ask(self._ai, prompt, priority=BACKGROUND).strip()
+        self._cache.put(model, prompt, "", text)
+        return text, False
+
+    def _run_all(self, prompts: Iterable[str], on_done: Callable[[], None]) -> tuple[list[str], int]:
+        """
+        Answer prompts in order of submission, pulling the next one only when
+        a worker is about to be free, so at most 2 × max_workers are held.
+        """
+        results = {}
+        cached = 0
+        in_flight = {}
+
+        def collect(return_when):
+            nonlocal cached
+            finished, _ = wait(in_flight, return_when=return_when)
+            for future in finished:
+                text, was_cached = future.result()
+                results[in_flight.pop(future)] = text
+                cached += was_cached
+                on_done()
+
+        with ThreadPoolExecutor(max_workers=self._max_workers) as pool:
+            try:
+                for i, prompt in enumerate(prompts):
+                    in_flight[pool.submit(self._complete, prompt)] = i
+                    if len(in_flight) >= 2 * self._max_workers:
+                        collect(FIRST_COMPLETED)
+                while in_flight:
+                    collect(FIRST_COMPLETED)
+            except BaseException:
+                # Finished chunks are already cached, so a re-run resumes here
+                for f in in_flight:
+                    f.cancel()
+                raise
+        return [results[i] for i in range(len(results))], cached
+
+    def summarize(self, filters: dict | None = None,
+                  on_progress: Callable[[int, int], None] | None = None) -> SummaryReport:
+        """
+        Summarise every incident matching `filters` (severity / category / status).
+
+        `on_progress(done, total)` is called after each map or reduce call.
+        Raises AIUnavailableError if the AI engine cannot be reached.
+        """
+        started = time.perf_counter()
+        expected = self._count(filters)
+        if not expected:
+            return SummaryReport("No incidents to summarise.", 0, 0, 0, 0, 0.0)
+
+        seen = chunks = done = reduce_total = 0
+
+        def lines():
+            nonlocal seen
+            for line in self._incident_lines(filters):
+                seen += 1
+                yield line
+
+        def map_prompts():
+            nonlocal chunks
+            for chunk in self._pack(lines(), self._chunk_tokens):
+                chunks += 1
+                yield MAP_PROMPT.format(body=chunk)
+
+        def tick():
+            nonlocal done
+            done += 1
+            if on_progress:
+                # Chunks still to come are extrapolated from the packing so far
+                remaining = max(0, expected - seen)
+                estimate = chunks + (-(-remaining * chunks // seen) if seen else 0)
+                on_progress(done, max(done, estimate + reduce_total))
+
+        partials, cached = self._run_all(map_prompts(), tick)
+        if not partials:
+            return SummaryReport("No incidents to summarise.", 0, 0, 0, 0, 0.0)
+
+        # Reduce until one summary remains
+        rounds = 0
+        while len(partials) > 1:
+            groups = list(self._pack(partials, self._reduce_tokens, sep="\n\n"))
+            if len(groups) == len(partials):
+                # Each partial fills a prompt on its own: merge pairwise so we converge
+                groups = ["\n\n".join(partials[i:i + 2]) for i in range(0, len(partials), 2)]
+            reduce_total += len(groups)
+            partials, _ = self._run_all([REDUCE_PROMPT.format(body=g) for g in groups], tick)
+            rounds += 1
+
+        return SummaryReport(
+            text=partials[0],
+            incidents=seen,
+            chunks=chunks,
+            cached_chunks=cached,
+            reduce_rounds=rounds,
+            seconds=time.perf_counter() - started,
+        )
@@ -0,0 +1,148 @@
+"""
+In-process inference with llama.cpp (the llama-cpp-python package), for
+hosts without an Ollama server. Tokens come straight from the model loop,
+with no HTTP round trip or JSON per token.
+
+    pip install llama-cpp-python
+    AI_BACKEND=llamacpp LLAMA_MODEL_DIR=models streamlit run Home.py
+
+A model name maps to a GGUF file in LLAMA_MODEL_DIR ("phi3:mini" →
+"phi3-mini.gguf"). Models stay loaded for the life of the process.
+"""
+
+import codecs
+import os
+import threading
+import time
+from typing import Iterator
+
+from app.services.ai_assistant import AIUnavailableError
+
+try:
+    import llama_cpp
+except ImportError:          # optional dependency
+    llama_cpp = None
+
+MODEL_DIR = os.environ.get("LLAMA_MODEL_DIR", "models")
+N_CTX = int(os.environ.get("LLAMA_N_CTX", "4096"))
+N_THREADS = int(os.environ["LLAMA_N_THREADS"]) if os.environ.get("LLAMA_N_THREADS") else None
+MAX_TOKENS = int(os.environ.get("LLAMA_MAX_TOKENS", "512"))     # reply length cap
+TEMPERATURE = 0.8            # Ollama's default
+
+
+class _Loaded:
+    def __init__(self, llm, path: str, load_seconds: float):
+        self.llm = llm
+        self.path = path
+        self.load_seconds = load_seconds
+        self.lock = threading.Lock()      # a llama.cpp context is not thread-safe
+
+
+class LlamaCppBackend:
+    """
+    AIAssistant backend running GGUF models in this process.
+
+    Like Ollama, `context` is the token ids of the conversation so far; the
+    model's KV cache is reused for the longest common prefix, so a follow-up
+    only evaluates the new prompt.
+    """
+
+    max_parallel = 1             # one generation per loaded model at a time
+    circuit_state = "closed"
+
+    def __init__(self, model_dir: str = MODEL_DIR, n_ctx: int = N_CTX,
+                 n_threads: int | None = N_THREADS, max_tokens: int = MAX_TOKENS):
+        self._model_dir = model_dir
+        self._n_ctx = n_ctx
+        self._n_threads = n_threads
+        self._max_tokens = max_tokens
+        self._models = {}        # (model, embedding) -> _Loaded
+        self._lock = threading.Lock()
+
+    @property
+    def endpoint(self) -> str:
+        return f"llamacpp://{os.path.abspath(self._model_dir)}"
+
+    def _path(self, model: str) -> str:
+        return os.path.join(self._model_dir, model.replace(":", "-").replace("/", "-") + ".gguf")
+
+    def _get(self, model: str, embedding: bool = False) -> tuple[_Loaded, float]:
+        """The loaded model, and the seconds this call spent loading it."""
+        key = (model, embedding)
+        with self._lock:
+            loaded = self._models.get(key)
+            if loaded is not None:
+                return loaded, 0.0
+            if llama_cpp is None:
+                raise AIUnavailableError(
+                    "AI_BACKEND=llamacpp needs the llama-cpp-python package (pip install llama-cpp-python)."
+                )
+            path = self._path(model)
+            if not os.path.exists(path):
+                raise AIUnavailableError(f"No GGUF file for {model!r} (expected {path}).")
+            started = time.perf_counter()
+            try:
+                llm = llama_cpp.Llama(model_path=path, n_ctx=self._n_ctx, n_threads=self._n_threads,
+                                      embedding=embedding, verbose=False)
+            except (ValueError, RuntimeError) as e:
+                raise AIUnavailableError(f"Could not load {path}: {e}") from e
+            loaded = _Loaded(llm, path, time.perf_counter() - started)
+            self._models[key] = loaded
+            return loaded, loaded.load_seconds
+
+    def load(self, model: str, keep_alive: str | None = None) -> float:
+        return self._get(model)[1]
+
+    def loaded_models(self) -> list[dict]:
+        with self._lock:
+            return [{"name": model, "model": m.path, "size": os.path.getsize(m.path), "expires_at": None}
+                    for (model, embedding), m in self._models.items() if not embedding]
+
+    def generate(self, model: str, prompt: str, context: list[int] | None = None,
+                 keep_alive: str | None = None) -> Iterator[dict]:
+        loaded, load_seconds = self._get(model)
+        llm = loaded.llm
+        with loaded.lock:
+            started = time.perf_counter()
+            prompt_ids = llm.tokenize(prompt.encode("utf-8"), add_bos=not context) if prompt else []
+            tokens = list(context or []) + prompt_ids
+            room = self._n_ctx - self._max_tokens
+            if len(tokens) > room:
+                # Conversation no longer fits: start again from this prompt alone
+                tokens = llm.tokenize(prompt.encode("utf-8"), add_bos=True)[-room:]
+
+            out = []
+            first_at = None
+            if prompt_ids:
+                # Token pieces can split a UTF-8 character; decode incrementally
+                decoder = codecs.getincrementaldecoder("utf-8")("replace")
+                eos = llm.token_eos()
+                for token in llm.generate(tokens, temp=TEMPERATURE, reset=True):
+                    if first_at is None:
+                        first_at = time.perf_counter()     # prompt evaluated, first token sampled
+                    if token == eos or len(out) >= self._max_tokens:
+                        break
+                    out.append(token)
+                    text = decoder.decode(llm.detokenize([token]))
+                    if text:
+                        yield {"model": model, "response": text, "done": False}
+
+            now = time.perf_counter()
+            first_at = first_at or now
+            yield {
+                "model": model,
+                "response": "",
+                "done": True,
+                "total_duration": int((now - started + load_seconds) * 1e9),
+                "load_duration": int(load_seconds * 1e9),
+                "prompt_eval_count": len(prompt_ids),
+                "prompt_eval_duration": int((first_at - started) * 1e9),
+                "eval_count": len(out),
+                "eval_duration": int((now - first_at) * 1e9),
+                "context": tokens + out,
+            }
+
+    def embed(self, model: str, texts: list[str]) -> list[list[float]]:
+        loaded, _ = self._get(model, embedding=True)
+        with loaded.lock:
+            return loaded.llm.embed(texts)
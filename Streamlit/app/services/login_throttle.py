@@ -0,0 +1,291 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from app.data.db import get_pool
+from app.services.password_hasher import HASH_WORKERS
+
+# ---------------------------------------------------------
+# Login admission control (override with environment variables)
+#
+# Every login attempt takes a token from a bucket for the username and
+# one for the client address; empty buckets are refused before any
+# bcrypt work. Consecutive failures lock the key out for exponentially
+# longer. Failures are forgotten FAILURE_WINDOW after the last one, so a
+# lockout counts recent failures, not lifetime ones. Without a client
+# address (localhost, some proxies) only the username bucket applies: a
+# shared "unknown" key would throttle or lock out everyone. Usernames that
+# do not exist get no bucket of their own (the client's still applies), so
+# made-up names cannot grow the table. At most MAX_VERIFICATIONS bcrypt
+# checks run (or wait) at once.
+# ---------------------------------------------------------
+THROTTLE_DB_PATH = os.environ.get("LOGIN_THROTTLE_DB")     # unset → in memory only
+MAX_VERIFICATIONS = int(os.environ.get("AUTH_MAX_VERIFICATIONS", str(HASH_WORKERS * 2)))
+VERIFY_WAIT = 1.0            # seconds to wait for a verification slot before refusing
+LOCKOUT_BASE = 30.0          # seconds for the first lockout, doubled for each further failure
+LOCKOUT_MAX = 3600.0
+FAILURE_WINDOW = 900.0       # seconds without a failure before a key's failures are forgotten
+MAX_KEYS = 100_000           # beyond this the least recently used keys are forgotten...
+EVICT_TO = MAX_KEYS * 9 // 10    # ...down to this many, so eviction runs once per 10% of new keys
+
+
+@dataclass(frozen=True)
+class Policy:
+    capacity: float          # burst of attempts allowed
+    refill_per_sec: float    # sustained attempt rate
+    lockout_after: int       # consecutive failures before the first lockout
+    failure_window: float | None = None     # forget failures this long after the last one
+
+
+USER_POLICY = Policy(capacity=5, refill_per_sec=1 / 30, lockout_after=5, failure_window=FAILURE_WINDOW)
+CLIENT_POLICY = Policy(capacity=20, refill_per_sec=1 / 5, lockout_after=20, failure_window=FAILURE_WINDOW)
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS login_throttle (
+    key TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL,
+    failures INTEGER NOT NULL,
+    locked_until REAL NOT NULL,
+    failed_at REAL NOT NULL DEFAULT 0
+)
+'''
+
+
+class LoginThrottledError(RuntimeError):
+    """A login attempt was refused before checking the password."""
+
+    def __init__(self, reason: str, retry_after: float):
+        wait = f"{retry_after:.0f} s" if retry_after < 90 else f"{retry_after / 60:.0f} min"
+        super().__init__(f"{reason} Try again in {wait}.")
+        self.retry_after = retry_after
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated", "failures", "locked_until", "failed_at")
+
+    def __init__(self, tokens: float, updated: float, failures: int = 0, locked_until: float = 0.0,
+                 failed_at: float = 0.0):
+        self.tokens = tokens
+        self.updated = updated
+        self.failures = failures
+        self.locked_until = locked_until
+        self.failed_at = failed_at
+
+    def refill(self, policy: Policy, now: float):
+        self.tokens = min(policy.capacity, self.tokens + (now - self.updated) * policy.refill_per_sec)
+        self.updated = now
+        self.expire(policy, now)
+
+    def expire(self, policy: Policy, now: float):
+        """Forget failures older than the policy's window (never during a lockout)."""
+        if (self.failures and policy.failure_window is not None and self.locked_until <= now
+                and now - self.failed_at >= policy.failure_window):
+            self.failures = 0
+
+    def wait_time(self, policy: Policy, now: float) -> float:
+        """Seconds until an attempt would be allowed (0 = now)."""
+        if self.locked_until > now:
+            return self.locked_until - now
+        if self.tokens < 1:
+            return (1 - self.tokens) / policy.refill_per_sec
+        return 0.0
+
+
+class LoginThrottle:
+    """
+    Per-username and per-client token buckets with exponential lockout.
+
+    State lives in memory; with `db_path` it is also written through to
+    SQLite and read back the first time a key is seen, so lockouts
+    survive a restart.
+    """
+
+    def __init__(self, db_path: str | None = THROTTLE_DB_PATH,
+                 max_verifications: int = MAX_VERIFICATIONS,
+                 user_policy: Policy = USER_POLICY, client_policy: Policy = CLIENT_POLICY):
+        self._user_policy = user_policy
+        self._client_policy = client_policy
+        self._buckets = OrderedDict()     # least recently used first
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max(1, max_verifications))
+        self._max_verifications = max(1, max_verifications)
+        self._in_flight = 0
+        self._counters = {"allowed": 0, "succeeded": 0, "failed": 0, "rejected_user": 0,
+                          "rejected_client": 0, "rejected_locked": 0, "rejected_busy": 0}
+        self._pool = None
+        if db_path:
+            self._pool = get_pool(db_path)
+            with self._pool.writer() as conn:
+                conn.execute(_SCHEMA)
+                columns = {row[1] for row in conn.execute("PRAGMA table_info(login_throttle)")}
+                if "failed_at" not in columns:
+                    conn.execute("ALTER TABLE login_throttle ADD COLUMN failed_at REAL NOT NULL DEFAULT 0")
+
+    # -----------------------------
+    # State
+    # -----------------------------
+    def _bucket(self, key: str, policy: Policy, now: float) -> _Bucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            row = None
+            if self._pool is not None:
+                with self._pool.reader() as conn:
+                    row = conn.execute(
+                        "SELECT tokens, updated, failures, locked_until, failed_at "
+                        "FROM login_throttle WHERE key = ?",
+                        (key,),
+                    ).fetchone()
+            bucket = _Bucket(*row) if row else _Bucket(policy.capacity, now)
+            if len(self._buckets) >= MAX_KEYS:
+                self._evict(now)
+            self._buckets[key] = bucket
+        else:
+            self._buckets.move_to_end(key)
+        bucket.refill(policy, now)
+        return bucket
+
+    def _policy(self, key: str) -> Policy:
+        return self._client_policy if key.startswith("client:") else self._user_policy
+
+    def _evict(self, now: float):
+        """
+        Forget least recently used keys down to EVICT_TO: idle, clean keys
+        first, then any key that is not locked out, and only under a flood
+        of locked keys the oldest of those. Keys written through to SQLite
+        are read back if they come again.
+        """
+        for key, bucket in self._buckets.items():
+            bucket.expire(self._policy(key), now)
+        stages = (
+            lambda b: not b.failures and b.locked_until <= now and b.tokens >= 1,
+            lambda b: b.locked_until <= now,
+            lambda b: True,
+        )
+        for evictable in stages:
+            excess = len(self._buckets) - EVICT_TO
+            if excess <= 0:
+                break
+            for key in [k for k, b in self._buckets.items() if evictable(b)][:excess]:
+                del self._buckets[key]
+
+    def _save(self, *items):
+        if self._pool is None:
+            return
+        try:
+            with self._pool.writer() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO login_throttle "
+                    "(key, tokens, updated, failures, locked_until, failed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(k, b.tokens, b.updated, b.failures, b.locked_until, b.failed_at) for k, b in items],
+                )
+        except sqlite3.Error:
+            pass        # memory state still applies
+
+    def _tracked(self, username: str, client: str | None, known_user: bool = True):
+        """(key, policy) pairs for an attempt: no user key for unknown users, no client key without an address."""
+        tracked = []
+        if known_user:
+            tracked.append((f"user:{username.lower()}", self._user_policy))
+        if client:
+            tracked.append((f"client:{client}", self._client_policy))
+        return tracked
+
+    # -----------------------------
+    # Admission
+    # -----------------------------
+    def admit(self, username: str, client: str | None = None, known_user: bool = True):
+        """Take one attempt from each bucket, or raise LoginThrottledError."""
+        now = time.time()
+        with self._lock:
+            items = [(key, self._bucket(key, policy, now), policy)
+                     for key, policy in self._tracked(username, client, known_user)]
+            for key, bucket, policy in items:
+                wait = bucket.wait_time(policy, now)
+                if wait:
+                    locked = bucket.locked_until > now
+                    reason = key.split(":", 1)[0]
+                    self._counters["rejected_locked" if locked else f"rejected_{reason}"] += 1
+                    raise LoginThrottledError(
+                        "Too many failed attempts." if locked else "Too many login attempts.",
+                        wait,
+                    )
+            for _, bucket, _ in items:
+                bucket.tokens -= 1
+            self._counters["allowed"] += 1
+        self._save(*((key, bucket) for key, bucket, _ in items))
+
+    @contextmanager
+    def verification_slot(self):
+        """Hold one of the process-wide bcrypt slots (raises LoginThrottledError when saturated)."""
+        if not self._slots.acquire(timeout=VERIFY_WAIT):
+            with self._lock:
+                self._counters["rejected_busy"] += 1
+            raise LoginThrottledError("The server is busy.", VERIFY_WAIT)
+        with self._lock:
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+
+    def record_success(self, username: str, client: str | None = None):
+        """
+        Clear the username's failures. The client's only expire with its
+        failure window, so one good account cannot reset them.
+        """
+        user_key, _ = self._tracked(username, None)[0]
+        now = time.time()
+        with self._lock:
+            user = self._bucket(user_key, self._user_policy, now)
+            user.failures = 0
+            user.locked_until = 0.0
+            self._counters["succeeded"] += 1
+        self._save((user_key, user))
+
+    def record_failure(self, username: str, client: str | None = None, known_user: bool = True):
+        now = time.time()
+        with self._lock:
+            items = []
+            for key, policy in self._tracked(username, client, known_user):
+                bucket = self._bucket(key, policy, now)
+                bucket.failures += 1
+                bucket.failed_at = now
+                if bucket.failures >= policy.lockout_after:
+                    steps = bucket.failures - policy.lockout_after
+                    bucket.locked_until = now + min(LOCKOUT_MAX, LOCKOUT_BASE * 2 ** min(steps, 20))
+                items.append((key, bucket))
+            self._counters["failed"] += 1
+        self._save(*items)
+
+    # -----------------------------
+    # Metrics
+    # -----------------------------
+    def stats(self) -> dict:
+        now = time.time()
+        with self._lock:
+            locked = sum(1 for b in self._buckets.values() if b.locked_until > now)
+            return dict(self._counters, locked_keys=locked, tracked_keys=len(self._buckets),
+                        verifications_in_flight=self._in_flight,
+                        max_verifications=self._max_verifications)
+
+
+# ---------------------------------------------------------
+# One throttle per process, shared by every session
+# ---------------------------------------------------------
+_throttle = None
+_throttle_lock = threading.Lock()
+
+
+def get_throttle() -> LoginThrottle:
+    global _throttle
+    with _throttle_lock:
+        if _throttle is None:
+            _throttle = LoginThrottle()
+        return _throttle
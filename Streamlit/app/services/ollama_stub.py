@@ -0,0 +1,255 @@
+"""
+Deterministic stand-in for a model, for offline testing and benchmarks.
+
+In-process: AI_BACKEND=stub makes AIAssistant use StubBackend directly (no
+server, no model), tuned with AI_STUB_FIRST_TOKEN_MS, AI_STUB_TOKENS_PER_SEC,
+AI_STUB_REPLY_TOKENS and AI_STUB_LOAD_MS.
+
+Over HTTP: the same replies behind just enough of the Ollama API
+(/api/generate streaming NDJSON, /api/embed, /api/tags, /api/ps), with extra
+failure modes for the transport:
+
+    python -m app.services.ollama_stub --port 11435 --first-token-ms 200 --tokens-per-sec 40
+
+then point the app at it with OLLAMA_URL=http://127.0.0.1:11435.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+
+from app.services.embeddings import HashingEmbedder
+
+
+@dataclass
+class StubConfig:
+    first_token_ms: float = 150.0     # delay before the first token
+    tokens_per_sec: float = 50.0      # steady-state generation rate
+    reply_tokens: int = 40            # tokens per reply
+    fail_first: int = 0               # answer 503 to the first N requests
+    stall_after_tokens: int | None = None   # stop sending (but keep socket open) after N tokens
+    load_ms: float = 0.0              # one-off model load on the first generate (cold start)
+
+    @classmethod
+    def from_env(cls) -> "StubConfig":
+        return cls(
+            first_token_ms=float(os.environ.get("AI_STUB_FIRST_TOKEN_MS", cls.first_token_ms)),
+            tokens_per_sec=float(os.environ.get("AI_STUB_TOKENS_PER_SEC", cls.tokens_per_sec)),
+            reply_tokens=int(os.environ.get("AI_STUB_REPLY_TOKENS", cls.reply_tokens)),
+            load_ms=float(os.environ.get("AI_STUB_LOAD_MS", cls.load_ms)),
+        )
+
+
+def _reply_tokens(prompt: str, count: int) -> list[str]:
+    """Deterministic pseudo-text: same prompt → same reply."""
+    words = ["incident", "ticket", "dataset", "risk", "priority", "analysis", "trend",
+             "critical", "system", "staff", "workload", "summary", "status", "recommend"]
+    digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+    return [(" " if i else "") + words[digest[i % len(digest)] % len(words)] for i in range(count)]
+
+
+class StubBackend:
+    """
+    AIAssistant backend with scripted timing: `first_token_ms` of "prefill",
+    then `reply_tokens` tokens at `tokens_per_sec`. Same prompt, same reply.
+    """
+
+    max_parallel = None
+    circuit_state = "closed"
+
+    def __init__(self, config: StubConfig | None = None):
+        self.config = config or StubConfig()
+        self._loaded = {}             # model -> keep_alive it was last loaded with
+        self._lock = threading.Lock()
+
+    @property
+    def endpoint(self) -> str:
+        return "stub://"
+
+    def load(self, model: str, keep_alive: str | None = None) -> float:
+        """Seconds spent loading `model` (only the first time)."""
+        with self._lock:
+            cold = model not in self._loaded
+            self._loaded[model] = keep_alive or "5m"
+        if cold and self.config.load_ms:
+            time.sleep(self.config.load_ms / 1000)
+            return self.config.load_ms / 1000
+        return 0.0
+
+    def loaded_models(self) -> list[dict]:
+        with self._lock:
+            return [{"name": m, "model": m, "keep_alive": k} for m, k in self._loaded.items()]
+
+    def generate(self, model: str, prompt: str, context: list[int] | None = None,
+                 keep_alive: str | None = None) -> Iterator[dict]:
+        cfg = self.config
+        started = time.perf_counter()
+        load_seconds = self.load(model, keep_alive)
+        # An empty prompt just loads the model (warm-up)
+        tokens = _reply_tokens(prompt, cfg.reply_tokens) if prompt else []
+        prompt_tokens = max(1, len(prompt) // 4)
+        time.sleep(cfg.first_token_ms / 1000)
+        gap = 1.0 / cfg.tokens_per_sec if cfg.tokens_per_sec > 0 else 0.0
+
+        for token in tokens:
+            yield {"model": model, "response": token, "done": False}
+            if gap:
+                time.sleep(gap)
+
+        # Fake token ids: the incoming context grows by this prompt and reply
+        yield {
+            "model": model,
+            "response": "",
+            "done": True,
+            "total_duration": int((time.perf_counter() - started) * 1e9),
+            "load_duration": int(load_seconds * 1e9),
+            "prompt_eval_count": prompt_tokens,
+            "prompt_eval_duration": int(cfg.first_token_ms * 1e6),
+            "eval_count": len(tokens),
+            "eval_duration": int(len(tokens) * gap * 1e9),
+            "context": list(context or []) + list(range(prompt_tokens + len(tokens))),
+        }
+
+    def embed(self, model: str, texts: list[str]) -> list[list[float]]:
+        return HashingEmbedder().embed(texts).tolist()
+
+
+class _State:
+    def __init__(self, config: StubConfig):
+        self.config = config
+        self.backend = StubBackend(config)
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def next_request_number(self) -> int:
+        with self.lock:
+            self.requests += 1
+            return self.requests
+
+
+def _make_handler(state: _State):
+
+    class OllamaStubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status: int, obj: dict):
+            body = json.dumps(obj).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _chunk(self, obj: dict):
+            line = (json.dumps(obj) + "\n").encode("utf-8")
+            self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+            self.wfile.flush()
+
+        def do_GET(self):
+            if self.path == "/api/tags":
+                self._send_json(200, {"models": [{"name": "phi3:mini"}]})
+            elif self.path == "/api/ps":
+                self._send_json(200, {"models": state.backend.loaded_models()})
+            else:
+                self._send_json(404, {"error": "not found"})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            cfg = state.config
+
+            if state.next_request_number() <= cfg.fail_first:
+                self._send_json(503, {"error": "stub: simulated overload"})
+                return
+
+            if self.path == "/api/embed":
+                texts = payload.get("input", [])
+                texts = [texts] if isinstance(texts, str) else texts
+                vectors = state.backend.embed(payload.get("model"), texts)
+                self._send_json(200, {"model": payload.get("model"), "embeddings": vectors})
+                return
+
+            if self.path != "/api/generate":
+                self._send_json(404, {"error": "not found"})
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+            stream = payload.get("stream", True)
+            text = []
+            chunks = state.backend.generate(payload.get("model"), payload.get("prompt", ""),
+                                            payload.get("context"), payload.get("keep_alive"))
+            for i, chunk in enumerate(chunks):
+                if chunk["done"]:
+                    if not stream:
+                        chunk["response"] = "".join(text)
+                    self._chunk(chunk)
+                elif cfg.stall_after_tokens is not None and i >= cfg.stall_after_tokens:
+                    time.sleep(3600)
+                elif stream:
+                    self._chunk(chunk)
+                else:
+                    text.append(chunk["response"])
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+
+    return OllamaStubHandler
+
+
+def start_stub_server(port: int = 0, config: StubConfig | None = None,
+                      host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Start the stub on a daemon thread and return the server.
+
+    Use port=0 for a free port; the URL is
+    f"http://{host}:{server.server_address[1]}". Call server.shutdown() to stop.
+    """
+    server = ThreadingHTTPServer((host, port), _make_handler(_State(config or StubConfig())))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline Ollama API stub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--first-token-ms", type=float, default=StubConfig.first_token_ms)
+    parser.add_argument("--tokens-per-sec", type=float, default=StubConfig.tokens_per_sec)
+    parser.add_argument("--reply-tokens", type=int, default=StubConfig.reply_tokens)
+    parser.add_argument("--fail-first", type=int, default=0)
+    parser.add_argument("--stall-after-tokens", type=int, default=None)
+    parser.add_argument("--load-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    config = StubConfig(
+        first_token_ms=args.first_token_ms,
+        tokens_per_sec=args.tokens_per_sec,
+        reply_tokens=args.reply_tokens,
+        fail_first=args.fail_first,
+        stall_after_tokens=args.stall_after_tokens,
+        load_ms=args.load_ms,
+    )
+    server = start_stub_server(args.port, config, args.host)
+    print(f"Ollama stub listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+bcrypt hashing with a configurable work factor, run on a small shared pool.
+
+Each cost step doubles the time per hash, so the right BCRYPT_ROUNDS
+depends on the server. Measure it with:
+
+    python -m app.services.password_hasher --target-ms 250
+
+Stored hashes carry their own cost, so changing BCRYPT_ROUNDS is safe:
+old hashes still verify and are upgraded the next time their owner logs in.
+"""
+
+import argparse
+import hashlib
+import hmac
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", "12"))      # bcrypt's own default
+HASH_WORKERS = int(os.environ.get("AUTH_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+TARGET_MS = 250.0            # calibration default: slow for attackers, tolerable at login
+MIN_ROUNDS, MAX_ROUNDS = 10, 16
+
+
+def bcrypt_hash(plain: str, rounds: int = BCRYPT_ROUNDS) -> str:
+    """One bcrypt hash, computed on the calling thread (module-level so process pools can pickle it)."""
+    return bcrypt.hashpw(plain.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+def detect_scheme(hashed: str) -> str | None:
+    """'bcrypt' or 'sha256' (unsalted hex digest, from the old users.txt), else None."""
+    if hash_cost(hashed) is not None:
+        return "bcrypt"
+    if len(hashed) == 64 and all(c in "0123456789abcdefABCDEF" for c in hashed):
+        return "sha256"
+    return None
+
+
+def hash_cost(hashed: str) -> int | None:
+    """The work factor stored in a bcrypt hash ("$2b$12$..." → 12), or None if it is not bcrypt."""
+    parts = hashed.split("$")
+    if len(parts) == 4 and parts[1] in ("2a", "2b", "2y") and parts[2].isdigit():
+        return int(parts[2])
+    return None
+
+
+class PasswordHasher:
+    """
+    Hashes and verifies on a bounded thread pool. bcrypt releases the GIL,
+    so at most `max_workers` hashes burn CPU at once however many sessions
+    log in together; the rest wait their turn.
+    """
+
+    def __init__(self, rounds: int = BCRYPT_ROUNDS, max_workers: int = HASH_WORKERS):
+        if not 4 <= rounds <= 31:
+            raise ValueError(f"bcrypt rounds must be between 4 and 31, got {rounds}")
+        self._rounds = rounds
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_workers),
+                                        thread_name_prefix="bcrypt")
+
+    @property
+    def rounds(self) -> int:
+        return self._rounds
+
+    def hash(self, plain: str) -> str:
+        return self._pool.submit(bcrypt_hash, plain, self._rounds).result()
+
+    def verify(self, plain: str, hashed: str, algorithm: str = "bcrypt") -> bool:
+        """False for a wrong password or a hash that is not `algorithm`."""
+        if algorithm == "sha256":
+            digest = hashlib.sha256(plain.encode("utf-8")).hexdigest()
+            return hmac.compare_digest(digest, hashed.lower())
+        if algorithm != "bcrypt":
+            return False
+        return self._pool.submit(self._verify, plain, hashed).result()
+
+    def needs_rehash(self, hashed: str, algorithm: str = "bcrypt") -> bool:
+        return algorithm != "bcrypt" or hash_cost(hashed) != self._rounds
+
+    @staticmethod
+    def _verify(plain: str, hashed: str) -> bool:
+        try:
+            return bcrypt.checkpw(plain.encode("utf-8"), hashed.encode("utf-8"))
+        except ValueError:
+            return False
+
+
+# ---------------------------------------------------------
+# One hasher (and pool) per process, shared by every session
+# ---------------------------------------------------------
+_hasher = None
+_hasher_lock = threading.Lock()
+
+
+def get_hasher() -> PasswordHasher:
+    global _hasher
+    with _hasher_lock:
+        if _hasher is None:
+            _hasher = PasswordHasher()
+        return _hasher
+
+
+# ---------------------------------------------------------
+# Calibration
+# ---------------------------------------------------------
+def time_hash(rounds: int, samples: int = 3) -> float:
+    """Median milliseconds for one hash at `rounds` on this machine."""
+    times = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        bcrypt.hashpw(b"calibration-password", bcrypt.gensalt(rounds))
+        times.append((time.perf_counter() - started) * 1000)
+    return sorted(times)[len(times) // 2]
+
+
+def calibrate(target_ms: float = TARGET_MS, min_rounds: int = MIN_ROUNDS,
+              max_rounds: int = MAX_ROUNDS) -> tuple[int, list[tuple[int, float]]]:
+    """
+    Highest cost whose hash fits in `target_ms` (never below `min_rounds`),
+    plus the (rounds, ms) measurements. Stops once a cost exceeds the
+    target, since each further step only doubles the time.
+    """
+    measured = []
+    best = min_rounds
+    for rounds in range(min_rounds, max_rounds + 1):
+        ms = time_hash(rounds)
+        measured.append((rounds, ms))
+        if ms > target_ms:
+            break
+        best = rounds
+    return best, measured
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pick a bcrypt cost for this machine")
+    parser.add_argument("--target-ms", type=float, default=TARGET_MS,
+                        help="latency budget for one hash")
+    parser.add_argument("--min-rounds", type=int, default=MIN_ROUNDS)
+    parser.add_argument("--max-rounds", type=int, default=MAX_ROUNDS)
+    args = parser.parse_args()
+
+    best, measured = calibrate(args.target_ms, args.min_rounds, args.max_rounds)
+    for rounds, ms in measured:
+        print(f"  cost {rounds:>2}: {ms:8.1f} ms{'  ←' if rounds == best else ''}")
+    print(f"Recommended: BCRYPT_ROUNDS={best} (target {args.target_ms:g} ms, "
+          f"current {BCRYPT_ROUNDS}, {HASH_WORKERS} hashing workers)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+from typing import Any, NamedTuple
+
+from app.services.database_manager import DatabaseManager
+
+
+class Page(NamedTuple):
+    """One page of records plus the cursors needed to move around."""
+    batch: Any                 # a columnar batch (see app/models/batches.py)
+    total: int                 # rows matching the filters
+    next_cursor: int | None    # pass as after=...  (None → last page)
+    prev_cursor: int | None    # pass as before=... (None → first page)
+
+
+class SearchPage(NamedTuple):
+    """One page of full-text hits, best match first."""
+    batch: Any                 # matching records, in rank order
+    snippets: list[str]        # highlighted description excerpt per record
+    total: int                 # hits matching query + filters
+    page_no: int               # 0-based
+    pages: int
+
+
+def to_match_query(text: str) -> str:
+    """
+    Turn free text into a safe FTS5 MATCH expression.
+
+    Every word is quoted (so punctuation can't break the query syntax)
+    and all words must match; the last word also matches as a prefix.
+    """
+    words = [w.replace('"', '""') for w in text.split()]
+    if not words:
+        return ""
+    terms = [f'"{w}"' for w in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+class RecordBrowser:
+    """
+    Filtered, keyset-paginated access to one table.
+
+    Filters become parameterised WHERE clauses and pages are fetched with
+    `key > cursor ORDER BY key LIMIT n`, so every request touches at most
+    one page of rows no matter how deep the user scrolls.
+    """
+
+    def __init__(self, db: DatabaseManager, batch_cls, filter_columns: tuple[str, ...],
+                 fts_table: str | None = None):
+        self._db = db
+        self._batch_cls = batch_cls
+        self._table = batch_cls.TABLE
+        self._key = batch_cls.KEY
+        self._filter_columns = filter_columns
+        self._fts_table = fts_table
+
+    # -----------------------------
+    # WHERE builder
+    # -----------------------------
+    def _where(self, filters: dict | None, extra: list[str] | None = None,
+               extra_params: list | None = None, alias: str = "") -> tuple[str, list]:
+        clauses, params = [], []
+        for column, value in (filters or {}).items():
+            if value is None or value == "All":
+                continue
+            if column not in self._filter_columns:
+                raise ValueError(f"Cannot filter {self._table} on {column!r}.")
+            clauses.append(f"{alias}{column} = ?")
+            params.append(value)
+        clauses += extra or []
+        params += extra_params or []
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    # -----------------------------
+    # Queries
+    # -----------------------------
+    def filter_options(self, column: str) -> list[str]:
+        """Distinct non-null values for a filter dropdown (served from the column index)."""
+        if column not in self._filter_columns:
+            raise ValueError(f"Cannot filter {self._table} on {column!r}.")
+        rows = self._db.fetch_all(
+            f"SELECT DISTINCT {column} FROM {self._table} "
+            f"WHERE {column} IS NOT NULL ORDER BY {column}"
+        )
+        return [r[0] for r in rows]
+
+    def count(self, filters: dict | None = None) -> int:
+        where, params = self._where(filters)
+        return self._db.fetch_one(f"SELECT COUNT(*) FROM {self._table}{where}", params)[0]
+
+    def group_counts(self, filters: dict | None, columns: tuple[str, ...]) -> list[tuple]:
+        """(col1, col2, ..., count) rows for charts, computed in SQL."""
+        where, params = self._where(filters)
+        cols = ", ".join(columns)
+        return self._db.fetch_all(
+            f"SELECT {cols}, COUNT(*) FROM {self._table}{where} GROUP BY {cols}",
+            params,
+        )
+
+    def exists(self, key_value) -> bool:
+        return self._db.fetch_one(
+            f"SELECT 1 FROM {self._table} WHERE {self._key} = ?", (key_value,)
+        ) is not None
+
+    def page(self, filters: dict | None = None, page_size: int = 50,
+             after: int | None = None, before: int | None = None) -> Page:
+        """
+        Fetch one page.
+
+        after=None, before=None → first page
+        after=<cursor>          → page following that key
+        before=<cursor>         → page preceding that key
+        """
+        key = self._key
+        backwards = before is not None and after is None
+
+        if backwards:
+            where, params = self._where(filters, [f"{key} < ?"], [before])
+            order = "DESC"
+        elif after is not None:
+            where, params = self._where(filters, [f"{key} > ?"], [after])
+            order = "ASC"
+        else:
+            where, params = self._where(filters)
+            order = "ASC"
+
+        # One extra row tells us whether another page exists in that direction
+        rows = self._db.fetch_all(
+            f"{self._batch_cls.SELECT_SQL}{where} ORDER BY {key} {order} LIMIT ?",
+            params + [page_size + 1],
+        )
+        more = len(rows) > page_size
+        rows = rows[:page_size]
+
+        if backwards:
+            rows.reverse()
+            prev_cursor = rows[0][0] if more and rows else None
+            next_cursor = rows[-1][0] if rows else None
+        else:
+            next_cursor = rows[-1][0] if more else None
+            prev_cursor = rows[0][0] if after is not None and rows else None
+
+        return Page(
+            batch=self._batch_cls.from_rows(rows),
+            total=self.count(filters),
+            next_cursor=next_cursor,
+            prev_cursor=prev_cursor,
+        )
+
+    def search(self, text: str, filters: dict | None = None,
+               page_size: int = 20, page_no: int = 0) -> SearchPage:
+        """
+        Full-text search over the description column, ranked by bm25.
+
+        Ranking has to look at every hit, so pages are addressed by number
+        (LIMIT/OFFSET) rather than keyset cursors.
+        """
+        if not self._fts_table:
+            raise ValueError(f"{self._table} has no full-text index configured.")
+
+        match = to_match_query(text)
+        fts, key = self._fts_table, self._key
+        empty = SearchPage(self._batch_cls.from_rows([]), [], 0, 0, 0)
+        if not match:
+            return empty
+
+        where, params = self._where(filters, [f"{fts} MATCH ?"], [match], alias="t.")
+        # CROSS JOIN pins the FTS index as the outer loop (hits drive the lookup)
+        joined = f"{fts} CROSS JOIN {self._table} AS t ON t.{key} = {fts}.rowid"
+
+        total = self._db.fetch_one(f"SELECT COUNT(*) FROM {joined}{where}", params)[0]
+        if total == 0:
+            return empty
+
+        pages = (total + page_size - 1) // page_size
+        page_no = max(0, min(page_no, pages - 1))
+        columns = ", ".join(f"t.{c}" for c in self._batch_cls.COLUMNS)
+        # rank == bm25() by default; snippets are only built for the returned page
+        rows = self._db.fetch_all(
+            f"SELECT snippet({fts}, 0, '**', '**', '…', 16), {columns} "
+            f"FROM {joined}{where} ORDER BY {fts}.rank LIMIT ? OFFSET ?",
+            params + [page_size, page_no * page_size],
+        )
+
+        return SearchPage(
+            batch=self._batch_cls.from_rows([r[1:] for r in rows]),
+            snippets=[r[0] or "" for r in rows],
+            total=total,
+            page_no=page_no,
+            pages=pages,
+        )
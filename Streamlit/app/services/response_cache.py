@@ -0,0 +1,165 @@
+import hashlib
+import os
+import re
+import threading
+import time
+
+from app.data.db import get_pool
+
+# Kept out of the main database so cache traffic never contends with
+# (or bumps the data version of) the incident / ticket tables.
+CACHE_DB_PATH = os.path.join('DATA', 'ai_cache.db')
+
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+
+_SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS llm_responses (
+        cache_key TEXT PRIMARY KEY,
+        model TEXT NOT NULL,
+        prompt TEXT NOT NULL,
+        data_version TEXT NOT NULL,
+        response TEXT NOT NULL,
+        size_bytes INTEGER NOT NULL,
+        created_at REAL NOT NULL,
+        last_used REAL NOT NULL,
+        hit_count INTEGER NOT NULL DEFAULT 0
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_llm_responses_last_used ON llm_responses (last_used)',
+]
+
+_ready_paths = set()
+_ready_lock = threading.Lock()
+
+# Process-wide hit/miss counters per cache file
+_counters = {}
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Case-fold, collapse whitespace and drop trailing punctuation."""
+    text = re.sub(r'\s+', ' ', prompt.strip().lower())
+    return text.rstrip(' ?!.')
+
+
+class ResponseCache:
+    """
+    Persistent cache of model answers.
+
+    Entries are keyed on (model, normalised prompt, data version), so an
+    answer is reused until the underlying data changes. Least-recently-used
+    entries are evicted once the entry or byte cap is exceeded.
+    """
+
+    def __init__(self, db_path: str = CACHE_DB_PATH,
+                 max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self._pool = get_pool(db_path)
+        self._db_path = db_path
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._ensure_schema()
+        with _ready_lock:
+            self._counters = _counters.setdefault(os.path.abspath(db_path), {'hits': 0, 'misses': 0})
+
+    def _ensure_schema(self):
+        key = os.path.abspath(self._db_path)
+        with _ready_lock:
+            if key in _ready_paths:
+                return
+        with self._pool.writer() as conn:
+            for sql in _SCHEMA:
+                conn.execute(sql)
+        with _ready_lock:
+            _ready_paths.add(key)
+
+    @staticmethod
+    def make_key(model: str, prompt: str, data_version: str = '') -> str:
+        raw = f'{model}\0{normalize_prompt(prompt)}\0{data_version}'
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    # -----------------------------
+    # Lookup / store
+    # -----------------------------
+    def get(self, model: str, prompt: str, data_version: str = '') -> str | None:
+        key = self.make_key(model, prompt, data_version)
+        with self._pool.reader() as conn:
+            row = conn.execute(
+                'SELECT response FROM llm_responses WHERE cache_key = ?', (key,)
+            ).fetchone()
+
+        with _ready_lock:
+            self._counters['hits' if row else 'misses'] += 1
+        if row is None:
+            return None
+
+        with self._pool.writer() as conn:
+            conn.execute(
+                'UPDATE llm_responses SET last_used = ?, hit_count = hit_count + 1 WHERE cache_key = ?',
+                (time.time(), key),
+            )
+        return row[0]
+
+    def put(self, model: str, prompt: str, data_version: str, response: str):
+        if not response:
+            return
+        key = self.make_key(model, prompt, data_version)
+        now = time.time()
+        with self._pool.writer() as conn:
+            conn.execute(
+                '''
+                INSERT INTO llm_responses
+                    (cache_key, model, prompt, data_version, response, size_bytes, created_at, last_used)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(cache_key) DO UPDATE SET
+                    response = excluded.response,
+                    size_bytes = excluded.size_bytes,
+                    last_used = excluded.last_used
+                ''',
+                (key, model, normalize_prompt(prompt), data_version, response,
+                 len(response.encode('utf-8')), now, now),
+            )
+            self._evict(conn)
+
+    def _evict(self, conn):
+        """Drop least-recently-used rows until both caps are satisfied."""
+        entries, total = conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM llm_responses'
+        ).fetchone()
+        if entries <= self._max_entries and total <= self._max_bytes:
+            return
+
+        excess_bytes = total - self._max_bytes
+        freed, doomed = 0, []
+        for key, size in conn.execute(
+            'SELECT cache_key, size_bytes FROM llm_responses ORDER BY last_used'
+        ):
+            if entries - len(doomed) <= self._max_entries and freed >= excess_bytes:
+                break
+            doomed.append((key,))
+            freed += size
+        conn.executemany('DELETE FROM llm_responses WHERE cache_key = ?', doomed)
+
+    # -----------------------------
+    # Admin
+    # -----------------------------
+    def stats(self) -> dict:
+        with self._pool.reader() as conn:
+            entries, total = conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM llm_responses'
+            ).fetchone()
+        with _ready_lock:
+            hits, misses = self._counters['hits'], self._counters['misses']
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'entries': entries,
+            'bytes': total,
+        }
+
+    def clear(self):
+        with self._pool.writer() as conn:
+            conn.execute('DELETE FROM llm_responses')
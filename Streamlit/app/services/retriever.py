@@ -0,0 +1,245 @@
+"""
+Retrieval of the incidents and tickets most relevant to a question.
+
+Descriptions are embedded into one on-disk vector index per table. SQLite
+triggers (migrations 7 and 9) queue every inserted, edited or deleted row, and
+sync() drains that queue, so the index follows CRUD changes incrementally.
+Pages only read the index; sync_in_background() drains the queue on one
+thread per database. Backfill a large database from the command line:
+
+    python -m app.services.retriever sync
+    python -m app.services.retriever search "ransomware on the finance share"
+"""
+
+import argparse
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+from app.services.ai_assistant import AIUnavailableError, estimate_tokens
+from app.services.database_manager import DatabaseManager
+from app.services.embeddings import get_embedder
+from app.services.vector_index import get_index
+
+RAG_TOKENS = 800            # prompt budget for retrieved records
+TOP_K = 8                   # candidates per table
+EMBED_BATCH = 64
+MAX_DESCRIPTION_CHARS = 400
+SYNC_ROWS = 256             # rows embedded per background pass
+SYNC_IDLE = float(os.environ.get("RETRIEVER_SYNC_IDLE", "5"))   # seconds between checks of an empty queue
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class _Source:
+    name: str
+    table: str
+    key: str
+    columns: tuple
+
+    def render(self, row) -> str:
+        key, *fields, description = row
+        label = "Incident" if self.name == "incidents" else "Ticket"
+        meta = ", ".join(str(f) for f in fields if f not in (None, ""))
+        text = " ".join((description or "").split())[:MAX_DESCRIPTION_CHARS]
+        return f"- {label} #{key} ({meta}): {text}"
+
+
+SOURCES = (
+    _Source("incidents", "cyber_incidents", "incident_id",
+            ("incident_id", "timestamp", "severity", "category", "status", "description")),
+    _Source("tickets", "it_tickets", "ticket_id",
+            ("ticket_id", "created_at", "priority", "status", "assigned_to", "description")),
+)
+
+
+@dataclass
+class RetrievedRecord:
+    source: str
+    record_id: int
+    score: float
+    text: str
+
+
+class Retriever:
+    """Keeps the vector indexes in step with the database and answers top-k queries."""
+
+    def __init__(self, db: DatabaseManager, embedder=None):
+        self._db = db
+        self._embedder = embedder or get_embedder()
+        root = os.path.join(os.path.dirname(db.db_path) or ".", "vectors")
+        self._indexes = {s.name: get_index(os.path.join(root, s.name)) for s in SOURCES}
+
+    # -----------------------------
+    # Indexing
+    # -----------------------------
+    def _check_model(self, source: _Source):
+        """A different embedding model means a different vector space: start over."""
+        if not self._indexes[source.name].ensure_model(self._embedder.name):
+            return
+        self._db.execute_query(
+            f"INSERT OR IGNORE INTO embedding_queue (table_name, row_id) "
+            f"SELECT ?, {source.key} FROM {source.table}",
+            (source.table,),
+        )
+
+    def index_version(self) -> str:
+        """Stamp of every index; retrieved records can only change when it does."""
+        return "/".join(self._indexes[s.name].version for s in SOURCES)
+
+    def pending(self) -> int:
+        return self._db.fetch_one("SELECT COUNT(*) FROM embedding_queue")[0]
+
+    def sync(self, max_rows: int | None = None, batch: int = EMBED_BATCH) -> int:
+        """
+        Embed queued rows (oldest first) until the queue is empty or
+        `max_rows` have been processed. Returns the number processed.
+        """
+        done = 0
+        for source in SOURCES:
+            self._check_model(source)
+            index = self._indexes[source.name]
+            while max_rows is None or done < max_rows:
+                limit = batch if max_rows is None else min(batch, max_rows - done)
+                queued = self._db.fetch_all(
+                    "SELECT rowid, row_id FROM embedding_queue WHERE table_name = ? "
+                    "ORDER BY rowid LIMIT ?",
+                    (source.table, limit),
+                )
+                if not queued:
+                    break
+
+                ids = [row_id for _, row_id in queued]
+                marks = ",".join("?" * len(ids))
+                rows = self._db.fetch_all(
+                    f"SELECT {source.key}, description FROM {source.table} "
+                    f"WHERE {source.key} IN ({marks})",
+                    ids,
+                )
+                texts = {key: desc for key, desc in rows if desc and desc.strip()}
+                if texts:
+                    index.upsert(list(texts), self._embedder.embed(list(texts.values())))
+                gone = [i for i in ids if i not in texts]
+                if gone:
+                    index.delete(gone)
+
+                self._db.execute_many(
+                    "DELETE FROM embedding_queue WHERE rowid = ?",
+                    [(rowid,) for rowid, _ in queued],
+                )
+                done += len(queued)
+        return done
+
+    def compact(self):
+        """Fold pending CRUD changes into the base segments (and train IVF lists)."""
+        for index in self._indexes.values():
+            index.compact()
+
+    # -----------------------------
+    # Retrieval
+    # -----------------------------
+    def retrieve(self, question: str, k: int = TOP_K,
+                 token_budget: int = RAG_TOKENS) -> list[RetrievedRecord]:
+        """Best matches across both tables, trimmed to fit `token_budget`."""
+        query = self._embedder.embed([question])[0]
+        hits = []
+        for source in SOURCES:
+            matches = self._indexes[source.name].search(query, k)
+            if not matches:
+                continue
+            scores = dict(matches)
+            marks = ",".join("?" * len(scores))
+            rows = self._db.fetch_all(
+                f"SELECT {', '.join(source.columns)} FROM {source.table} "
+                f"WHERE {source.key} IN ({marks})",
+                list(scores),
+            )
+            hits += [RetrievedRecord(source.name, row[0], scores[row[0]], source.render(row))
+                     for row in rows]
+
+        hits.sort(key=lambda h: h.score, reverse=True)
+        selected, used = [], 0
+        for hit in hits:
+            cost = estimate_tokens(hit.text)
+            if used + cost > token_budget:
+                continue
+            selected.append(hit)
+            used += cost
+        return selected
+
+    @staticmethod
+    def render(records: list[RetrievedRecord]) -> str:
+        if not records:
+            return ""
+        lines = "\n".join(r.text for r in records)
+        return f"\n### RELEVANT RECORDS\n{lines}\n"
+
+
+# ---------------------------------------------------------
+# One background syncer per database, shared by every session
+# ---------------------------------------------------------
+_syncers = {}
+_syncers_lock = threading.Lock()
+
+
+def _sync_forever(retriever: Retriever):
+    while True:
+        try:
+            done = retriever.sync(max_rows=SYNC_ROWS)
+        except AIUnavailableError:
+            done = 0        # embedder down; the queue keeps until it is back
+        except Exception:
+            log.exception("Background embedding sync failed")
+            done = 0
+        if not done:
+            time.sleep(SYNC_IDLE)
+
+
+def sync_in_background(db: DatabaseManager):
+    """Start draining db's embedding queue on a daemon thread (once per process)."""
+    key = os.path.abspath(db.db_path)
+    with _syncers_lock:
+        if key in _syncers:
+            return
+        thread = threading.Thread(target=_sync_forever, args=(Retriever(db),),
+                                  name="retriever-sync", daemon=True)
+        _syncers[key] = thread
+    thread.start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vector index for incident / ticket descriptions")
+    parser.add_argument("--db", default=os.path.join("DATA", "intelligence_platform.db"))
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("sync", help="embed every queued row")
+    search = sub.add_parser("search", help="show the top matches for a query")
+    search.add_argument("query")
+    search.add_argument("-k", type=int, default=TOP_K)
+    args = parser.parse_args()
+
+    retriever = Retriever(DatabaseManager(args.db))
+    if args.command == "sync":
+        started = time.perf_counter()
+        total = 0
+        while True:
+            n = retriever.sync(max_rows=5000)
+            if not n:
+                break
+            total += n
+            elapsed = time.perf_counter() - started
+            print(f"{total} rows embedded ({total / elapsed:.0f}/s), {retriever.pending()} queued")
+        retriever.compact()
+        print("✓ Vector index up to date")
+    else:
+        started = time.perf_counter()
+        records = retriever.retrieve(args.query, k=args.k, token_budget=10 ** 9)
+        print(f"{len(records)} results in {(time.perf_counter() - started) * 1000:.1f} ms")
+        for r in records:
+            print(f"{r.score:.3f}  {r.text}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+import os
+import re
+import sqlite3
+import time
+from dataclasses import dataclass
+
+from app.data.schema import QUERYABLE_COLUMNS
+from app.services.ai_assistant import AIAssistant
+from app.services.ai_scheduler import Flight, get_scheduler
+from app.services.database_manager import DatabaseManager
+from app.services.response_cache import ResponseCache
+
+MAX_ROWS = 200           # rows fetched per query
+SUMMARY_ROWS = 30        # rows shown to the model when it writes the answer
+TIME_LIMIT = 2.0         # seconds a query may run
+MAX_ATTEMPTS = 2         # first draft + one repair with the error message
+
+# Scalar / aggregate functions a generated query may call
+ALLOWED_FUNCTIONS = frozenset({
+    'count', 'sum', 'total', 'avg', 'min', 'max', 'group_concat',
+    'lower', 'upper', 'length', 'substr', 'trim', 'instr', 'replace', 'like', 'glob',
+    'round', 'abs', 'coalesce', 'ifnull', 'nullif', 'iif', 'printf',
+    'date', 'time', 'datetime', 'julianday', 'strftime',
+})
+
+# Low-cardinality columns whose values are listed in the SQL prompt
+HINT_COLUMNS = (
+    ('cyber_incidents', 'severity'), ('cyber_incidents', 'category'),
+    ('cyber_incidents', 'status'), ('it_tickets', 'priority'), ('it_tickets', 'status'),
+)
+
+SQL_PROMPT = """You translate questions into one SQLite SELECT statement.
+
+Tables:
+{schema}
+
+Known values:
+{hints}
+
+Rules:
+- Return only the SQL, with no explanation.
+- A single read-only SELECT (WITH is allowed); only the tables and columns above.
+- Do the arithmetic in SQL (COUNT, SUM, AVG, GROUP BY) instead of returning raw rows.
+- Add LIMIT {max_rows} when listing individual records.
+{repair}
+Question: {question}
+SQL:"""
+
+REPAIR = "\nYour previous query was:\n{sql}\nIt failed with: {error}\nWrite a corrected query.\n"
+
+ANSWER_PROMPT = """Question: {question}
+
+This SQL query was run against the platform database:
+{sql}
+
+Result ({summary}):
+{table}
+
+Answer the question in plain language using only these figures."""
+
+
+class SQLQueryError(ValueError):
+    """A generated query was rejected by the allow-list, failed, or ran too long."""
+
+
+@dataclass
+class QueryResult:
+    sql: str
+    columns: list
+    rows: list
+    truncated: bool
+    elapsed_ms: float
+
+
+def extract_sql(text: str) -> str:
+    """Pull the statement out of a model reply (code fences, chatter, trailing ';')."""
+    fenced = re.search(r"```(?:sql)?\s*(.*?)```", text, re.S | re.I)
+    if fenced:
+        text = fenced.group(1)
+    start = re.search(r"\b(with|select)\b", text, re.I)
+    if start:
+        text = text[start.start():]
+    return text.strip().split(";")[0].strip()
+
+
+def run_readonly_query(db_path: str, sql: str, max_rows: int = MAX_ROWS,
+                       time_limit: float = TIME_LIMIT) -> QueryResult:
+    """
+    Run one SELECT on a read-only connection.
+
+    SQLite's authorizer checks every table, column and function the
+    compiled statement touches against QUERYABLE_COLUMNS / ALLOWED_FUNCTIONS,
+    so nothing outside the allow-list can be read however the SQL is
+    written. A progress handler aborts queries that exceed `time_limit`.
+    """
+    sql = sql.strip().rstrip(';').strip()
+    if not re.match(r"(select|with)\b", sql, re.I):
+        raise SQLQueryError("Only SELECT queries are allowed.")
+
+    denied = []
+
+    def authorize(action, arg1, arg2, dbname, source):
+        if action == sqlite3.SQLITE_SELECT:
+            return sqlite3.SQLITE_OK
+        if action == sqlite3.SQLITE_READ:
+            columns = QUERYABLE_COLUMNS.get(arg1)
+            if columns is not None and (arg2 == '' or arg2 in columns):
+                return sqlite3.SQLITE_OK
+            denied.append(f"{arg1}.{arg2}" if arg2 else arg1)
+            return sqlite3.SQLITE_DENY
+        if action == sqlite3.SQLITE_FUNCTION and arg2 and arg2.lower() in ALLOWED_FUNCTIONS:
+            return sqlite3.SQLITE_OK
+        denied.append(arg2 if action == sqlite3.SQLITE_FUNCTION else (arg1 or "that operation"))
+        return sqlite3.SQLITE_DENY
+
+    conn = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True)
+    try:
+        conn.execute('PRAGMA query_only = ON')
+        conn.set_authorizer(authorize)
+        deadline = time.perf_counter() + time_limit
+        conn.set_progress_handler(lambda: time.perf_counter() > deadline, 10000)
+
+        started = time.perf_counter()
+        try:
+            cur = conn.execute(sql)
+            rows = cur.fetchmany(max_rows + 1)
+        except sqlite3.Error as e:
+            if denied:
+                raise SQLQueryError(f"Not allowed: {', '.join(dict.fromkeys(denied))}") from e
+            if time.perf_counter() > deadline:
+                raise SQLQueryError(f"Query exceeded the {time_limit:g} s time limit.") from e
+            raise SQLQueryError(str(e)) from e
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        columns = [d[0] for d in cur.description or ()]
+    finally:
+        conn.close()
+
+    return QueryResult(sql, columns, rows[:max_rows], len(rows) > max_rows, elapsed_ms)
+
+
+class SQLAssistant:
+    """
+    Answers questions by having the model write SQL, running it read-only,
+    then having the model explain the result. The figures come from SQLite,
+    and the prompt holds only the schema and a few result rows, so its size
+    does not grow with the data.
+    """
+
+    def __init__(self, db: DatabaseManager, ai: AIAssistant, cache: ResponseCache | None = None,
+                 max_rows: int = MAX_ROWS, time_limit: float = TIME_LIMIT):
+        self._db = db
+        self._ai = ai
+        self._cache = cache or ResponseCache()
+        self._max_rows = max_rows
+        self._time_limit = time_limit
+
+    # -----------------------------
+    # SQL generation
+    # -----------------------------
+    @staticmethod
+    def schema_description() -> str:
+        return "\n".join(f"- {table}({', '.join(cols)})" for table, cols in QUERYABLE_COLUMNS.items())
+
+    def _value_hints(self) -> str:
+        lines = []
+        for table, column in HINT_COLUMNS:
+            rows = self._db.fetch_all(
+                f"SELECT DISTINCT {column} FROM {table} WHERE {column} IS NOT NULL LIMIT 15"
+            )
+            if rows:
+                lines.append(f"- {table}.{column}: {', '.join(repr(r[0]) for r in rows)}")
+        return "\n".join(lines) or "- (no data yet)"
+
+    def generate_sql(self, question: str, previous: str | None = None,
+                     error: str | None = None) -> str:
+        repair = REPAIR.format(sql=previous, error=error) if previous else ""
+        prompt = SQL_PROMPT.format(
+            schema=self.schema_description(), hints=self._value_hints(),
+            max_rows=self._max_rows, repair=repair, question=question,
+        )
+        return extract_sql(get_scheduler(self._ai).ask(self._ai, prompt))
+
+    # -----------------------------
+    # Answering
+    # -----------------------------
+    def answer(self, question: str) -> QueryResult:
+        """
+        Generate and run SQL for `question`, repairing once on failure.
+        Raises SQLQueryError if no valid query is produced.
+        """
+        cache_prompt = "[sql] " + question
+        sql = self._cache.get(self._ai.model, cache_prompt)
+        error = None
+        for attempt in range(MAX_ATTEMPTS):
+            if sql is None or attempt:
+                sql = self.generate_sql(question, sql if attempt else None, error)
+            try:
+                result = run_readonly_query(self._db.db_path, sql, self._max_rows, self._time_limit)
+            except SQLQueryError as e:
+                error = str(e)
+                continue
+            self._cache.put(self._ai.model, cache_prompt, "", sql)
+            return result
+        raise SQLQueryError(f"{error} (query: {sql})")
+
+    def summarize(self, question: str, result: QueryResult) -> Flight:
+        """Queue the plain-language answer; stream it with `.stream()`."""
+        shown = result.rows[:SUMMARY_ROWS]
+        table = "\n".join(
+            [" | ".join(result.columns)] + [" | ".join(str(v) for v in row) for row in shown]
+        )
+        summary = f"{len(result.rows)} rows"
+        if result.truncated or len(result.rows) > len(shown):
+            summary += f", first {len(shown)} shown"
+        prompt = ANSWER_PROMPT.format(question=question, sql=result.sql, summary=summary, table=table)
+        return get_scheduler(self._ai).submit(self._ai, prompt)
@@ -0,0 +1,408 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:          # Windows: only in-process locking
+    fcntl = None
+
+# ---------------------------------------------------------
+# On-disk layout (one directory per collection):
+#
+#   meta.json          model name, dimension, IVF training size
+#   base_ids.npy       int64   ids of the compacted segment, grouped by IVF list
+#   base_vectors.npy   float32 matching unit vectors (memory-mapped; float32 so
+#                      scans go straight to BLAS with no per-query conversion)
+#   offsets.npy        int64   list i spans base[offsets[i]:offsets[i + 1]]
+#   centroids.npy      float32 IVF centroids (absent while the index is small)
+#   delta.log          append-only (id, vector) records written on every CRUD
+#                      change; an all-zero vector marks a delete
+#   write.lock         flock()ed so several processes (the app's background
+#                      sync, the sync CLI) can share one directory: writers
+#                      hold it exclusively, reloads hold it shared
+#
+# Any id present in delta.log shadows its base copy. Once the log grows past
+# COMPACT_THRESHOLD records it is merged into the base segment.
+# ---------------------------------------------------------
+COMPACT_THRESHOLD = 32768
+IVF_MIN_VECTORS = 50000      # below this the base segment is scanned exactly
+NPROBE = 24                  # IVF lists scanned per query
+KMEANS_SAMPLE = 50000
+KMEANS_ITERS = 8
+CHUNK_ROWS = 65536
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class VectorIndex:
+    """
+    Cosine-similarity index backed by NumPy files.
+
+    Small indexes are searched exactly. From IVF_MIN_VECTORS upwards the
+    base segment is partitioned with k-means (an inverted-file index), and
+    a query only scans the NPROBE lists whose centroids are nearest, so
+    latency grows with sqrt(N) rather than N.
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+        self._lock = threading.RLock()
+        self._flock_fd = None
+        self._flock_depth = 0
+        os.makedirs(path, exist_ok=True)
+        with self._lock, self._flocked(exclusive=False):
+            self._load()
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+    def _file(self, name: str) -> str:
+        return os.path.join(self._path, name)
+
+    @contextmanager
+    def _flocked(self, exclusive: bool):
+        """
+        Cross-process lock on write.lock; call with self._lock held. Nested
+        calls reuse the outer lock (writers take it exclusively first).
+        """
+        if fcntl is None or self._flock_depth:
+            self._flock_depth += 1
+            try:
+                yield
+            finally:
+                self._flock_depth -= 1
+            return
+        if self._flock_fd is None:
+            self._flock_fd = os.open(self._file('write.lock'), os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self._flock_fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        self._flock_depth = 1
+        try:
+            yield
+        finally:
+            self._flock_depth = 0
+            fcntl.flock(self._flock_fd, fcntl.LOCK_UN)
+
+    @contextmanager
+    def _writing(self):
+        """Exclusive access across threads and processes, with any outside writes loaded."""
+        with self._lock, self._flocked(exclusive=True):
+            self._refresh()
+            yield
+
+    def _save(self, name: str, array: np.ndarray):
+        tmp = self._file(name + '.tmp')
+        with open(tmp, 'wb') as fh:
+            np.save(fh, array)
+        os.replace(tmp, self._file(name))
+
+    def _write_meta(self):
+        tmp = self._file('meta.json.tmp')
+        with open(tmp, 'w') as fh:
+            json.dump(self._meta, fh)
+        os.replace(tmp, self._file('meta.json'))
+
+    def _stamp(self):
+        """Detects writes made by another process (e.g. the sync CLI)."""
+        stamp = []
+        for name in ('meta.json', 'delta.log'):
+            try:
+                st = os.stat(self._file(name))
+                stamp.append((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    def _record_dtype(self):
+        return np.dtype([('id', '<i8'), ('vec', '<f4', (self.dim,))])
+
+    def _load(self):
+        try:
+            with open(self._file('meta.json')) as fh:
+                self._meta = json.load(fh)
+        except FileNotFoundError:
+            self._meta = {'model': None, 'dim': None, 'trained_size': 0}
+
+        dim = self.dim
+        if dim and os.path.exists(self._file('base_ids.npy')):
+            self._base_ids = np.load(self._file('base_ids.npy'))
+            self._base_vectors = np.load(self._file('base_vectors.npy'), mmap_mode='r')
+            self._offsets = np.load(self._file('offsets.npy'))
+        else:
+            self._base_ids = np.empty(0, dtype=np.int64)
+            self._base_vectors = np.empty((0, dim or 0), dtype=np.float32)
+            self._offsets = np.array([0, 0], dtype=np.int64)
+
+        centroids = self._file('centroids.npy')
+        self._centroids = np.load(centroids) if dim and os.path.exists(centroids) else None
+
+        if dim and os.path.exists(self._file('delta.log')):
+            records = np.fromfile(self._file('delta.log'), dtype=self._record_dtype())
+        else:
+            records = np.empty(0, dtype=self._record_dtype() if dim else [('id', '<i8')])
+        self._set_delta(records)
+        self._loaded_stamp = self._stamp()
+
+    def _set_delta(self, records: np.ndarray):
+        self._delta = records
+        if len(records):
+            # Last record per id wins; zero vectors are deletes
+            rev_ids = records['id'][::-1]
+            _, first = np.unique(rev_ids, return_index=True)
+            latest = len(records) - 1 - first
+            live = latest[np.any(records['vec'][latest] != 0, axis=1)]
+            self._delta_all_ids = np.unique(records['id'])
+            self._delta_live_ids = records['id'][live]
+            self._delta_live_vectors = records['vec'][live]
+        else:
+            self._delta_all_ids = np.empty(0, dtype=np.int64)
+            self._delta_live_ids = np.empty(0, dtype=np.int64)
+            self._delta_live_vectors = np.empty((0, self.dim or 0), dtype=np.float32)
+
+    def _refresh(self):
+        if self._stamp() != self._loaded_stamp:
+            with self._flocked(exclusive=False):
+                self._load()
+
+    # -----------------------------
+    # Properties
+    # -----------------------------
+    @property
+    def model(self) -> str | None:
+        return self._meta.get('model')
+
+    @property
+    def dim(self) -> int | None:
+        return self._meta.get('dim')
+
+    @property
+    def version(self) -> str:
+        """Changes whenever the on-disk index is written, by any process."""
+        return ':'.join('-' if s is None else f'{s[0]}.{s[1]}' for s in self._stamp())
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            shadowed = np.isin(self._base_ids, self._delta_all_ids).sum() if len(self._delta) else 0
+            return int(len(self._base_ids) - shadowed + len(self._delta_live_ids))
+
+    def reset(self, model: str, dim: int | None = None):
+        """Drop every vector (e.g. after switching embedding model)."""
+        with self._writing():
+            for name in ('base_ids.npy', 'base_vectors.npy', 'offsets.npy',
+                         'centroids.npy', 'delta.log'):
+                try:
+                    os.remove(self._file(name))
+                except FileNotFoundError:
+                    pass
+            self._meta = {'model': model, 'dim': dim, 'trained_size': 0}
+            self._write_meta()
+            self._load()
+
+    def ensure_model(self, model: str) -> bool:
+        """Reset the index unless it already holds `model` vectors; True if it was reset."""
+        with self._writing():
+            if self.model == model:
+                return False
+            self.reset(model)
+            return True
+
+    # -----------------------------
+    # Writes
+    # -----------------------------
+    def _append(self, ids, vectors):
+        """Call inside _writing(): the in-memory delta must match the file."""
+        records = np.empty(len(ids), dtype=self._record_dtype())
+        records['id'] = ids
+        records['vec'] = vectors
+        with open(self._file('delta.log'), 'ab') as fh:
+            fh.write(records.tobytes())
+        self._set_delta(np.concatenate([self._delta, records]) if len(self._delta) else records)
+        self._loaded_stamp = self._stamp()
+        if len(self._delta) >= COMPACT_THRESHOLD:
+            self.compact()
+
+    def upsert(self, ids, vectors):
+        ids = np.asarray(ids, dtype=np.int64)
+        if not len(ids):
+            return
+        vectors = _normalize(vectors)
+        with self._writing():
+            if self.dim is None:
+                self._meta['dim'] = int(vectors.shape[1])
+                self._write_meta()
+                self._load()
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f'Expected {self.dim}-d vectors, got {vectors.shape[1]}-d')
+            self._append(ids, vectors)
+
+    def delete(self, ids):
+        ids = np.asarray(ids, dtype=np.int64)
+        with self._writing():
+            if not len(ids) or self.dim is None:
+                return
+            self._append(ids, np.zeros((len(ids), self.dim), dtype=np.float32))
+
+    # -----------------------------
+    # Compaction / IVF training
+    # -----------------------------
+    def _kmeans(self, sample: np.ndarray, nlist: int) -> np.ndarray:
+        rng = np.random.default_rng(0)
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(KMEANS_ITERS):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            empty = np.bincount(assign, minlength=nlist) == 0
+            sums[empty] = centroids[empty]
+            centroids = _normalize(sums)
+        return centroids
+
+    def _assign(self, vectors, centroids: np.ndarray) -> np.ndarray:
+        out = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), CHUNK_ROWS):
+            block = np.asarray(vectors[start:start + CHUNK_ROWS], dtype=np.float32)
+            out[start:start + CHUNK_ROWS] = np.argmax(block @ centroids.T, axis=1)
+        return out
+
+    def compact(self):
+        """Merge delta.log into the base segment, (re)training IVF lists when due."""
+        with self._writing():
+            if not len(self._delta):
+                return
+
+            keep = np.flatnonzero(~np.isin(self._base_ids, self._delta_all_ids))
+            n_base, n_delta = len(keep), len(self._delta_live_ids)
+            total = n_base + n_delta
+            ids = np.concatenate([self._base_ids[keep], self._delta_live_ids])
+
+            def rows(positions):
+                """Vectors for merged positions (base rows first, then live delta rows)."""
+                out = np.empty((len(positions), self.dim), dtype=np.float32)
+                from_base = positions < n_base
+                if from_base.any():
+                    out[from_base] = self._base_vectors[keep[positions[from_base]]]
+                if (~from_base).any():
+                    out[~from_base] = self._delta_live_vectors[positions[~from_base] - n_base]
+                return out
+
+            centroids = self._centroids
+            trained = self._meta.get('trained_size', 0)
+            if total >= IVF_MIN_VECTORS and (centroids is None or total > 2 * trained):
+                nlist = int(min(4096, max(16, np.sqrt(total))))
+                rng = np.random.default_rng(0)
+                sample = np.sort(rng.choice(total, min(total, KMEANS_SAMPLE), replace=False))
+                centroids = self._kmeans(rows(sample), nlist)
+                lists = self._assign(_ChunkedRows(rows, total), centroids)
+                self._meta['trained_size'] = int(total)
+            elif centroids is not None:
+                base_lists = np.repeat(np.arange(len(self._offsets) - 1), np.diff(self._offsets))[keep]
+                lists = np.concatenate([base_lists, self._assign(self._delta_live_vectors, centroids)])
+            else:
+                lists = np.zeros(total, dtype=np.int64)
+
+            nlist = len(centroids) if centroids is not None else 1
+            order = np.argsort(lists, kind='stable')
+            offsets = np.concatenate([[0], np.cumsum(np.bincount(lists, minlength=nlist))])
+
+            if total:
+                tmp = self._file('base_vectors.npy.tmp')
+                out = np.lib.format.open_memmap(tmp, mode='w+', dtype=np.float32,
+                                                shape=(total, self.dim))
+                for start in range(0, total, CHUNK_ROWS):
+                    out[start:start + CHUNK_ROWS] = rows(order[start:start + CHUNK_ROWS])
+                out.flush()
+                del out
+                os.replace(tmp, self._file('base_vectors.npy'))
+            else:
+                self._save('base_vectors.npy', np.empty((0, self.dim), dtype=np.float32))
+            self._save('base_ids.npy', ids[order])
+            self._save('offsets.npy', offsets.astype(np.int64))
+            if centroids is not None:
+                self._save('centroids.npy', centroids.astype(np.float32))
+            self._write_meta()
+            # Only now is it safe to drop the log: replaying it would be harmless
+            # anyway, and no other process can append while we hold write.lock
+            open(self._file('delta.log'), 'wb').close()
+            self._load()
+
+    # -----------------------------
+    # Search
+    # -----------------------------
+    def search(self, query, k: int = 10, nprobe: int = NPROBE) -> list[tuple[int, float]]:
+        """Top-k (id, cosine similarity) pairs, best first."""
+        with self._lock:
+            self._refresh()
+            if self.dim is None:
+                return []
+            q = _normalize(np.asarray(query, dtype=np.float32).reshape(1, -1))[0]
+            ids_parts, score_parts = [], []
+
+            if len(self._base_ids):
+                if self._centroids is not None:
+                    probe = np.argsort(self._centroids @ q)[::-1][:nprobe]
+                    spans = [(self._offsets[i], self._offsets[i + 1]) for i in np.sort(probe)]
+                else:
+                    spans = [(0, len(self._base_ids))]
+                for start, end in spans:
+                    for s in range(start, end, CHUNK_ROWS):
+                        e = min(end, s + CHUNK_ROWS)
+                        if e <= s:
+                            continue
+                        ids = self._base_ids[s:e]
+                        scores = self._base_vectors[s:e] @ q
+                        if len(self._delta):
+                            live = ~np.isin(ids, self._delta_all_ids)
+                            ids, scores = ids[live], scores[live]
+                        ids_parts.append(ids)
+                        score_parts.append(scores)
+
+            if len(self._delta_live_ids):
+                ids_parts.append(self._delta_live_ids)
+                score_parts.append(self._delta_live_vectors @ q)
+
+            if not ids_parts:
+                return []
+            ids = np.concatenate(ids_parts)
+            scores = np.concatenate(score_parts)
+            if len(ids) > k:
+                top = np.argpartition(scores, -k)[-k:]
+                ids, scores = ids[top], scores[top]
+            best = np.argsort(scores)[::-1]
+            return [(int(ids[i]), float(scores[i])) for i in best]
+
+
+class _ChunkedRows:
+    """Sequence view over the merged rows so _assign can walk them in chunks."""
+
+    def __init__(self, rows, total):
+        self._rows = rows
+        self._total = total
+
+    def __len__(self):
+        return self._total
+
+    def __getitem__(self, item: slice):
+        return self._rows(np.arange(*item.indices(self._total)))
+
+
+# ---------------------------------------------------------
+# One index object per directory, shared across reruns and sessions
+# ---------------------------------------------------------
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(path: str) -> VectorIndex:
+    key = os.path.abspath(path)
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = VectorIndex(path)
+        return _indexes[key]
@@ -0,0 +1,96 @@
+"""
+Benchmark the data layer and page data paths at several data sizes.
+
+    python -m benchmarks                                   # 10k and 100k rows, compare to baseline
+    python -m benchmarks --sizes 100000,1000000 --only page. --only models.
+    python -m benchmarks --save-baseline                   # accept the current numbers
+
+Every size gets its own seeded database (app.data.synthetic), in a
+temporary directory unless --workdir is given, in which case it is kept and
+reused by later runs. Results are written as JSON; with a baseline present,
+regressions beyond the thresholds are listed and the exit status is 1.
+
+benchmarks/baseline.json is committed; its "meta" block records the
+machine it was measured on. Timings only compare on similar hardware, so
+re-record it (--save-baseline) when the reference machine changes.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+from app.data.db import DB_PATH, get_pool
+from benchmarks import harness
+from benchmarks.cases import CASES
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(HERE, "baseline.json")
+RESULTS_PATH = os.path.join(HERE, "results.json")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark data-layer and page data paths")
+    parser.add_argument("--sizes", default="10000,100000",
+                        help="comma-separated rows per table (datasets get a tenth)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", action="append", default=[],
+                        help="run cases whose name contains this (repeatable)")
+    parser.add_argument("--workdir", help="keep generated databases here and reuse them")
+    parser.add_argument("--output", default=RESULTS_PATH)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="write this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=harness.THRESHOLD,
+                        help="allowed median slowdown, e.g. 0.25 = 25%%")
+    parser.add_argument("--memory-threshold", type=float, default=harness.MEMORY_THRESHOLD)
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    cases = [c for c in CASES if not args.only or any(o in c.name for o in args.only)]
+    output, baseline_path = os.path.abspath(args.output), os.path.abspath(args.baseline)
+    workdir = os.path.abspath(args.workdir) if args.workdir else tempfile.mkdtemp(prefix="bench-")
+    cwd = os.getcwd()
+
+    results = {}
+    try:
+        for size in sizes:
+            print(f"— {size:,} rows —")
+            fixture = harness.prepare(workdir, size)
+            for case in cases:
+                result = harness.measure(case, fixture, args.repeat)
+                results[f"{case.name}@{size}"] = result
+                print(f"  {case.name:<26} {result['median_ms']:>10.2f} ms  "
+                      f"{result['per_op_us']:>10.2f} µs/op  {result['peak_kib']:>10,.0f} KiB")
+            get_pool(DB_PATH).close_all()
+    finally:
+        os.chdir(cwd)
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    meta = dict(harness.environment(), sizes=sizes, repeat=args.repeat, seed=harness.SEED)
+    harness.save(output, results, meta)
+    print(f"✓ Results written to {output}")
+
+    if args.save_baseline:
+        harness.save(baseline_path, results, meta)
+        print(f"✓ Baseline saved to {baseline_path}")
+        return
+
+    baseline = harness.load(baseline_path)
+    if baseline is None:
+        print(f"No baseline at {baseline_path}; run with --save-baseline to record one.")
+        return
+
+    regressions = harness.compare(results, baseline, args.threshold, args.memory_threshold)
+    if regressions:
+        print(f"✗ {len(regressions)} regression(s) against {baseline_path}:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print(f"✓ No regressions against {baseline_path}")
+
+
+if __name__ == "__main__":
+    main()
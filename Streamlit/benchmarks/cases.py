@@ -0,0 +1,213 @@
+"""
+The benchmarked code paths, each calling the same functions (and SQL) the
+pages do. Case names are the keys of the JSON baselines, so keep them stable.
+"""
+
+import csv
+import io
+import os
+from contextlib import redirect_stdout
+
+import pandas as pd
+
+from app.data import datasets, incidents, tickets
+from app.data.db import get_pool
+from app.data.load_csv import _load_csv_to_table
+from app.data.schema import migrate
+from app.models.batches import DatasetBatch, ITTicketBatch, SecurityIncidentBatch
+from app.services.analytics_service import AnalyticsService
+from app.services.context_builder import ContextBuilder
+from app.services.database_manager import DatabaseManager
+from app.services.record_browser import RecordBrowser
+from benchmarks.harness import Case, Fixture
+
+CRUD_OPS = 100               # create + update + delete cycles per timed run
+SEARCH_TEXT = "credentials"
+
+
+# ---------------------------------------------------------
+# Data layer
+# ---------------------------------------------------------
+def _get_all_incidents(fx: Fixture, _):
+    return len(incidents.get_all_incidents())
+
+
+def _fetch_all(fx: Fixture, _):
+    return len(fx.db.fetch_all("SELECT * FROM it_tickets"))
+
+
+# ---------------------------------------------------------
+# Pages (data paths only, no rendering)
+# ---------------------------------------------------------
+def _dashboard(fx: Fixture, _):
+    """pages/1_Dashboard.py's data section, statement for statement."""
+    analytics = AnalyticsService(DatabaseManager(fx.db_path))
+    sev_rows = analytics.severity_distribution()
+    analytics.kpis(severity_counts=sev_rows)
+    pd.DataFrame(sev_rows, columns=["Severity", "Count"])
+    pd.DataFrame(analytics.category_distribution(), columns=["Category", "Count"])
+    pd.DataFrame(analytics.dataset_sizes(), columns=["Name", "Rows", "Estimated Size (MB)"])
+    pd.DataFrame(analytics.ticket_priority_distribution(), columns=["Priority", "Count"])
+    pd.DataFrame(analytics.ticket_status_distribution(), columns=["Status", "Count"])
+
+
+def _incidents_browser(fx: Fixture) -> RecordBrowser:
+    return RecordBrowser(fx.db, SecurityIncidentBatch, filter_columns=("severity", "status"),
+                         fts_table="incidents_fts")
+
+
+def _tickets_browser(fx: Fixture) -> RecordBrowser:
+    return RecordBrowser(fx.db, ITTicketBatch, filter_columns=("priority", "status", "assigned_to"),
+                         fts_table="tickets_fts")
+
+
+def _incidents_page(fx: Fixture, _):
+    browser = _incidents_browser(fx)
+    browser.filter_options("severity")
+    browser.filter_options("status")
+    filters = {"severity": "All", "status": "All"}
+    page = browser.page(filters, page_size=50)
+    page.batch.to_frame(extra={"Severity Level (1–4)": page.batch.severity_levels()})
+    browser.group_counts(filters, ("category", "severity"))
+
+
+def _incidents_search(fx: Fixture, _):
+    results = _incidents_browser(fx).search(SEARCH_TEXT, {"severity": "All", "status": "All"},
+                                            page_size=20)
+    results.batch.to_frame(extra={"Severity Level (1–4)": results.batch.severity_levels()})
+    for rec in results.batch:
+        rec.get_id()
+
+
+def _datasets_page(fx: Fixture, _):
+    batch = DatasetBatch.load(fx.db)
+    batch.to_frame(extra={"Estimated Size (MB)": batch.size_mb()})
+    return len(batch)
+
+
+def _tickets_page(fx: Fixture, _):
+    browser = _tickets_browser(fx)
+    for column in ("priority", "status", "assigned_to"):
+        browser.filter_options(column)
+    filters = {"priority": "All", "status": "All", "assigned_to": "All"}
+    page = browser.page(filters, page_size=50)
+    page.batch.to_frame()
+    browser.group_counts(filters, ("priority", "status"))
+    browser.group_counts(None, ("assigned_to", "priority"))
+
+
+def _models(batch_cls):
+    """Whole-table model construction: the columnar batch, then one object per row."""
+    def run(fx: Fixture, _):
+        batch = batch_cls.load(fx.db)
+        return sum(1 for _ in batch)
+    return run
+
+
+# ---------------------------------------------------------
+# AI context
+# ---------------------------------------------------------
+def _context_cold(fx: Fixture, _):
+    ContextBuilder(fx.db)._render()
+
+
+def _context_cached(fx: Fixture, _):
+    ContextBuilder(fx.db).build()
+
+
+# ---------------------------------------------------------
+# CSV loader
+# ---------------------------------------------------------
+def _export_csv(fx: Fixture, table: str) -> str:
+    path = os.path.join(fx.root, f"{table}.csv")
+    if path not in fx.scratch:
+        with fx.db.reader() as conn, open(path, "w", newline="", encoding="utf-8") as f:
+            cursor = conn.execute(f"SELECT * FROM {table}")
+            writer = csv.writer(f)
+            writer.writerow([d[0] for d in cursor.description])
+            writer.writerows(cursor)
+        fx.scratch[path] = True
+    return path
+
+
+def _load_csv(table: str):
+    def setup(fx: Fixture):
+        csv_path = _export_csv(fx, table)
+        db_path = os.path.join("DATA", "load_csv.db")
+        get_pool(db_path).close_all()        # start from an empty file every run
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+        with redirect_stdout(io.StringIO()):
+            migrate(db_path)
+        return csv_path, db_path
+
+    def run(fx: Fixture, arg):
+        csv_path, db_path = arg
+        with redirect_stdout(io.StringIO()):
+            stats = _load_csv_to_table(csv_path, table, resume=False, db_path=db_path)
+        return stats["rows"]
+
+    return setup, run
+
+
+# ---------------------------------------------------------
+# CRUD writes (one transaction each, as the forms do)
+# ---------------------------------------------------------
+def _crud_ids(fx: Fixture, table: str, key: str):
+    first = fx.db.fetch_one(f"SELECT COALESCE(MAX({key}), 0) FROM {table}")[0] + 1
+    return range(first, first + CRUD_OPS)
+
+
+def _crud_incidents(fx: Fixture, ids):
+    for i in ids:
+        incidents.create_incident(i, "2026-01-01T09:00:00", "high", "Phishing", "open",
+                                  "Benchmark incident: suspicious login prompt reported by a user.")
+    for i in ids:
+        incidents.update_incident_status(i, "resolved")
+    for i in ids:
+        incidents.delete_incident(i)
+    return 3 * len(ids)
+
+
+def _crud_tickets(fx: Fixture, ids):
+    for i in ids:
+        tickets.create_ticket(i, "Medium", "Benchmark ticket: laptop cannot reach the VPN.", "Open",
+                              "alex.smith", "2026-01-01T09:00:00", None)
+    for i in ids:
+        tickets.update_ticket_status(i, "Closed")
+    for i in ids:
+        tickets.delete_ticket(i)
+    return 3 * len(ids)
+
+
+def _crud_datasets(fx: Fixture, ids):
+    for i in ids:
+        datasets.create_dataset(i, f"benchmark_{i}", 1000, 12, "alex.smith", "2026-01-01")
+    for i in ids:
+        datasets.delete_dataset(i)
+    return 2 * len(ids)
+
+
+_csv_datasets = _load_csv("datasets_metadata")
+_csv_incidents = _load_csv("cyber_incidents")
+
+CASES = [
+    Case("data.get_all_incidents", _get_all_incidents),
+    Case("data.fetch_all_tickets", _fetch_all),
+    Case("page.dashboard", _dashboard),
+    Case("page.incidents", _incidents_page),
+    Case("page.incidents_search", _incidents_search),
+    Case("page.datasets", _datasets_page),
+    Case("page.tickets", _tickets_page),
+    Case("models.incidents", _models(SecurityIncidentBatch)),
+    Case("models.datasets", _models(DatasetBatch)),
+    Case("models.tickets", _models(ITTicketBatch)),
+    Case("context.build_cold", _context_cold),
+    Case("context.build_cached", _context_cached),
+    Case("load_csv.datasets", _csv_datasets[1], setup=_csv_datasets[0], repeat=3),
+    Case("load_csv.incidents", _csv_incidents[1], setup=_csv_incidents[0], repeat=3),
+    Case("crud.incidents", _crud_incidents, setup=lambda fx: _crud_ids(fx, "cyber_incidents", "incident_id")),
+    Case("crud.tickets", _crud_tickets, setup=lambda fx: _crud_ids(fx, "it_tickets", "ticket_id")),
+    Case("crud.datasets", _crud_datasets, setup=lambda fx: _crud_ids(fx, "datasets_metadata", "dataset_id")),
+]
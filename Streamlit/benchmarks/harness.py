@@ -0,0 +1,156 @@
+"""
+Seeded databases, timing, memory and baseline comparison for the benchmarks.
+
+Each case runs `repeat` times after one untimed warm-up; the median wall
+time is what baselines compare. Peak memory comes from one extra run under
+tracemalloc (kept out of the timed runs, which it would slow down). It
+counts Python and NumPy allocations, not SQLite's page cache.
+"""
+
+import gc
+import io
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable
+
+from app.data.db import DB_PATH
+from app.data.schema import migrate
+from app.data.synthetic import generate_table
+from app.services.database_manager import DatabaseManager
+
+THRESHOLD = 0.25             # allowed slowdown of the median before it counts as a regression
+MEMORY_THRESHOLD = 0.25      # allowed growth of peak memory
+NOISE_FLOOR_MS = 1.0         # smaller absolute slowdowns are ignored
+MEMORY_FLOOR_KIB = 256       # smaller absolute growth is ignored
+SEED = 0
+END = datetime(2026, 1, 1)   # fixed so every run generates identical data
+
+
+@dataclass
+class Fixture:
+    """One seeded database of `size` rows per main table; cwd is `root` while cases run."""
+    size: int
+    root: str
+    db: Any                  # DatabaseManager on db_path
+    db_path: str
+    scratch: dict            # per-fixture state shared between a case's setup and run
+
+
+@dataclass
+class Case:
+    name: str
+    run: Callable[[Fixture, Any], int | None]    # returns the number of operations (default 1)
+    setup: Callable[[Fixture], Any] | None = None    # untimed, before every run
+    repeat: int | None = None                        # overrides the suite-wide repeat
+
+
+def table_sizes(size: int) -> dict:
+    return {"cyber_incidents": size, "it_tickets": size, "datasets_metadata": max(100, size // 10)}
+
+
+def prepare(workdir: str, size: int) -> Fixture:
+    """Create (or reuse) the seeded database for `size` under workdir and make its directory the cwd."""
+    root = os.path.join(workdir, f"size_{size}")
+    os.makedirs(os.path.join(root, "DATA"), exist_ok=True)
+    os.chdir(root)
+    with redirect_stdout(io.StringIO()):
+        migrate(DB_PATH)
+    db = DatabaseManager(DB_PATH)
+    for table, rows in table_sizes(size).items():
+        if db.fetch_one(f"SELECT COUNT(*) FROM {table}")[0] != rows:
+            print(f"  generating {rows:,} rows of {table}")
+            db.execute_query(f"DELETE FROM {table}")
+            with redirect_stdout(io.StringIO()):
+                generate_table(table, rows, seed=SEED, end=END, db_path=DB_PATH)
+    return Fixture(size=size, root=root, db=db, db_path=DB_PATH, scratch={})
+
+
+def _once(case: Case, fixture: Fixture) -> tuple[float, int]:
+    arg = case.setup(fixture) if case.setup else None
+    gc.collect()
+    started = time.perf_counter()
+    ops = case.run(fixture, arg)
+    return time.perf_counter() - started, ops or 1
+
+
+def measure(case: Case, fixture: Fixture, repeat: int) -> dict:
+    _once(case, fixture)                 # warm caches, pools and imports
+    times = []
+    ops = 1
+    for _ in range(case.repeat or repeat):
+        seconds, ops = _once(case, fixture)
+        times.append(seconds)
+
+    arg = case.setup(fixture) if case.setup else None
+    gc.collect()
+    tracemalloc.start()
+    try:
+        case.run(fixture, arg)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    median = statistics.median(times)
+    return {
+        "median_ms": round(median * 1000, 3),
+        "min_ms": round(min(times) * 1000, 3),
+        "max_ms": round(max(times) * 1000, 3),
+        "repeat": len(times),
+        "ops": ops,
+        "per_op_us": round(median / ops * 1e6, 3),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+# ---------------------------------------------------------
+# Baselines
+# ---------------------------------------------------------
+def environment() -> dict:
+    return {
+        "recorded_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def save(path: str, results: dict, meta: dict):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "results": results}, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def load(path: str) -> dict | None:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(results: dict, baseline: dict, threshold: float = THRESHOLD,
+            memory_threshold: float = MEMORY_THRESHOLD) -> list[str]:
+    """One message per case that got slower or hungrier than the baseline allows."""
+    regressions = []
+    for key, current in results.items():
+        before = baseline.get("results", {}).get(key)
+        if before is None:
+            continue
+        slower = current["median_ms"] - before["median_ms"]
+        if slower > NOISE_FLOOR_MS and current["median_ms"] > before["median_ms"] * (1 + threshold):
+            regressions.append(f"{key}: {before['median_ms']:.2f} → {current['median_ms']:.2f} ms "
+                               f"(+{slower / before['median_ms']:.0%})")
+        grown = current["peak_kib"] - before["peak_kib"]
+        if grown > MEMORY_FLOOR_KIB and current["peak_kib"] > before["peak_kib"] * (1 + memory_threshold):
+            regressions.append(f"{key}: peak {before['peak_kib']:,.0f} → {current['peak_kib']:,.0f} KiB "
+                               f"(+{grown / before['peak_kib']:.0%})")
+    return regressions
@@ -0,0 +1,296 @@
+"""
+Concurrent-session load test: N simulated analysts log in through Home.py
+and then work through the Dashboard, Cyber Incidents, Datasets and IT
+Tickets pages at the same time, each in its own Streamlit AppTest session.
+
+    python -m benchmarks.load_test --sessions 30 --iterations 5 --write-ratio 0.2
+
+Every page visit is a full script run (the same code the server executes
+on a rerun, without the browser). AppTest swaps a process-wide mock
+runtime in and out around each run, so concurrent sessions cannot share a
+process: each one is a forked worker. The sessions therefore contend in
+SQLite itself (file locks, busy_timeout) rather than on one server's
+connection pool, bcrypt pool and login throttle, which makes lock waits
+more likely than on a real single-process server, not less. With probability --write-ratio a visit
+is followed by a create, update or delete through the page's own form.
+Writes land in the seeded benchmark database (see benchmarks.harness),
+never in DATA/ of the real app.
+
+The report gives p50/p95/p99 latency per page and action, overall
+throughput, and the errors seen: "database is locked" (lock waits that
+outlasted busy_timeout), login throttling, and anything else.
+"""
+
+import argparse
+import itertools
+import logging
+import multiprocessing
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+from streamlit.testing.v1 import AppTest
+
+from app.data.db import DB_PATH, get_pool
+from app.data.users import insert_users
+from app.services.password_hasher import bcrypt_hash
+from benchmarks import harness
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = [
+    "pages/1_Dashboard.py",
+    "pages/2_Cyber_Incidents.py",
+    "pages/3_Datasets_Overview.py",
+    "pages/4_IT_Tickets.py",
+]
+PASSWORD = "load-test-password"
+SCRIPT_TIMEOUT = 120         # seconds before AppTest gives up on one script run
+NEW_ID_BASE = 50_000_000     # created rows get ids far above the seeded ones
+NEW_IDS_PER_SESSION = 1_000_000
+_new_ids = itertools.count(NEW_ID_BASE)     # re-based per session in the worker
+
+
+# ---------------------------------------------------------
+# Form actions: (button key, {widget key: value}, confirm checkbox key);
+# callables get a fresh id. Deletes tick the confirmation box first (its
+# own rerun), then press the button.
+# ---------------------------------------------------------
+WRITES = {
+    "pages/2_Cyber_Incidents.py": {
+        "create": ("incident_create_button", {
+            "incident_create_id": lambda: next(_new_ids),
+            "incident_create_category": "Phishing",
+            "incident_create_severity": "high",
+            "incident_create_description": "Load test: credential phishing email reported by a user.",
+        }, None),
+        "update": ("incident_update_button", {"incident_update_status": "investigating"}, None),
+        "delete": ("incident_delete_button", {}, "incident_delete_confirm"),
+    },
+    "pages/3_Datasets_Overview.py": {
+        "create": ("dataset_create_button", {
+            "dataset_create_id": lambda: next(_new_ids),
+            "dataset_create_name": "load_test_export",
+            "dataset_create_rows": 1000,
+            "dataset_create_cols": 12,
+            "dataset_create_uploader": "load.test",
+        }, None),
+        "delete": ("dataset_delete_button", {}, "dataset_delete_confirm"),
+    },
+    "pages/4_IT_Tickets.py": {
+        "create": ("ticket_create_button", {
+            "ticket_create_id": lambda: next(_new_ids),
+            "ticket_create_title": "VPN drops",
+            "ticket_create_description": "Load test: VPN disconnects every few minutes.",
+        }, None),
+        "update": ("ticket_update_button", {"ticket_update_status": "In Progress"}, None),
+        "delete": ("ticket_delete_button", {}, "ticket_delete_confirm"),
+    },
+}
+
+
+def _messages(at) -> list[str]:
+    """Error text shown by the run: st.error calls and uncaught exceptions."""
+    return [str(e.value) for e in at.error] + [str(e.value) for e in at.exception]
+
+
+class _Results:
+    def __init__(self):
+        self.latencies = defaultdict(list)       # step -> [seconds]
+        self.errors = defaultdict(lambda: defaultdict(int))     # step -> kind -> count
+        self.samples = {}                        # kind -> first message seen
+
+    def record(self, step: str, seconds: float, messages: list[str]):
+        self.latencies[step].append(seconds)
+        for message in messages:
+            lowered = message.lower()
+            if "database is locked" in lowered or "database is busy" in lowered:
+                kind = "lock_wait"
+            elif "try again in" in lowered:
+                kind = "throttled"
+            else:
+                kind = "other"
+            self.errors[step][kind] += 1
+            self.samples.setdefault(kind, message)
+
+    def merge(self, other: dict):
+        for step, values in other["latencies"].items():
+            self.latencies[step].extend(values)
+        for step, kinds in other["errors"].items():
+            for kind, n in kinds.items():
+                self.errors[step][kind] += n
+        for kind, message in other["samples"].items():
+            self.samples.setdefault(kind, message)
+
+    def to_dict(self) -> dict:
+        return {"latencies": dict(self.latencies),
+                "errors": {step: dict(kinds) for step, kinds in self.errors.items()},
+                "samples": self.samples}
+
+
+def _timed(results: _Results, step: str, at, action):
+    started = time.perf_counter()
+    try:
+        action()
+        messages = _messages(at)
+    except Exception as e:       # a timeout or a crash in the script runner
+        messages = [f"{type(e).__name__}: {e}"]
+    results.record(step, time.perf_counter() - started, messages)
+    return not messages
+
+
+def _write(at, page: str, rng: random.Random, results: _Results):
+    name, (button, values, confirm) = rng.choice(list(WRITES[page].items()))
+    for key, value in values.items():
+        at.session_state[key] = value() if callable(value) else value
+
+    def click():
+        if confirm:
+            at.checkbox(key=confirm).check().run(timeout=SCRIPT_TIMEOUT)
+        at.button(key=button).click().run(timeout=SCRIPT_TIMEOUT)
+
+    _timed(results, f"{os.path.basename(page)}:{name}", at, click)
+
+
+def _session(index: int, args, start, queue):
+    """One simulated analyst (runs in a forked worker); puts its results on `queue`."""
+    global _new_ids
+    _new_ids = itertools.count(NEW_ID_BASE + index * NEW_IDS_PER_SESSION)
+    logging.disable(logging.WARNING)     # AppTest logs bare-mode and deprecation notices on every run
+    results = _Results()
+    try:
+        _browse(index, args, start, results)
+    except BaseException:
+        start.abort()            # release everyone waiting at the start line
+        raise
+    finally:
+        queue.put(results.to_dict())
+
+
+def _browse(index: int, args, start, results: _Results):
+    rng = random.Random(args.seed * 1000 + index)
+    at = AppTest.from_file(os.path.join(APP_DIR, "Home.py"), default_timeout=SCRIPT_TIMEOUT)
+    at.run()
+    start.wait()
+
+    def login():
+        at.text_input[0].set_value(f"load_user_{index}")
+        at.text_input[1].set_value(PASSWORD)
+        at.button[0].click().run()
+
+    if not _timed(results, "login", at, login) or not at.session_state.logged_in:
+        return
+
+    for _ in range(args.iterations):
+        for page in PAGES:
+            at.switch_page(page)
+            _timed(results, os.path.basename(page), at, at.run)
+            if page in WRITES and rng.random() < args.write_ratio:
+                _write(at, page, rng, results)
+            if args.think_ms:
+                time.sleep(rng.expovariate(1000 / args.think_ms))
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+
+def report(results: _Results, elapsed: float, sessions: int):
+    runs = sum(len(v) for v in results.latencies.values())
+    print(f"\n{'step':<34}{'runs':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+          f"{'locked':>8}{'throttled':>10}{'other':>7}")
+    for step in sorted(results.latencies):
+        values = results.latencies[step]
+        errors = results.errors.get(step, {})
+        print(f"{step:<34}{len(values):>6}"
+              + "".join(f"{_percentile(values, q) * 1000:>10.1f}" for q in (50, 95, 99))
+              + f"{errors.get('lock_wait', 0):>8}{errors.get('throttled', 0):>10}{errors.get('other', 0):>7}")
+
+    totals = defaultdict(int)
+    for errors in results.errors.values():
+        for kind, n in errors.items():
+            totals[kind] += n
+    print(f"\n{sessions} sessions, {runs} script runs in {elapsed:.1f} s "
+          f"→ {runs / elapsed:.1f} runs/s; lock-wait errors: {totals['lock_wait']}, "
+          f"throttled: {totals['throttled']}, other errors: {totals['other']}")
+    for kind, message in results.samples.items():
+        print(f"  first {kind}: {message.splitlines()[0][:200]}")
+    return totals
+
+
+def summary(results: _Results, elapsed: float) -> dict:
+    """The report as JSON-ready numbers, one entry per step."""
+    return {
+        step: {
+            "runs": len(values),
+            **{f"p{q}_ms": round(_percentile(values, q) * 1000, 1) for q in (50, 95, 99)},
+            "errors": dict(results.errors.get(step, {})),
+            "per_sec": round(len(values) / elapsed, 2),
+        }
+        for step, values in sorted(results.latencies.items())
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive the app with concurrent AppTest sessions")
+    parser.add_argument("--sessions", type=int, default=30)
+    parser.add_argument("--iterations", type=int, default=3, help="passes over the pages per session")
+    parser.add_argument("--write-ratio", type=float, default=0.2,
+                        help="chance that a page visit also submits a form")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="mean pause between visits")
+    parser.add_argument("--rows", type=int, default=100_000, help="seeded rows per table")
+    parser.add_argument("--workdir", help="keep the seeded database here and reuse it")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also write the report as JSON here")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output) if args.output else None
+    workdir = os.path.abspath(args.workdir) if args.workdir else tempfile.mkdtemp(prefix="loadtest-")
+    cwd = os.getcwd()
+    try:
+        harness.prepare(workdir, args.rows)
+        password_hash = bcrypt_hash(PASSWORD)
+        insert_users([(f"load_user_{i}", password_hash, "user") for i in range(args.sessions)])
+        get_pool(DB_PATH).close_all()        # no SQLite handles may cross the fork
+
+        ctx = multiprocessing.get_context("fork")
+        start = ctx.Barrier(args.sessions + 1)
+        queue = ctx.Queue()
+        workers = [ctx.Process(target=_session, args=(i, args, start, queue), name=f"session-{i}")
+                   for i in range(args.sessions)]
+        for w in workers:
+            w.start()
+        try:
+            start.wait()         # every session has rendered Home.py; go
+        except threading.BrokenBarrierError:
+            pass                 # a session failed to start; the others run anyway
+        started = time.perf_counter()
+        results = _Results()
+        for _ in workers:
+            results.merge(queue.get())
+        elapsed = time.perf_counter() - started
+        for w in workers:
+            w.join()
+        totals = report(results, elapsed, args.sessions)
+        if output:
+            meta = dict(harness.environment(), sessions=args.sessions, iterations=args.iterations,
+                        write_ratio=args.write_ratio, rows=args.rows, seconds=round(elapsed, 2))
+            harness.save(output, summary(results, elapsed), meta)
+            print(f"✓ Report written to {output}")
+    finally:
+        os.chdir(cwd)
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    sys.exit(1 if totals["lock_wait"] or totals["other"] else 0)
+
+
+if __name__ == "__main__":
+    main()
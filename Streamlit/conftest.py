@@ -0,0 +1 @@
+# Lets pytest import the app package (app.*) from any working directory.
@@ -2,11 +2,14 @@ import streamlit as st
 import pandas as pd
 
 from app.services.database_manager import DatabaseManager
-from app.services.ai_assistant import AIAssistant
-
-from app.models.security_incident import SecurityIncident
-from app.models.dataset import Dataset
-from app.models.it_ticket import ITTicket
+from app.services.ai_assistant import AIAssistant, AIUnavailableError
+from app.services.ai_scheduler import get_scheduler
+from app.services.context_builder import ContextBuilder
+from app.services.conversation import RENDER_LAST, Conversation
+from app.services.incident_summarizer import IncidentSummarizer
+from app.services.response_cache import ResponseCache
+from app.services.retriever import Retriever, sync_in_background
+from app.services.sql_assistant import SQLAssistant, SQLQueryError
 
 st.set_page_config(page_title="AI Assistant", layout="wide")
 
@@ -24,144 +27,242 @@ st.title("🤖 AI Assistant")
 # ------------------------------
 db = DatabaseManager("DATA/intelligence_platform.db")
 ai = AIAssistant(model="phi3:mini")
+scheduler = get_scheduler(ai)     # shared queue in front of Ollama for every session
+cache = ResponseCache()
+
+
+def stream_when_ready(flight):
+    """Show the queue position while the request waits, then stream the answer."""
+    # Entered before waiting, so a rerun or stop mid-wait still releases the request
+    with flight.stream() as tokens:
+        waiting = st.empty()
+        while not flight.wait_started(timeout=0.25):
+            waiting.caption(f"⏳ Waiting for the AI engine — position {flight.position()} in the queue")
+        waiting.empty()
+        return st.write_stream(tokens)
+
+
+def show_generation_stats(flight):
+    stats = flight.stats
+    if stats and stats.time_to_first_token is not None:
+        shared = " · shared with an identical request" if flight.shared else ""
+        st.caption(
+            f"Queued {flight.queue_wait * 1000:.0f} ms · "
+            f"first token {stats.time_to_first_token * 1000:.0f} ms · "
+            f"{stats.tokens_per_sec:.1f} tokens/s · {stats.total_seconds:.1f} s total{shared}"
+        )
 
-# ------------------------------
-# CHAT HISTORY
-# ------------------------------
-if "chat_history" not in st.session_state:
-    st.session_state.chat_history = []
-
-# ==============================================================
-#           LOAD DATA FROM DATABASE USING OOP MODELS
-# ==============================================================
-
-def load_data():
-    # Incidents
-    rows_inc = db.fetch_all(
-        "SELECT incident_id, category, severity, status, description FROM cyber_incidents"
-    )
-    incidents = [SecurityIncident(*row) for row in rows_inc]
-
-    # Datasets
-    rows_ds = db.fetch_all(
-        "SELECT dataset_id, name, rows, columns, uploaded_by, upload_date FROM datasets_metadata"
-    )
-    datasets = [Dataset(*row) for row in rows_ds]
 
-    # Tickets
-    rows_tk = db.fetch_all(
-        "SELECT ticket_id, priority, description, status, assigned_to FROM it_tickets"
-    )
-    tickets = [
-        ITTicket(
-            ticket_id=row[0],
-            title=row[2],
-            priority=row[1],
-            status=row[3],
-            assigned_to=row[4],
-        ) for row in rows_tk
-    ]
+queue = scheduler.stats()
+st.sidebar.caption(
+    f"AI engine: {queue['running']}/{queue['max_concurrent']} busy · {queue['queued']} waiting · "
+    f"queue wait p50 {queue['wait_p50'] * 1000:.0f} ms / p95 {queue['wait_p95'] * 1000:.0f} ms"
+)
 
-    return incidents, datasets, tickets
+# ------------------------------
+# CONVERSATION STATE
+# ------------------------------
+if "conversation" not in st.session_state:
+    st.session_state.conversation = Conversation()
+if "chat_visible" not in st.session_state:
+    st.session_state.chat_visible = RENDER_LAST
 
-incidents, datasets, tickets = load_data()
+conversation = st.session_state.conversation
 
 # ==============================================================
 #         OPTIONAL INTELLIGENCE CONTEXT FOR ANALYTICS ANSWERS
 # ==============================================================
+# Built from SQL aggregates and cached against the data version, so it is
+# only recomputed after incidents, tickets or datasets change.
+context_builder = ContextBuilder(db)
 
-def build_context():
-    context = "### SYSTEM SUMMARY\n"
-
-    # --- INCIDENTS ---
-    context += "\n## Cybersecurity Incidents\n"
-    if incidents:
-        total = len(incidents)
-        critical = sum(1 for i in incidents if i.get_severity().lower() == "critical")
-        top_cat = max([i.get_incident_type() for i in incidents], key=lambda x: 
-                      [i.get_incident_type() for i in incidents].count(x))
-
-        context += (
-            f"- Total incidents: {total}\n"
-            f"- Critical: {critical}\n"
-            f"- Most common category: {top_cat}\n"
-        )
-    else:
-        context += "- No incident data.\n"
-
-    # --- DATASETS ---
-    context += "\n## Datasets\n"
-    if datasets:
-        largest = max(datasets, key=lambda d: d.get_rows() or 0)
-        context += (
-            f"- Total datasets: {len(datasets)}\n"
-            f"- Largest dataset: {largest.get_name()} ({largest.get_rows()} rows)\n"
-        )
-    else:
-        context += "- No dataset data.\n"
-
-    # --- TICKETS ---
-    context += "\n## IT Tickets\n"
-    if tickets:
-        total = len(tickets)
-        closed = sum(1 for t in tickets if t.get_status().lower() == "closed")
-        staff = [t.get_assigned_to() for t in tickets if t.get_assigned_to()]
-        top_staff = max(set(staff), key=staff.count) if staff else "N/A"
-
-        context += (
-            f"- Total tickets: {total}\n"
-            f"- Closed tickets: {closed}\n"
-            f"- Staff with most assignments: {top_staff}\n"
-        )
-    else:
-        context += "- No ticket data.\n"
-
-    context += (
-        "\n### Instructions\n"
-        "You may use the data above if the question relates to incidents, datasets, "
-        "or IT tickets. If the user's question is general or unrelated, answer normally.\n"
-    )
 
-    return context
+def build_context():
+    return context_builder.build()
 
 
 # ==============================================================
 #  USER SETTING: USE CONTEXT OR NOT?
 # ==============================================================
 
+SQL_MODE = "Exact figures (SQL)"
+mode = st.radio(
+    "Answer mode",
+    ["Chat", SQL_MODE],
+    horizontal=True,
+    help="SQL mode turns your question into a read-only query and explains the result."
+)
+
 use_context = st.checkbox(
     "Use system analytics context (optional)", 
     value=True,
     help="Turn off to ask completely general questions."
 )
 
+use_retrieval = st.checkbox(
+    "Look up relevant incidents & tickets",
+    value=True,
+    help="Adds the records whose descriptions best match your question to the prompt."
+)
+
+# The embedding queue is drained off the request path; a large backlog is
+# faster with `python -m app.services.retriever sync`
+sync_in_background(db)
+retriever = Retriever(db)
+
+# ==============================================================
+#  INCIDENT DESCRIPTION SUMMARY (map-reduce over all descriptions)
+# ==============================================================
+
+with st.expander("📝 Summarise incident descriptions"):
+    st.caption(
+        "Reads every incident description in chunks and summarises them in parallel. "
+        "Chunks summarised before are reused, so re-runs only process new incidents."
+    )
+    if st.button("Generate summary", key="incident_summary_button"):
+        progress = st.progress(0.0, text="Summarising incidents…")
+
+        def _on_progress(done, total):
+            progress.progress(min(done / total, 1.0), text=f"Summarising incidents… {done}/{total}")
+
+        try:
+            report = IncidentSummarizer(db, ai, cache).summarize(on_progress=_on_progress)
+            st.session_state.incident_summary = report
+        except AIUnavailableError as e:
+            st.error(f"⚠️ {e}")
+        progress.empty()
+
+    report = st.session_state.get("incident_summary")
+    if report:
+        st.markdown(report.text)
+        st.caption(
+            f"{report.incidents} incidents · {report.chunks} chunks "
+            f"({report.cached_chunks} cached) · {report.seconds:.1f} s"
+        )
+
 # ==============================================================
-#  DISPLAY CHAT HISTORY
+#  DISPLAY CHAT HISTORY (only the most recent messages)
 # ==============================================================
 
-for role, msg in st.session_state.chat_history:
+
+def _show_earlier():
+    st.session_state.chat_visible += RENDER_LAST
+
+
+def _clear_chat():
+    st.session_state.conversation.clear()
+    st.session_state.chat_visible = RENDER_LAST
+
+
+messages = conversation.messages
+hidden = max(0, len(messages) - st.session_state.chat_visible)
+if hidden:
+    st.button(f"Show earlier messages ({hidden} hidden)", on_click=_show_earlier,
+              key="chat_show_earlier")
+
+for role, msg in messages[hidden:]:
     st.chat_message(role).markdown(msg)
 
+if messages:
+    st.button("Clear conversation", on_click=_clear_chat, key="chat_clear")
+    if conversation.compactions:
+        st.caption(f"Earlier messages condensed into a summary {conversation.compactions}×.")
+
 # ==============================================================
 #  USER INPUT
 # ==============================================================
 
 prompt = st.chat_input("Ask me anything…")
 
-if prompt:
+if prompt and mode == SQL_MODE:
+    st.chat_message("user").markdown(prompt)
+    sql_assistant = SQLAssistant(db, ai, cache)
+
+    with st.chat_message("assistant"):
+        try:
+            with st.spinner("Writing a query…"):
+                result = sql_assistant.answer(prompt)
+            with st.expander(f"🧮 Query · {len(result.rows)} rows in {result.elapsed_ms:.0f} ms"):
+                st.code(result.sql, language="sql")
+                if result.truncated:
+                    st.caption(f"Showing the first {len(result.rows)} rows.")
+            if result.rows:
+                st.dataframe(pd.DataFrame(result.rows, columns=result.columns), use_container_width=True)
+            flight = sql_assistant.summarize(prompt, result)
+            response = stream_when_ready(flight)
+            show_generation_stats(flight)
+        except SQLQueryError as e:
+            response = f"⚠️ Could not answer this with a query: {e}"
+            st.error(response)
+        except AIUnavailableError as e:
+            response = f"⚠️ {e}"
+            st.error(response)
+
+    conversation.messages += [("user", prompt), ("assistant", response)]
+
+elif prompt:
     # show user message immediately
-    st.session_state.chat_history.append(("user", prompt))
     st.chat_message("user").markdown(prompt)
 
-    # build final prompt
-    if use_context:
-        full_prompt = build_context() + "\nUser: " + prompt
-    else:
-        full_prompt = prompt  # fully open domain
-
-    with st.spinner("AI is thinking…"):
-        response = ai.ask(full_prompt)
-
-    # show response
-    st.session_state.chat_history.append(("assistant", response))
-    st.chat_message("assistant").markdown(response)
+    # retrieve the records most relevant to the question
+    retrieved = []
+    if use_retrieval:
+        try:
+            retrieved = retriever.retrieve(prompt)
+        except AIUnavailableError as e:
+            st.warning(f"Record lookup skipped: {e}")
+
+    # build final prompt: the analytics block only needs resending when the
+    # model's conversation state does not already hold the current one
+    data_version = context_builder.data_version() if (use_context or use_retrieval) else ""
+    send_context = use_context and (
+        not conversation.context or conversation.context_version != data_version
+    )
+    preamble = (build_context() if send_context else "") + Retriever.render(retrieved)
+    full_prompt = conversation.build_prompt(prompt, preamble)
+
+    # Only standalone questions are cached; follow-ups depend on the history.
+    # Answers are reused until the data behind the context changes, or, with
+    # retrieval on, until the background sync writes to the vector index.
+    cache_prompt = (
+        ("[context] " if use_context else "")
+        + ("[records] " if use_retrieval else "")
+        + prompt
+    )
+    cache_version = data_version + (f"|{retriever.index_version()}" if use_retrieval else "")
+    cached = cache.get(ai.model, cache_prompt, cache_version) if conversation.is_fresh else None
+
+    with st.chat_message("assistant"):
+        if retrieved:
+            with st.expander(f"🔎 {len(retrieved)} related records"):
+                st.markdown("\n".join(r.text for r in retrieved))
+
+        if cached is not None:
+            response = cached
+            st.markdown(response)
+            st.caption("⚡ Cached answer — the data has not changed since it was generated.")
+            conversation.record(prompt, response, None)
+        else:
+            # stream tokens straight into the chat bubble as they arrive
+            flight = scheduler.submit(ai, full_prompt, conversation.context)
+            try:
+                response = stream_when_ready(flight)
+                if conversation.is_fresh:
+                    cache.put(ai.model, cache_prompt, cache_version, response)
+                conversation.record(prompt, response, flight.context)
+                if send_context and conversation.context:
+                    conversation.context_version = data_version
+            except AIUnavailableError as e:
+                response = f"⚠️ {e}"
+                st.error(response)
+                conversation.messages += [("user", prompt), ("assistant", response)]
+
+            show_generation_stats(flight)
+
+    # keep the model's working state bounded
+    if conversation.needs_compaction():
+        with st.spinner("Condensing earlier conversation…"):
+            try:
+                conversation.compact(ai)
+            except AIUnavailableError:
+                pass  # retried after the next reply
@@ -4,7 +4,8 @@ import plotly.express as px
 from datetime import datetime
 
 from app.services.database_manager import DatabaseManager
-from app.models.security_incident import SecurityIncident
+from app.services.record_browser import RecordBrowser
+from app.models.batches import SecurityIncidentBatch
 
 st.set_page_config(page_title="Cyber Incidents", layout="wide")
 
@@ -15,86 +16,159 @@ if "logged_in" not in st.session_state or not st.session_state.logged_in:
 
 st.title("🛡 Cybersecurity Incidents")
 
-# ---------- LOAD DATA ----------
+# ---------- DATA ACCESS ----------
+# Filtering, counting and paging all run in SQLite; only one page of rows
+# is ever loaded into the script and sent to the browser.
 db = DatabaseManager("DATA/intelligence_platform.db")
+browser = RecordBrowser(
+    db,
+    SecurityIncidentBatch,
+    filter_columns=("severity", "status"),
+    fts_table="incidents_fts",
+)
+
+if "incident_cursor" not in st.session_state:
+    st.session_state.incident_cursor = (None, None)   # (after, before)
+if "incident_search_page" not in st.session_state:
+    st.session_state.incident_search_page = 0
+
+
+def _go_to(after, before):
+    st.session_state.incident_cursor = (after, before)
+
+
+def _reset_paging():
+    st.session_state.incident_cursor = (None, None)
+    st.session_state.incident_search_page = 0
+
+
+def _search_to(page_no):
+    st.session_state.incident_search_page = page_no
 
-rows = db.fetch_all(
-    "SELECT incident_id, category, severity, status, description FROM cyber_incidents"
+
+# ---------- FILTERS ----------
+st.subheader("Filters")
+
+col_f1, col_f2, col_f3 = st.columns(3)
+
+with col_f1:
+    severity_filter = st.selectbox(
+        "Filter by Severity",
+        ["All"] + browser.filter_options("severity"),
+        key="incident_filter_severity",
+        on_change=_reset_paging,
+    )
+
+with col_f2:
+    status_filter = st.selectbox(
+        "Filter by Status",
+        ["All"] + browser.filter_options("status"),
+        key="incident_filter_status",
+        on_change=_reset_paging,
+    )
+
+with col_f3:
+    page_size = st.selectbox(
+        "Rows per page",
+        [25, 50, 100, 250],
+        index=1,
+        key="incident_page_size",
+        on_change=_reset_paging,
+    )
+
+filters = {"severity": severity_filter, "status": status_filter}
+
+search_text = st.text_input(
+    "🔎 Search descriptions",
+    key="incident_search",
+    placeholder="e.g. ransomware finance share",
+    on_change=_reset_paging,
 )
 
-incidents = []
-for row in rows:
-    inc = SecurityIncident(
-        incident_id=row[0],
-        incident_type=row[1],
-        severity=row[2],
-        status=row[3],
-        description=row[4],
+if search_text.strip():
+    # ---------- SEARCH RESULTS (ranked by bm25) ----------
+    results = browser.search(
+        search_text,
+        filters,
+        page_size=page_size,
+        page_no=st.session_state.incident_search_page,
     )
-    incidents.append(inc)
-
-data_for_df = []
-for inc in incidents:
-    data_for_df.append(
-        {
-            "ID": inc.get_id(),
-            "Category": inc.get_incident_type(),
-            "Severity": inc.get_severity(),
-            "Status": inc.get_status(),
-            "Description": inc.get_description(),
-            "Severity Level (1–4)": inc.get_severity_level(),
-        }
+    df = results.batch.to_frame(
+        extra={"Severity Level (1–4)": results.batch.severity_levels()}
     )
 
-df = pd.DataFrame(data_for_df)
+    st.subheader(f"Search Results ({results.total} matches)")
 
-# ---------- FILTERS ----------
-st.subheader("Filters")
+    if results.total == 0:
+        st.info("No incidents match that search.")
 
-if df.empty:
-    st.info("No incidents found yet. Use the forms below to create one.")
-    filtered_df = df
-else:
-    col_f1, col_f2 = st.columns(2)
-
-    with col_f1:
-        severity_options = ["All"]
-        if "Severity" in df.columns:
-            severity_options += sorted(df["Severity"].dropna().unique().tolist())
-        severity_filter = st.selectbox(
-            "Filter by Severity",
-            severity_options,
-            key="incident_filter_severity",
+    for rec, snip in zip(results.batch, results.snippets):
+        st.markdown(
+            f"**#{rec.get_id()}** · {rec.get_incident_type()} · "
+            f"{rec.get_severity()} · {rec.get_status()}  \n{snip}"
         )
 
-    with col_f2:
-        status_options = ["All"]
-        if "Status" in df.columns:
-            status_options += sorted(df["Status"].dropna().unique().tolist())
-        status_filter = st.selectbox(
-            "Filter by Status",
-            status_options,
-            key="incident_filter_status",
+    s1, s2, s3 = st.columns([1, 4, 1])
+    with s1:
+        st.button(
+            "◀ Previous",
+            key="incident_search_prev",
+            disabled=results.page_no == 0,
+            on_click=_search_to,
+            args=(results.page_no - 1,),
+        )
+    with s2:
+        st.caption(f"Page {results.page_no + 1} of {max(results.pages, 1)}")
+    with s3:
+        st.button(
+            "Next ▶",
+            key="incident_search_next",
+            disabled=results.page_no + 1 >= results.pages,
+            on_click=_search_to,
+            args=(results.page_no + 1,),
         )
+else:
+    after, before = st.session_state.incident_cursor
+    page = browser.page(filters, page_size=page_size, after=after, before=before)
+
+    df = page.batch.to_frame(extra={"Severity Level (1–4)": page.batch.severity_levels()})
 
-    filtered_df = df.copy()
+    # ---------- TABLE ----------
+    st.subheader("Incident Table")
 
-    if severity_filter != "All":
-        filtered_df = filtered_df[
-            filtered_df["Severity"].str.lower() == severity_filter.lower()
-        ]
+    if page.total == 0:
+        st.info("No incidents found. Adjust the filters or use the forms below to create one.")
 
-    if status_filter != "All":
-        filtered_df = filtered_df[
-            filtered_df["Status"].str.lower() == status_filter.lower()
-        ]
+    st.dataframe(df, use_container_width=True)
 
-# ---------- TABLE ----------
-st.subheader("Incident Table")
-st.dataframe(filtered_df, use_container_width=True)
+    p1, p2, p3 = st.columns([1, 4, 1])
+    with p1:
+        st.button(
+            "◀ Previous",
+            key="incident_prev_page",
+            disabled=page.prev_cursor is None,
+            on_click=_go_to,
+            args=(None, page.prev_cursor),
+        )
+    with p2:
+        st.caption(f"Showing {len(df)} of {page.total} matching incidents")
+    with p3:
+        st.button(
+            "Next ▶",
+            key="incident_next_page",
+            disabled=page.next_cursor is None,
+            on_click=_go_to,
+            args=(page.next_cursor, None),
+        )
 
 # ---------- CHARTS ----------
-if not filtered_df.empty:
+# Aggregated over every matching incident, not just the visible page
+bubble_df = pd.DataFrame(
+    browser.group_counts(filters, ("category", "severity")),
+    columns=["Category", "Severity", "Count"],
+)
+
+if not bubble_df.empty:
     st.markdown("---")
     st.header("📊 Incident Analytics")
 
@@ -102,21 +176,16 @@ if not filtered_df.empty:
 
     with c1:
         st.write("**Severity Distribution**")
-        sev_counts = filtered_df["Severity"].value_counts()
+        sev_counts = bubble_df.groupby("Severity")["Count"].sum()
         st.bar_chart(sev_counts)
 
     with c2:
         st.write("**Category Distribution**")
-        cat_counts = filtered_df["Category"].value_counts()
+        cat_counts = bubble_df.groupby("Category")["Count"].sum()
         st.bar_chart(cat_counts)
 
     # Bubble chart to show category + severity + count
     st.subheader("🔥 Bubble Chart – Severity vs Category")
-    bubble_df = (
-        filtered_df.groupby(["Category", "Severity"])
-        .size()
-        .reset_index(name="Count")
-    )
 
     fig_bubble = px.scatter(
         bubble_df,
@@ -204,11 +273,11 @@ with tab_update:
     st.subheader("Update Incident Status")
 
     if df.empty:
-        st.info("No incidents to update.")
+        st.info("No incidents on this page to update.")
     else:
         id_list = df["ID"].tolist()
         selected_id = st.selectbox(
-            "Select Incident ID",
+            "Select Incident ID (current page)",
             id_list,
             key="incident_update_id",
         )
@@ -234,11 +303,11 @@ with tab_delete:
     st.subheader("Delete Incident")
 
     if df.empty:
-        st.info("No incidents to delete.")
+        st.info("No incidents on this page to delete.")
     else:
         id_list = df["ID"].tolist()
         delete_id = st.selectbox(
-            "Select Incident ID to delete",
+            "Select Incident ID to delete (current page)",
             id_list,
             key="incident_delete_id",
         )
@@ -4,7 +4,7 @@ import plotly.express as px
 from datetime import datetime
 
 from app.services.database_manager import DatabaseManager
-from app.models.dataset import Dataset
+from app.models.batches import DatasetBatch
 
 st.set_page_config(page_title="Datasets", layout="wide")
 
@@ -18,37 +18,8 @@ st.title("📂 Dataset Metadata Overview")
 # ---------- LOAD DATA ----------
 db = DatabaseManager("DATA/intelligence_platform.db")
 
-rows = db.fetch_all(
-    "SELECT dataset_id, name, rows, columns, uploaded_by, upload_date FROM datasets_metadata"
-)
-
-datasets = []
-for row in rows:
-    d = Dataset(
-        dataset_id=row[0],
-        name=row[1],
-        rows=row[2],
-        columns=row[3],
-        uploaded_by=row[4],
-        upload_date=row[5],
-    )
-    datasets.append(d)
-
-records = []
-for d in datasets:
-    records.append(
-        {
-            "ID": d.get_id(),
-            "Name": d.get_name(),
-            "Rows": d.get_rows(),
-            "Columns": d.get_columns(),
-            "Uploaded By": d.get_uploaded_by(),
-            "Upload Date": d.get_upload_date(),
-            "Estimated Size (MB)": d.calculate_size_mb(),
-        }
-    )
-
-df = pd.DataFrame(records)
+datasets = DatasetBatch.load(db)
+df = datasets.to_frame(extra={"Estimated Size (MB)": datasets.size_mb()})
 
 # ---------- TABLE ----------
 st.subheader("Dataset Records")
@@ -4,7 +4,8 @@ import plotly.express as px
 from datetime import datetime
 
 from app.services.database_manager import DatabaseManager
-from app.models.it_ticket import ITTicket
+from app.services.record_browser import RecordBrowser
+from app.models.batches import ITTicketBatch
 
 st.set_page_config(page_title="IT Tickets", layout="wide")
 
@@ -15,101 +16,184 @@ if "logged_in" not in st.session_state or not st.session_state.logged_in:
 
 st.title("💼 IT Support Tickets")
 
-# ---------- LOAD DATA ----------
+# ---------- DATA ACCESS ----------
+# Filtering, counting and paging all run in SQLite; only one page of rows
+# is ever loaded into the script and sent to the browser.
 db = DatabaseManager("DATA/intelligence_platform.db")
-
-rows = db.fetch_all(
-    "SELECT ticket_id, priority, description, status, assigned_to FROM it_tickets"
+browser = RecordBrowser(
+    db,
+    ITTicketBatch,
+    filter_columns=("priority", "status", "assigned_to"),
+    fts_table="tickets_fts",
 )
 
-tickets = []
-for row in rows:
-    t = ITTicket(
-        ticket_id=row[0],
-        title=row[2],
-        priority=row[1],
-        status=row[3],
-        assigned_to=row[4],
-    )
-    tickets.append(t)
-
-ticket_records = []
-for t in tickets:
-    ticket_records.append(
-        {
-            "ID": t.get_id(),
-            "Title": t.get_title(),
-            "Priority": t.get_priority(),
-            "Status": t.get_status(),
-            "Assigned To": t.get_assigned_to(),
-        }
-    )
+if "ticket_cursor" not in st.session_state:
+    st.session_state.ticket_cursor = (None, None)   # (after, before)
+if "ticket_search_page" not in st.session_state:
+    st.session_state.ticket_search_page = 0
+
+
+def _go_to(after, before):
+    st.session_state.ticket_cursor = (after, before)
+
+
+def _reset_paging():
+    st.session_state.ticket_cursor = (None, None)
+    st.session_state.ticket_search_page = 0
+
+
+def _search_to(page_no):
+    st.session_state.ticket_search_page = page_no
 
-df = pd.DataFrame(ticket_records)
 
 # ---------- FILTERS ----------
 st.subheader("Filters")
 
-if df.empty:
-    st.info("No tickets yet. Use the forms below to create one.")
-    filtered_df = df
-else:
-    f1, f2, f3 = st.columns(3)
+f1, f2, f3, f4 = st.columns(4)
 
-    with f1:
-        pri_options = ["All"] + sorted(df["Priority"].unique().tolist())
-        priority_filter = st.selectbox(
-            "Priority",
-            pri_options,
-            key="ticket_filter_priority",
-        )
+with f1:
+    priority_filter = st.selectbox(
+        "Priority",
+        ["All"] + browser.filter_options("priority"),
+        key="ticket_filter_priority",
+        on_change=_reset_paging,
+    )
 
-    with f2:
-        stat_options = ["All"] + sorted(df["Status"].unique().tolist())
-        status_filter = st.selectbox(
-            "Status",
-            stat_options,
-            key="ticket_filter_status",
+with f2:
+    status_filter = st.selectbox(
+        "Status",
+        ["All"] + browser.filter_options("status"),
+        key="ticket_filter_status",
+        on_change=_reset_paging,
+    )
+
+with f3:
+    assigned_filter = st.selectbox(
+        "Assigned To",
+        ["All"] + browser.filter_options("assigned_to"),
+        key="ticket_filter_assigned",
+        on_change=_reset_paging,
+    )
+
+with f4:
+    page_size = st.selectbox(
+        "Rows per page",
+        [25, 50, 100, 250],
+        index=1,
+        key="ticket_page_size",
+        on_change=_reset_paging,
+    )
+
+filters = {
+    "priority": priority_filter,
+    "status": status_filter,
+    "assigned_to": assigned_filter,
+}
+
+search_text = st.text_input(
+    "🔎 Search descriptions",
+    key="ticket_search",
+    placeholder="e.g. vpn password reset",
+    on_change=_reset_paging,
+)
+
+if search_text.strip():
+    # ---------- SEARCH RESULTS (ranked by bm25) ----------
+    results = browser.search(
+        search_text,
+        filters,
+        page_size=page_size,
+        page_no=st.session_state.ticket_search_page,
+    )
+    df = results.batch.to_frame()
+
+    st.subheader(f"Search Results ({results.total} matches)")
+
+    if results.total == 0:
+        st.info("No tickets match that search.")
+
+    for rec, snip in zip(results.batch, results.snippets):
+        st.markdown(
+            f"**#{rec.get_id()}** · {rec.get_priority()} · {rec.get_status()} · "
+            f"{rec.get_assigned_to() or 'Unassigned'}  \n{snip}"
         )
 
-    with f3:
-        ass_options = ["All"] + sorted(df["Assigned To"].unique().tolist())
-        assigned_filter = st.selectbox(
-            "Assigned To",
-            ass_options,
-            key="ticket_filter_assigned",
+    s1, s2, s3 = st.columns([1, 4, 1])
+    with s1:
+        st.button(
+            "◀ Previous",
+            key="ticket_search_prev",
+            disabled=results.page_no == 0,
+            on_click=_search_to,
+            args=(results.page_no - 1,),
+        )
+    with s2:
+        st.caption(f"Page {results.page_no + 1} of {max(results.pages, 1)}")
+    with s3:
+        st.button(
+            "Next ▶",
+            key="ticket_search_next",
+            disabled=results.page_no + 1 >= results.pages,
+            on_click=_search_to,
+            args=(results.page_no + 1,),
         )
+else:
+    after, before = st.session_state.ticket_cursor
+    page = browser.page(filters, page_size=page_size, after=after, before=before)
+
+    df = page.batch.to_frame()
+
+    # ---------- TABLE ----------
+    st.subheader("Ticket Records")
 
-    filtered_df = df.copy()
-    if priority_filter != "All":
-        filtered_df = filtered_df[filtered_df["Priority"] == priority_filter]
-    if status_filter != "All":
-        filtered_df = filtered_df[filtered_df["Status"] == status_filter]
-    if assigned_filter != "All":
-        filtered_df = filtered_df[filtered_df["Assigned To"] == assigned_filter]
+    if page.total == 0:
+        st.info("No tickets found. Adjust the filters or use the forms below to create one.")
 
-# ---------- TABLE ----------
-st.subheader("Ticket Records")
-st.dataframe(filtered_df, use_container_width=True)
+    st.dataframe(df, use_container_width=True)
+
+    p1, p2, p3 = st.columns([1, 4, 1])
+    with p1:
+        st.button(
+            "◀ Previous",
+            key="ticket_prev_page",
+            disabled=page.prev_cursor is None,
+            on_click=_go_to,
+            args=(None, page.prev_cursor),
+        )
+    with p2:
+        st.caption(f"Showing {len(df)} of {page.total} matching tickets")
+    with p3:
+        st.button(
+            "Next ▶",
+            key="ticket_next_page",
+            disabled=page.next_cursor is None,
+            on_click=_go_to,
+            args=(page.next_cursor, None),
+        )
 
 # ---------- BASIC CHARTS ----------
-if not filtered_df.empty:
+# Aggregated over every matching ticket, not just the visible page
+breakdown_df = pd.DataFrame(
+    browser.group_counts(filters, ("priority", "status")),
+    columns=["Priority", "Status", "Count"],
+)
+
+if not breakdown_df.empty:
     st.subheader("Priority Breakdown")
-    st.bar_chart(filtered_df["Priority"].value_counts())
+    st.bar_chart(breakdown_df.groupby("Priority")["Count"].sum())
 
     st.subheader("Status Breakdown")
-    st.bar_chart(filtered_df["Status"].value_counts())
+    st.bar_chart(breakdown_df.groupby("Status")["Count"].sum())
 else:
     st.info("Not enough tickets to show charts yet.")
 
 # ---------- HEATMAP ----------
 st.subheader("🔥 Staff Workload by Priority (Heatmap)")
 
-heat_df = (
-    df.groupby(["Assigned To", "Priority"])
-    .size()
-    .reset_index(name="Count")
-)
+heat_df = pd.DataFrame(
+    browser.group_counts(None, ("assigned_to", "priority")),
+    columns=["Assigned To", "Priority", "Count"],
+).dropna(subset=["Assigned To", "Priority"])
 
 if not heat_df.empty:
     pivot = heat_df.pivot(
@@ -206,11 +290,11 @@ with tab_update:
     st.subheader("Update Ticket Status")
 
     if df.empty:
-        st.info("No tickets to update.")
+        st.info("No tickets on this page to update.")
     else:
         id_list = df["ID"].tolist()
         upd_id = st.selectbox(
-            "Select Ticket ID",
+            "Select Ticket ID (current page)",
             id_list,
             key="ticket_update_id",
         )
@@ -237,11 +321,11 @@ with tab_delete:
     st.subheader("Delete Ticket")
 
     if df.empty:
-        st.info("No tickets to delete.")
+        st.info("No tickets on this page to delete.")
     else:
         id_list = df["ID"].tolist()
         del_id = st.selectbox(
-            "Select Ticket ID to delete",
+            "Select Ticket ID to delete (current page)",
             id_list,
             key="ticket_delete_id",
         )
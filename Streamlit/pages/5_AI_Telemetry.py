@@ -0,0 +1,150 @@
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+
+from app.services.ai_assistant import AIAssistant, AIUnavailableError
+from app.services.ai_metrics import COLD_LOAD_SECONDS, MetricsStore
+from app.services.ai_scheduler import get_scheduler, warm_up
+from app.services.login_throttle import get_throttle
+from app.services.response_cache import ResponseCache
+
+st.set_page_config(page_title="AI Telemetry", layout="wide")
+
+# ---------------- LOGIN + ADMIN CHECK ----------------
+if "logged_in" not in st.session_state or not st.session_state.logged_in:
+    st.error("Please log in first.")
+    st.switch_page("Home.py")
+
+if st.session_state.get("role") != "admin":
+    st.error("This page is only available to administrators.")
+    st.stop()
+
+st.title("📈 AI Engine Telemetry")
+
+ai = AIAssistant(model="phi3:mini")
+metrics = MetricsStore()
+
+# ---------------- TIME WINDOW ----------------
+WINDOWS = {  # label -> (seconds, resample bucket)
+    "Last hour": (3600, "1min"),
+    "Last 24 hours": (86400, "15min"),
+    "Last 7 days": (7 * 86400, "1h"),
+    "Last 30 days": (30 * 86400, "6h"),
+}
+window = st.selectbox("Time window", list(WINDOWS), index=1)
+seconds, bucket = WINDOWS[window]
+
+df = metrics.calls(seconds)
+gen = df[df["kind"] != "warmup"]
+
+# ---------------- KPI CARDS ----------------
+st.subheader("📌 Quick Overview")
+
+col1, col2, col3, col4, col5, col6 = st.columns(6)
+with col1:
+    st.metric("Calls", len(gen))
+with col2:
+    st.metric("Error rate", f"{(1 - gen['ok'].mean()) * 100:.1f}%" if len(gen) else "–")
+with col3:
+    ttft = gen["time_to_first_token"].dropna()
+    st.metric("First token p50 / p95",
+              f"{ttft.quantile(0.5) * 1000:.0f} / {ttft.quantile(0.95) * 1000:.0f} ms" if len(ttft) else "–")
+with col4:
+    st.metric("Generation", f"{gen['eval_tps'].median():.1f} tok/s" if gen["eval_tps"].notna().any() else "–")
+with col5:
+    st.metric("Prompt prefill", f"{gen['prompt_tps'].median():.0f} tok/s" if gen["prompt_tps"].notna().any() else "–")
+with col6:
+    # Ollama reports a few ms of load_duration even for a resident model
+    st.metric("Cold loads", int((df["load_seconds"] > COLD_LOAD_SECONDS).sum()))
+
+st.markdown("---")
+
+# ---------------- TRENDS ----------------
+st.header("📉 Trends")
+
+if len(gen):
+    trend = gen.set_index("time").resample(bucket).agg({
+        "ts": "count",
+        "ok": "mean",
+        "time_to_first_token": "median",
+        "queue_wait": "median",
+        "eval_tps": "median",
+        "prompt_tps": "median",
+        "load_seconds": "max",
+    }).rename(columns={"ts": "calls"}).reset_index()
+    trend["error_rate"] = (1 - trend["ok"]) * 100
+
+    c1, c2 = st.columns(2)
+    with c1:
+        st.write("**Calls and error rate (%)**")
+        fig = px.line(trend, x="time", y=["calls", "error_rate"])
+        st.plotly_chart(fig, use_container_width=True)
+    with c2:
+        st.write("**Median latency (s)**")
+        fig = px.line(trend, x="time", y=["time_to_first_token", "queue_wait"])
+        st.plotly_chart(fig, use_container_width=True)
+
+    c3, c4 = st.columns(2)
+    with c3:
+        st.write("**Median throughput (tokens/s)**")
+        fig = px.line(trend, x="time", y=["eval_tps", "prompt_tps"])
+        st.plotly_chart(fig, use_container_width=True)
+    with c4:
+        st.write("**Longest model load (s)**")
+        fig = px.line(trend, x="time", y="load_seconds")
+        st.plotly_chart(fig, use_container_width=True)
+
+    with st.expander("Recent calls"):
+        st.dataframe(
+            df.sort_values("ts", ascending=False).head(200).drop(columns=["ts"]),
+            use_container_width=True,
+        )
+else:
+    st.info("No AI calls recorded in this window.")
+
+st.markdown("---")
+
+# ---------------- ENGINE STATE ----------------
+st.header("⚙️ Engine")
+
+c1, c2 = st.columns(2)
+
+with c1:
+    st.write("**Request queue**")
+    queue = get_scheduler(ai).stats()
+    st.dataframe(pd.DataFrame(queue.items(), columns=["Metric", "Value"]), use_container_width=True)
+
+    st.write("**Response cache**")
+    st.dataframe(pd.DataFrame(ResponseCache().stats().items(), columns=["Metric", "Value"]),
+                 use_container_width=True)
+
+with c2:
+    st.write("**Models loaded in Ollama**")
+    try:
+        loaded = ai.loaded_models()
+        if loaded:
+            st.dataframe(pd.DataFrame([
+                {"Model": m.get("name"), "Size (MB)": round((m.get("size") or 0) / 1e6),
+                 "Unloads at": m.get("expires_at")}
+                for m in loaded
+            ]), use_container_width=True)
+        else:
+            st.info("No model is loaded — the next request will pay the load time.")
+    except AIUnavailableError as e:
+        st.warning(f"⚠️ {e}")
+
+    if st.button("Warm up now", key="telemetry_warm_up"):
+        try:
+            with st.spinner(f"Loading {ai.model}…"):
+                stats = warm_up(ai, metrics)
+            st.success(f"{ai.model} ready (load took {stats.load_seconds or 0:.1f} s).")
+        except AIUnavailableError as e:
+            st.error(f"⚠️ {e}")
+
+st.markdown("---")
+
+# ---------------- LOGIN ADMISSION ----------------
+st.header("🔐 Login admission control")
+st.caption("Attempts refused before any bcrypt work, since this process started.")
+st.dataframe(pd.DataFrame(get_throttle().stats().items(), columns=["Metric", "Value"]),
+             use_container_width=True)
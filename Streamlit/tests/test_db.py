@@ -0,0 +1,33 @@
+import sqlite3
+
+import pytest
+
+from app.data.db import configure_pool, get_pool
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "test.db")
+    yield path
+    get_pool(path).close_all()
+
+
+def test_failed_begin_does_not_bind_the_thread_to_the_writer(db_path):
+    pool = configure_pool(db_path, busy_timeout=100)
+    with pool.writer() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+
+    other = sqlite3.connect(db_path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    try:
+        with pytest.raises(sqlite3.OperationalError, match="locked"):
+            with pool.writer():
+                pass
+    finally:
+        other.execute("ROLLBACK")
+        other.close()
+
+    with pool.reader() as conn:
+        assert conn is not pool._writer
+        with pytest.raises(sqlite3.OperationalError, match="readonly"):
+            conn.execute("INSERT INTO t VALUES (1)")
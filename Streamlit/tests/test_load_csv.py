@@ -0,0 +1,95 @@
+import csv
+
+import pytest
+
+from app.data import load_csv
+from app.data.db import get_pool
+from app.data.load_csv import _load_csv_to_table
+from app.data.schema import migrate
+
+COLUMNS = ["incident_id", "timestamp", "severity", "category", "status", "description"]
+ROWS = [
+    [1, "2024-01-01T09:00:00", "high", "Phishing", "open", "Credential phishing email"],
+    [2, "2024-01-02T10:30:00", "low", "Malware", "resolved", "Adware on a kiosk"],
+    [3, "2024-01-03T14:00:00", "critical", "Ransomware", "open", "Encrypted finance share"],
+]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "test.db")
+    migrate(path)
+    yield path
+    get_pool(path).close_all()
+
+
+def _write_csv(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        writer.writerows(rows)
+    return str(path)
+
+
+def test_loading_the_same_csv_twice_upserts(tmp_path, db_path):
+    csv_path = _write_csv(tmp_path / "incidents.csv", ROWS)
+
+    _load_csv_to_table(csv_path, "cyber_incidents", resume=False, db_path=db_path)
+    stats = _load_csv_to_table(csv_path, "cyber_incidents", resume=False, db_path=db_path)
+
+    assert stats["rows"] == len(ROWS)
+    with get_pool(db_path).reader() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM cyber_incidents").fetchone()[0] == len(ROWS)
+        queued = conn.execute(
+            "SELECT row_id FROM embedding_queue WHERE table_name = 'cyber_incidents' ORDER BY row_id"
+        ).fetchall()
+        assert [r[0] for r in queued] == [1, 2, 3]
+        hits = conn.execute("SELECT rowid FROM incidents_fts WHERE incidents_fts MATCH 'phishing'").fetchall()
+        assert hits == [(1,)]
+
+
+def test_requeued_row_moves_to_a_fresh_rowid(tmp_path, db_path):
+    csv_path = _write_csv(tmp_path / "incidents.csv", ROWS)
+    _load_csv_to_table(csv_path, "cyber_incidents", resume=False, db_path=db_path)
+    with get_pool(db_path).reader() as conn:
+        before = conn.execute("SELECT MAX(rowid) FROM embedding_queue").fetchone()[0]
+
+    edited = [ROWS[0][:5] + ["Credential phishing email, second wave"]]
+    _load_csv_to_table(_write_csv(tmp_path / "edit.csv", edited), "cyber_incidents",
+                       resume=False, db_path=db_path)
+
+    with get_pool(db_path).reader() as conn:
+        rowid = conn.execute(
+            "SELECT rowid FROM embedding_queue WHERE table_name = 'cyber_incidents' AND row_id = 1"
+        ).fetchone()[0]
+    assert rowid > before
+
+
+def test_resume_after_blank_lines_skips_exactly_the_committed_rows(tmp_path, db_path, monkeypatch):
+    csv_path = str(tmp_path / "incidents.csv")
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        writer.writerows([ROWS[0], [], [], [], ROWS[1], [], ROWS[2]])
+
+    calls = []
+    real_write_rows = load_csv.write_rows
+
+    def fail_on_second_chunk(*args):
+        calls.append(args)
+        if len(calls) == 2:
+            raise RuntimeError("interrupted")
+        return real_write_rows(*args)
+
+    monkeypatch.setattr(load_csv, "write_rows", fail_on_second_chunk)
+    with pytest.raises(RuntimeError):
+        load_csv._load_csv_to_table(csv_path, "cyber_incidents", chunk_rows=2, db_path=db_path)
+    monkeypatch.setattr(load_csv, "write_rows", real_write_rows)
+
+    stats = load_csv._load_csv_to_table(csv_path, "cyber_incidents", chunk_rows=2, db_path=db_path)
+
+    assert stats["rows"] == 2
+    with get_pool(db_path).reader() as conn:
+        ids = [r[0] for r in conn.execute("SELECT incident_id FROM cyber_incidents ORDER BY incident_id")]
+        assert ids == [1, 2, 3]
+        assert conn.execute("SELECT COUNT(*) FROM csv_load_progress").fetchone()[0] == 0
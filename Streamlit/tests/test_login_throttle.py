@@ -0,0 +1,36 @@
+import pytest
+
+from app.services import login_throttle
+from app.services.login_throttle import LoginThrottle, LoginThrottledError
+
+
+@pytest.fixture
+def throttle(monkeypatch):
+    monkeypatch.setattr(login_throttle, "MAX_KEYS", 100)
+    monkeypatch.setattr(login_throttle, "EVICT_TO", 90)
+    return LoginThrottle(db_path=None)
+
+
+def test_failing_logins_do_not_grow_the_table_without_bound(throttle):
+    for i in range(1000):
+        throttle.admit(f"user{i}", None)
+        throttle.record_failure(f"user{i}", None)
+    assert throttle.stats()["tracked_keys"] <= 100
+
+
+def test_unknown_usernames_get_no_bucket(throttle):
+    for i in range(10):
+        throttle.admit(f"ghost{i}", "10.0.0.1", known_user=False)
+        throttle.record_failure(f"ghost{i}", "10.0.0.1", known_user=False)
+    assert not any(key.startswith("user:") for key in throttle._buckets)
+    assert throttle._buckets["client:10.0.0.1"].failures == 10
+
+
+def test_eviction_spares_locked_out_keys(throttle):
+    for _ in range(5):
+        throttle.admit("victim", None)
+        throttle.record_failure("victim", None)
+    for i in range(300):
+        throttle.admit(f"other{i}", None)
+    with pytest.raises(LoginThrottledError):
+        throttle.admit("victim", None)